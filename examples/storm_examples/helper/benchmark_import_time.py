@@ -0,0 +1,94 @@
+"""Measure the cold-start cost of importing knowledge_storm.
+
+Every measurement runs in a fresh interpreter so that nothing is cached in `sys.modules`. Example:
+    python examples/storm_examples/helper/benchmark_import_time.py --runs 5 \
+        --statement "from knowledge_storm.lm import OpenAIModel" \
+        --statement "from knowledge_storm import STORMWikiRunner"
+
+Pass --show-modules to list the slowest imported modules (from `python -X importtime`) of each statement.
+"""
+
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+DEFAULT_STATEMENTS = [
+    "import knowledge_storm",
+    "from knowledge_storm import OpenAIModel, YouRM",
+    "from knowledge_storm import STORMWikiRunner",
+    "from knowledge_storm import VectorRM",
+    "from knowledge_storm import CoStormRunner",
+]
+
+
+def time_statement(statement: str) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(statement: str, top: int):
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in output.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        # Nested imports are indented; only keep top-level entries since their cumulative times overlap.
+        if not module[1:].startswith(" "):
+            rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--statement",
+        action="append",
+        default=None,
+        help="Import statement to measure. Can be given several times.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of fresh interpreters per statement.",
+    )
+    parser.add_argument(
+        "--show-modules",
+        action="store_true",
+        help="Also show the slowest top-level imports of each statement.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of modules shown with --show-modules.",
+    )
+    args = parser.parse_args()
+
+    for statement in args.statement or DEFAULT_STATEMENTS:
+        try:
+            times = [time_statement(statement) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{statement}\n    failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(
+            f"{statement}\n    median {statistics.median(times) * 1000:.0f} ms, "
+            f"min {min(times) * 1000:.0f} ms over {args.runs} runs"
+        )
+        if args.show_modules:
+            for cumulative, module in slowest_modules(statement, args.top):
+                print(f"        {cumulative / 1000:8.1f} ms  {module}")
@@ -12,6 +12,7 @@ args.output_dir/
     topic_name/  # topic_name will follow convention of underscore-connected topic name w/o space and slash
         conversation_log.json           # Log of information-seeking conversation
         raw_search_results.json         # Raw search results from search engine
+        encoded_snippets.npz            # Snippet embeddings reused by article generation reruns
         direct_gen_outline.txt          # Outline directly generated with LLM's parametric knowledge
         storm_gen_outline.txt           # Outline refined with collected information
         url_to_info.json                # Sources that are used in the final article
@@ -23,6 +24,8 @@ import os
 
 from argparse import ArgumentParser
 from knowledge_storm import STORMWikiRunnerArguments, STORMWikiRunner, STORMWikiLMConfigs
+from knowledge_storm.cache import DiskCache, RetrievalCache
+from knowledge_storm.concurrency import set_global_concurrency_limit, set_rate_limit
 from knowledge_storm.lm import OpenAIModel, AzureOpenAIModel
 from knowledge_storm.rm import YouRM, BingSearch, BraveRM, SerperRM, DuckDuckGoSearchRM, TavilySearchRM, SearXNG, AzureAISearch
 from knowledge_storm.utils import load_api_key
@@ -63,12 +66,25 @@ def main(args):
     lm_configs.set_article_gen_lm(article_gen_lm)
     lm_configs.set_article_polish_lm(article_polish_lm)
 
+    if args.lm_rpm or args.lm_tpm:
+        # Every LM call waits for the rate limits of its model instead of running into 429 errors and backing off.
+        for model_name in {gpt_35_model_name, gpt_4_model_name}:
+            set_rate_limit(ModelClass.governor_provider, model_name, rpm=args.lm_rpm, tpm=args.lm_tpm)
+
+    if args.lm_cache_path:
+        # Share one on-disk response cache across all LMs so that reruns do not pay again for identical prompts.
+        lm_configs.set_lm_cache(DiskCache(args.lm_cache_path, read_only=args.lm_cache_read_only))
+
     engine_args = STORMWikiRunnerArguments(
         output_dir=args.output_dir,
         max_conv_turn=args.max_conv_turn,
         max_perspective=args.max_perspective,
         search_top_k=args.search_top_k,
         max_thread_num=args.max_thread_num,
+        speculative_questions=args.speculative_questions,
+        max_turns_without_new_urls=args.max_turns_without_new_urls,
+        query_similarity_threshold=args.query_similarity_threshold,
+        min_turn_novelty=args.min_turn_novelty,
     )
 
     # STORM is a knowledge curation system which consumes information from the retrieval module.
@@ -94,7 +110,33 @@ def main(args):
         case _:
              raise ValueError(f'Invalid retriever: {args.retriever}. Choose either "bing", "you", "brave", "duckduckgo", "serper", "tavily", "searxng", or "azure_ai_search"')
 
+    if args.page_cache_path and hasattr(rm, 'webpage_helper'):
+        # Fetched pages are revalidated with ETag/Last-Modified instead of being downloaded and extracted again.
+        rm.webpage_helper.page_cache = DiskCache(
+            args.page_cache_path, max_size_bytes=int(args.page_cache_max_size_gb * 1024**3)
+        )
+
     runner = STORMWikiRunner(engine_args, lm_configs, rm)
+    if args.rm_cache_path:
+        # Identical search queries (across personas, topics and reruns) are served from the cache.
+        runner.retriever.set_cache(
+            RetrievalCache(disk_cache=DiskCache(args.rm_cache_path), ttl=args.rm_cache_ttl)
+        )
+
+    if args.topics_file:
+        # Batch mode: all topics share the runner (and its caches) under one global budget of in-flight LM/RM calls.
+        set_global_concurrency_limit(args.max_concurrency)
+        runner.batch_run(
+            args.topics_file,
+            max_concurrent_topics=args.max_concurrent_topics,
+            do_research=args.do_research,
+            do_generate_outline=args.do_generate_outline,
+            do_generate_article=args.do_generate_article,
+            do_polish_article=args.do_polish_article,
+            resume=args.resume,
+        )
+        runner.summary()
+        return
 
     topic = input('Topic: ')
     runner.run(
@@ -103,6 +145,7 @@ def main(args):
         do_generate_outline=args.do_generate_outline,
         do_generate_article=args.do_generate_article,
         do_polish_article=args.do_polish_article,
+        resume=args.resume,
     )
     runner.post_run()
     runner.summary()
@@ -117,6 +160,30 @@ if __name__ == '__main__':
                         help='Maximum number of threads to use. The information seeking part and the article generation'
                              'part can speed up by using multiple threads. Consider reducing it if keep getting '
                              '"Exceed rate limit" error when calling LM API.')
+    parser.add_argument('--lm-cache-path', type=str, default=None,
+                        help='If set, cache LM responses in this SQLite file and reuse them across runs.')
+    parser.add_argument('--lm-cache-read-only', action='store_true',
+                        help='If True, only replay responses already in the LM cache without writing new ones.')
+    parser.add_argument('--rm-cache-path', type=str, default=None,
+                        help='If set, cache search results in this SQLite file and reuse them across runs.')
+    parser.add_argument('--rm-cache-ttl', type=float, default=7 * 24 * 3600,
+                        help='Time-to-live of cached search results in seconds.')
+    parser.add_argument('--page-cache-path', type=str, default=None,
+                        help='If set, cache fetched web pages (extracted text and snippets) in this SQLite file.')
+    parser.add_argument('--page-cache-max-size-gb', type=float, default=2,
+                        help='Maximum size of the page cache in GB; least recently used pages are evicted.')
+    parser.add_argument('--topics-file', type=str, default=None,
+                        help='If set, run in batch mode over the topics in this file (JSONL with a "topic" and an '
+                             'optional "ground_truth_url" field per line, or one topic per line) instead of '
+                             'asking for a single topic.')
+    parser.add_argument('--max-concurrent-topics', type=int, default=8,
+                        help='Maximum number of topics processed at the same time in batch mode.')
+    parser.add_argument('--max-concurrency', type=int, default=32,
+                        help='Maximum number of LM/RM calls in flight across all topics in batch mode.')
+    parser.add_argument('--lm-rpm', type=float, default=None,
+                        help='If set, limit the requests per minute sent to each LM model.')
+    parser.add_argument('--lm-tpm', type=float, default=None,
+                        help='If set, limit the tokens per minute (prompt + completion) sent to each LM model.')
     parser.add_argument('--retriever', type=str, choices=['bing', 'you', 'brave', 'serper', 'duckduckgo', 'tavily', 'searxng', 'azure_ai_search'],
                         help='The search engine API to use for retrieving information.')
     # stage of the pipeline
@@ -129,6 +196,9 @@ if __name__ == '__main__':
     parser.add_argument('--do-polish-article', action='store_true',
                         help='If True, polish the article by adding a summarization section and (optionally) removing '
                              'duplicate content.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from the stage outputs and checkpoints in the output '
+                             'directory instead of starting over.')
     # hyperparameters for the pre-writing stage
     parser.add_argument('--max-conv-turn', type=int, default=3,
                         help='Maximum number of questions in conversational question asking.')
@@ -136,6 +206,16 @@ if __name__ == '__main__':
                         help='Maximum number of perspectives to consider in perspective-guided question asking.')
     parser.add_argument('--search-top-k', type=int, default=3,
                         help='Top k search results to consider for each search query.')
+    parser.add_argument('--speculative-questions', action='store_true',
+                        help='Ask the next question while the current one is being searched and answered.')
+    parser.add_argument('--max-turns-without-new-urls', type=int, default=None,
+                        help='Stop a conversation after this many consecutive turns that find no new URLs.')
+    parser.add_argument('--query-similarity-threshold', type=float, default=None,
+                        help='Reuse the results of an earlier query of any persona if a query is at least this '
+                             'similar to it (cosine similarity of query embeddings, e.g. 0.9).')
+    parser.add_argument('--min-turn-novelty', type=float, default=None,
+                        help='Stop a persona\'s conversation once a turn finds less than this fraction of new '
+                             'URL/snippet pairs (e.g. 0.2).')
     # hyperparameters for the writing stage
     parser.add_argument('--retrieve-top-k', type=int, default=3,
                         help='Top k collected references for each section title.')
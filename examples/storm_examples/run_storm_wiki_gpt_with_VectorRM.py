@@ -95,6 +95,10 @@ def main(args):
             'collection_name': args.collection_name,
             'embedding_model': args.embedding_model,
             'device': args.device,
+            'sync': args.sync_vector_store,
+            'on_disk': args.on_disk_vectors,
+            'quantization': args.quantization,
+            'sparse_index_path': args.sparse_index_path,
         }
         if args.vector_db_mode == 'offline':
             QdrantVectorStoreManager.create_or_update_vector_store(
@@ -109,7 +113,8 @@ def main(args):
             )
 
     # Setup VectorRM to retrieve information from your own data
-    rm = VectorRM(collection_name=args.collection_name, embedding_model=args.embedding_model, device=args.device, k=engine_args.search_top_k)
+    rm = VectorRM(collection_name=args.collection_name, embedding_model=args.embedding_model, device=args.device, k=engine_args.search_top_k,
+                  hnsw_ef=args.hnsw_ef, sparse_index_path=args.sparse_index_path)
 
     # initialize the vector store, either online (store the db on Qdrant server) or offline (store the db locally):
     if args.vector_db_mode == 'offline':
@@ -160,6 +165,17 @@ if __name__ == "__main__":
                              'content, title, url, and description columns.')
     parser.add_argument('--embed-batch-size', type=int, default=64,
                         help='Batch size for embedding the documents in the csv file.')
+    parser.add_argument('--sync-vector-store', action='store_true',
+                        help='If True, also delete chunks of documents that were changed or removed from the csv file.')
+    parser.add_argument('--on-disk-vectors', action='store_true',
+                        help='If True, keep the original vectors on disk instead of in RAM when creating the collection.')
+    parser.add_argument('--quantization', type=str, choices=['scalar', 'product'], default=None,
+                        help='Quantization of the in-RAM search vectors when creating the collection.')
+    parser.add_argument('--sparse-index-path', type=str, default=None,
+                        help='If set, build a BM25 keyword index at this path during ingestion and retrieve in hybrid '
+                             '(BM25 + dense) mode.')
+    parser.add_argument('--hnsw-ef', type=int, default=None,
+                        help='Size of the HNSW candidate list at search time; larger is more accurate and slower.')
     # stage of the pipeline
     parser.add_argument('--do-research', action='store_true',
                         help='If True, simulate conversation to research the topic; otherwise, load the results.')
@@ -1,10 +1,238 @@
-from .storm_wiki import *
-from .collaborative_storm import *
-from .encoder import *
-from .interface import *
-from .lm import *
-from .rm import *
-from .utils import *
-from .dataclass import *
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "1.0.1"
+
+# Public names and the submodule that defines them. Submodules are imported on first access (PEP 562), so that e.g.
+# `from knowledge_storm import OpenAIModel` does not pull in the vector store, web scraping or Co-STORM dependencies.
+# When a name is defined in several submodules, the later entry wins (same as the former star imports).
+_import_structure = {
+    "storm_wiki.engine": [
+        "STORMWikiLMConfigs",
+        "STORMWikiRunnerArguments",
+        "STORMWikiRunner",
+    ],
+    "storm_wiki.modules.knowledge_curation": [
+        "ConvSimulator",
+        "WikiWriter",
+        "AskQuestion",
+        "AskQuestionWithPersona",
+        "TopicExpert",
+        "StormKnowledgeCurationModule",
+    ],
+    "storm_wiki.modules.persona_generator": [
+        "get_wiki_page_title_and_toc",
+        "FindRelatedTopic",
+        "GenPersona",
+        "CreateWriterWithPersona",
+        "StormPersonaGenerator",
+    ],
+    "storm_wiki.modules.outline_generation": [
+        "WritePageOutline",
+        "StormOutlineGenerationModule",
+    ],
+    "storm_wiki.modules.article_generation": ["StormArticleGenerationModule"],
+    "storm_wiki.modules.article_polish": ["StormArticlePolishingModule"],
+    "storm_wiki.modules.retriever": [
+        "GENERALLY_UNRELIABLE",
+        "DEPRECATED",
+        "BLACKLISTED",
+        "SourcePolicy",
+        "is_valid_wikipedia_source",
+    ],
+    "storm_wiki.modules.storm_dataclass": [
+        "DialogueTurn",
+        "StormInformationTable",
+        "ResearchBlackboard",
+        "StormCheckpoint",
+        "StormArticle",
+    ],
+    "collaborative_storm.modules.callback": [
+        "BaseCallbackHandler",
+        "LocalConsolePrintCallBackHandler",
+    ],
+    "collaborative_storm.modules.collaborative_storm_utils": [
+        "extract_and_remove_citations",
+        "extract_cited_storm_info",
+        "format_search_results",
+        "keep_first_and_last_paragraph",
+        "separate_citations",
+        "trim_output_after_hint",
+        "clean_up_section",
+    ],
+    "collaborative_storm.modules.article_generation": ["WriteSection"],
+    "collaborative_storm.modules.grounded_question_answering": [
+        "QuestionToQuery",
+        "AnswerQuestion",
+        "AnswerQuestionModule",
+    ],
+    "collaborative_storm.modules.grounded_question_generation": [
+        "ConvertUtteranceStyle",
+        "GroundedQuestionGeneration",
+        "GroundedQuestionGenerationModule",
+    ],
+    "collaborative_storm.modules.information_insertion_module": [
+        "InsertInformation",
+        "InsertInformationCandidateChoice",
+        "InsertInformationModule",
+        "ExpandSection",
+        "ExpandNodeModule",
+    ],
+    "collaborative_storm.modules.simulate_user": ["GenSimulatedUserUtterance"],
+    "collaborative_storm.modules.warmstart_hierarchical_chat": [
+        "AP",
+        "WarmStartModerator",
+        "SectionToConvTranscript",
+        "ReportToConversation",
+        "WarmStartConversation",
+        "GenerateWarmStartOutline",
+        "GenerateWarmStartOutlineModule",
+        "WarmStartModule",
+    ],
+    "collaborative_storm.modules.knowledge_base_summary": [
+        "KnowledgeBaseSummmary",
+        "KnowledgeBaseSummaryModule",
+    ],
+    "collaborative_storm.modules.costorm_expert_utterance_generator": [
+        "GenExpertActionPlanning",
+        "CoStormExpertUtteranceGenerationModule",
+    ],
+    "collaborative_storm.modules.expert_generation": ["GenerateExpertModule"],
+    "collaborative_storm.modules.co_storm_agents": [
+        "CoStormExpert",
+        "SimulatedUser",
+        "Moderator",
+        "PureRAGAgent",
+    ],
+    "collaborative_storm.engine": [
+        "collaborative_storm_utils",
+        "CollaborativeStormLMConfigs",
+        "RunnerArgument",
+        "TurnPolicySpec",
+        "DiscourseManager",
+        "CoStormRunner",
+    ],
+    "cache": ["make_cache_key", "DiskCache", "RetrievalCache", "EmbeddingStore"],
+    "concurrency": [
+        "ConcurrencyLimiter",
+        "global_limiter",
+        "set_global_concurrency_limit",
+        "UsageScope",
+        "get_usage_scope",
+        "usage_scope",
+        "SingleFlight",
+        "is_rate_limit_error",
+        "TokenBucket",
+        "GovernorLease",
+        "RateGovernor",
+        "global_governor",
+        "set_rate_limit",
+    ],
+    "encoder": [
+        "get_sentence_transformer",
+        "EmbeddingModel",
+        "OpenAIEmbeddingModel",
+        "TogetherEmbeddingModel",
+        "AzureOpenAIEmbeddingModel",
+        "LocalEmbeddingModel",
+        "get_embedding_model",
+        "get_text_embeddings",
+    ],
+    "interface": [
+        "InformationTable",
+        "Information",
+        "ArticleSectionNode",
+        "Article",
+        "Retriever",
+        "KnowledgeCurationModule",
+        "OutlineGenerationModule",
+        "ArticleGenerationModule",
+        "ArticlePolishingModule",
+        "log_execution_time",
+        "LMConfigs",
+        "Engine",
+        "Agent",
+    ],
+    "lm": [
+        "ScopedHistoryMixin",
+        "LMCacheMixin",
+        "cache_completions",
+        "governed_request",
+        "OpenAIModel",
+        "DeepSeekModel",
+        "AzureOpenAIModel",
+        "GroqModel",
+        "ClaudeModel",
+        "VLLMClient",
+        "OllamaClient",
+        "TGIClient",
+        "TogetherClient",
+        "GoogleModel",
+    ],
+    "rm": [
+        "YouRM",
+        "BingSearch",
+        "VectorRM",
+        "StanfordOvalArxivRM",
+        "SerperRM",
+        "BraveRM",
+        "SearXNG",
+        "DuckDuckGoSearchRM",
+        "TavilySearchRM",
+        "GoogleSearch",
+        "AzureAISearch",
+    ],
+    "utils": [
+        "truncate_filename",
+        "load_api_key",
+        "makeStringRed",
+        "BM25Index",
+        "QdrantVectorStoreManager",
+        "ArticleTextProcessing",
+        "FileIOHelper",
+        "PooledSession",
+        "split_text_into_snippets",
+        "WebPageHelper",
+        "user_input_appropriateness_check",
+        "purpose_appropriateness_check",
+    ],
+    "dataclass": ["ConversationTurn", "KnowledgeNode", "KnowledgeBase"],
+    "logging_wrapper": ["LoggingWrapper"],
+}
+
+_name_to_module = {
+    name: module for module, names in _import_structure.items() for name in names
+}
+_submodules = {module.split(".")[0] for module in _import_structure}
+
+__all__ = list(_name_to_module)
+
+
+def __getattr__(name):
+    if name in _name_to_module:
+        module = importlib.import_module(f".{_name_to_module[name]}", __name__)
+        value = getattr(module, name)
+        # Cache the attribute so that __getattr__ is only called once per name.
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _submodules)
+
+
+if TYPE_CHECKING:
+    from .storm_wiki import *
+    from .collaborative_storm import *
+    from .cache import *
+    from .concurrency import *
+    from .encoder import *
+    from .interface import *
+    from .lm import *
+    from .rm import *
+    from .utils import *
+    from .dataclass import *
+    from .logging_wrapper import *
@@ -0,0 +1,561 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a content-addressed cache key from JSON-serializable parts.
+
+    The parts are serialized with sorted keys so that two dictionaries with the same items always map to
+    the same key regardless of their insertion order. Non-serializable values fall back to `str()`.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """A persistent key-value store backed by SQLite with size-bounded LRU eviction.
+
+    The cache is safe to share between threads and, thanks to SQLite's file locking, between processes
+    that point to the same file. The number of entries and their total size are kept in the database (updated by
+    triggers within each write transaction), so size-based eviction stays exact when several processes write to
+    the same file. Values must be JSON-serializable.
+
+    Usage:
+        cache = DiskCache("cache/lm_cache.db", max_size_bytes=2 * 1024**3)
+        cache.set(key, value)
+        value = cache.get(key)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file. Parent directories are created if needed.
+            max_size_bytes: Upper bound on the total size of stored values. Least recently used entries are
+                evicted once it is exceeded. None means unbounded.
+            max_entries: Upper bound on the number of stored entries. None means unbounded.
+            ttl: Time-to-live of an entry in seconds. Expired entries are treated as misses. None means never expire.
+            read_only: If True, the cache is used in replay mode: lookups are served from the existing file
+                but nothing is written, updated or evicted. A missing file is treated as an empty cache.
+        """
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+        if read_only:
+            self._conn = None
+            if os.path.exists(path):
+                conn = sqlite3.connect(
+                    f"file:{path}?mode=ro",
+                    uri=True,
+                    timeout=60,
+                    check_same_thread=False,
+                )
+                has_table = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+                ).fetchone()
+                if has_table:
+                    self._conn = conn
+                else:
+                    conn.close()
+            return
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)"
+        )
+        # Single-row table with the number of entries and their total size, shared by all processes.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_stats ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), "
+            "num_entries INTEGER NOT NULL, total_size INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_stats "
+            "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN "
+            "UPDATE cache_stats SET num_entries = num_entries + 1, "
+            "total_size = total_size + NEW.size; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN "
+            "UPDATE cache_stats SET total_size = total_size - OLD.size + NEW.size; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN "
+            "UPDATE cache_stats SET num_entries = num_entries - 1, "
+            "total_size = total_size - OLD.size; END"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value stored under `key`, or `default` if it is missing or expired."""
+        if self._conn is None:
+            return default
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.OperationalError as e:
+                logging.error(f"Error occurs when reading from cache {self.path}: {e}")
+                return default
+            if row is None:
+                return default
+            value, created_at = row
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                return default
+            if not self.read_only:
+                self._conn.execute(
+                    "UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        """Store `value` under `key` and evict least recently used entries if the cache is over budget."""
+        if self.read_only:
+            return
+        serialized = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            # Take the write lock up front so that the size checked by _evict includes concurrent writers.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO cache (key, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                    "value = excluded.value, size = excluded.size, "
+                    "created_at = excluded.created_at, last_access = excluded.last_access",
+                    (key, serialized, len(serialized), now, now),
+                )
+                self._evict()
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def delete(self, key: str):
+        if self.read_only:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        if self.read_only:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used entries until the size limits are met.
+
+        Must be called within the write transaction that added the new entry.
+        """
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+        while True:
+            num_entries, total_size = self._conn.execute(
+                "SELECT num_entries, total_size FROM cache_stats"
+            ).fetchone()
+            if self.max_entries is not None and num_entries > self.max_entries:
+                batch = num_entries - self.max_entries
+            elif (
+                self.max_size_bytes is not None
+                and total_size > self.max_size_bytes
+                and num_entries > 0
+            ):
+                # Evict in small batches to amortize the cost of the bookkeeping queries.
+                batch = max(1, min(64, num_entries // 10))
+            else:
+                break
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (batch,),
+            )
+
+    def __len__(self):
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def close(self):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.close()
+
+
+class RetrievalCache:
+    """A two-tier cache for search results: an in-memory LRU in front of an optional persistent `DiskCache`.
+
+    Entries older than `ttl` seconds are treated as misses in both tiers so that stale search results are
+    eventually refreshed. Values are returned as deep copies because callers are free to mutate them.
+
+    Usage:
+        cache = RetrievalCache(max_memory_entries=10000, disk_cache=DiskCache("cache/rm_cache.db"), ttl=7 * 86400)
+        retriever = Retriever(rm=rm, cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_memory_entries: int = 10000,
+        disk_cache: Optional[DiskCache] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_memory_entries: Maximum number of entries kept in the in-memory LRU tier.
+            disk_cache: Optional persistent tier shared across runs and processes.
+            ttl: Time-to-live of an entry in seconds. None means never expire.
+        """
+        self.max_memory_entries = max_memory_entries
+        self.disk_cache = disk_cache
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _set_memory(self, key: str, value: Any, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the value stored under `key`, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+        if self.disk_cache is not None:
+            entry = self.disk_cache.get(key)
+            if entry is not None and not self._is_expired(entry["created_at"]):
+                with self._lock:
+                    self._set_memory(
+                        key, json.dumps(entry["value"]), entry["created_at"]
+                    )
+                    self.disk_hits += 1
+                return entry["value"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        created_at = time.time()
+        # Values are kept serialized in memory so that later mutations by the caller cannot leak into the cache.
+        serialized = json.dumps(value)
+        with self._lock:
+            self._set_memory(key, serialized, created_at)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, {"value": value, "created_at": created_at})
+
+    def get_stats_and_reset(self) -> dict:
+        with self._lock:
+            stats = {
+                "cache_memory_hits": self.memory_hits,
+                "cache_disk_hits": self.disk_hits,
+                "cache_misses": self.misses,
+            }
+            self.memory_hits, self.disk_hits, self.misses = 0, 0, 0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+
+
+class EmbeddingStore:
+    """A persistent, memory-mapped embedding cache that can be used in place of a `Dict[str, np.ndarray]`.
+
+    Embeddings are stored as rows of one contiguous float32 (or float16) matrix file that is memory-mapped, so
+    several sessions and processes on the same host share the same pages instead of each holding its own copy. A
+    SQLite index maps the hash of each text to its row. Once `max_entries` is exceeded, the least recently used rows
+    are freed and reused by later insertions.
+
+    Texts embedded by different models must not share a store; use a separate path or `namespace` per model.
+
+    Usage:
+        store = EmbeddingStore("cache/embeddings", max_entries=1_000_000)
+        knowledge_base = KnowledgeBase(..., embedding_cache=store)
+    """
+
+    _GROWTH_ROWS = 1024
+    # Freed rows are only reused after this many seconds so that concurrent readers never see a reused row.
+    _ROW_REUSE_DELAY = 60
+    _TOUCH_FLUSH_SIZE = 1000
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "float32",
+        max_entries: Optional[int] = None,
+        namespace: str = "",
+    ):
+        """
+        Args:
+            path: Directory holding the index (`index.db`) and the matrix (`embeddings.bin`).
+            dtype: "float32" or "float16". float16 halves disk and memory usage at a small precision cost. Ignored if
+                the store already exists.
+            max_entries: Upper bound on the number of stored embeddings. None means unbounded.
+            namespace: Mixed into the text hash, e.g. the name of the embedding model.
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(
+                f"Unsupported dtype {dtype}. Choose 'float32' or 'float16'."
+            )
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._pending_touches = {}
+        self._matrix = None
+        self._capacity = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._matrix_path = os.path.join(path, "embeddings.bin")
+        self._conn = sqlite3.connect(
+            os.path.join(path, "index.db"),
+            timeout=60,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, key TEXT UNIQUE, "
+            "last_access REAL NOT NULL, freed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS rows_last_access ON rows (last_access)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('dtype', ?)", (dtype,))
+        self.dtype = np.dtype(self._get_meta("dtype"))
+        self.dim = None
+        self._load_dim()
+
+    def _get_meta(self, name: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _load_dim(self):
+        """Read the embedding dimension, which is only known once the first embedding was stored (possibly by
+        another process sharing the store)."""
+        if self.dim is None:
+            dim = self._get_meta("dim")
+            self.dim = int(dim) if dim is not None else None
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def _map_matrix(self):
+        """(Re)map the matrix file, e.g. after it was grown by this or another process."""
+        self._load_dim()
+        if self.dim is None:
+            self._matrix, self._capacity = None, 0
+            return
+        size = (
+            os.path.getsize(self._matrix_path)
+            if os.path.exists(self._matrix_path)
+            else 0
+        )
+        row_bytes = self.dim * self.dtype.itemsize
+        capacity = size // row_bytes
+        if capacity == 0:
+            self._matrix, self._capacity = None, 0
+            return
+        self._matrix = np.memmap(
+            self._matrix_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim)
+        )
+        self._capacity = capacity
+
+    def _ensure_capacity(self, row: int):
+        if row < self._capacity:
+            return
+        self._map_matrix()
+        if row < self._capacity:
+            return
+        new_capacity = max(row + 1, 2 * self._capacity, self._GROWTH_ROWS)
+        self._matrix = None
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * self.dtype.itemsize)
+        self._map_matrix()
+
+    def _lookup_row(self, text: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT row FROM rows WHERE key = ?", (self._key(text),)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def get(self, text: str, default=None) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._lookup_row(text)
+            if row is None:
+                return default
+            if row >= self._capacity:
+                self._map_matrix()
+            embedding = np.array(self._matrix[row], dtype=np.float32)
+            self._pending_touches[row] = time.time()
+            if len(self._pending_touches) >= self._TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+        return embedding
+
+    def __getitem__(self, text: str) -> np.ndarray:
+        embedding = self.get(text)
+        if embedding is None:
+            raise KeyError(text)
+        return embedding
+
+    def __contains__(self, text: str) -> bool:
+        with self._lock:
+            return self._lookup_row(text) is not None
+
+    def __setitem__(self, text: str, embedding: np.ndarray):
+        embedding = np.asarray(embedding).reshape(-1)
+        key = self._key(text)
+        with self._lock:
+            self._load_dim()
+            if self.dim is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (len(embedding),)
+                )
+                self._load_dim()
+            if len(embedding) != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {len(embedding)} does not match the store dimension {self.dim}."
+                )
+            now = time.time()
+            # BEGIN IMMEDIATE serializes row allocation across processes sharing the store.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute(
+                    "SELECT row FROM rows WHERE key = ?", (key,)
+                ).fetchone()
+                if existing is not None:
+                    row = existing[0]
+                else:
+                    free = self._conn.execute(
+                        "SELECT row FROM rows WHERE key IS NULL AND freed_at < ? LIMIT 1",
+                        (now - self._ROW_REUSE_DELAY,),
+                    ).fetchone()
+                    if free is not None:
+                        row = free[0]
+                    else:
+                        row = self._conn.execute(
+                            "SELECT COALESCE(MAX(row) + 1, 0) FROM rows"
+                        ).fetchone()[0]
+                self._ensure_capacity(row)
+                # Write the vector before the index entry becomes visible to other readers. The mapping is shared,
+                # so other processes see the write without an explicit flush.
+                self._matrix[row] = embedding.astype(self.dtype)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rows (row, key, last_access, freed_at) "
+                    "VALUES (?, ?, ?, NULL)",
+                    (row, key, now),
+                )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._flush_touches()
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        num_entries = self._conn.execute(
+            "SELECT COUNT(*) FROM rows WHERE key IS NOT NULL"
+        ).fetchone()[0]
+        if num_entries > self.max_entries:
+            self._conn.execute(
+                "UPDATE rows SET key = NULL, freed_at = ? WHERE row IN ("
+                "SELECT row FROM rows WHERE key IS NOT NULL ORDER BY last_access ASC LIMIT ?)",
+                (time.time(), num_entries - self.max_entries),
+            )
+
+    def _flush_touches(self):
+        if not self._pending_touches:
+            return
+        try:
+            self._conn.executemany(
+                "UPDATE rows SET last_access = ? WHERE row = ? AND key IS NOT NULL",
+                [(t, row) for row, t in self._pending_touches.items()],
+            )
+        except sqlite3.OperationalError as e:
+            logging.error(
+                f"Error occurs when updating embedding store {self.path}: {e}"
+            )
+        self._pending_touches = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM rows WHERE key IS NOT NULL"
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._matrix = None
+            self._conn.close()
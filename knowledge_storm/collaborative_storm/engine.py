@@ -13,7 +13,9 @@ from .modules.co_storm_agents import (
 )
 from .modules.expert_generation import GenerateExpertModule
 from .modules.warmstart_hierarchical_chat import WarmStartModule
+from ..cache import EmbeddingStore
 from ..dataclass import ConversationTurn, KnowledgeBase
+from ..encoder import get_embedding_model
 from ..interface import LMConfigs, Agent
 from ..logging_wrapper import LoggingWrapper
 from ..lm import OpenAIModel, AzureOpenAIModel, TogetherClient
@@ -266,6 +268,13 @@ class RunnerArgument:
         default=False,
         metadata={"help": "If True, switch to rag online baseline mode"},
     )
+    embedding_cache_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": "If set, persist text embeddings in this directory (one subdirectory per embedding model) and share "
+            "them across sessions and topics."
+        },
+    )
 
     def to_dict(self):
         """
@@ -518,10 +527,23 @@ class CoStormRunner:
             self.rm = rm
         self.conversation_history = []
         self.warmstart_conv_archive = []
+        self.embedding_cache = None
+        if self.runner_argument.embedding_cache_dir:
+            # One store per embedding model: embeddings of different models (and dimensions) must not be mixed.
+            encoder_type = os.getenv("ENCODER_API_TYPE")
+            model_name = get_embedding_model(encoder_type).model
+            self.embedding_cache = EmbeddingStore(
+                os.path.join(
+                    self.runner_argument.embedding_cache_dir,
+                    f"{encoder_type}_{model_name}".replace("/", "_"),
+                ),
+                namespace=f"{encoder_type}/{model_name}",
+            )
         self.knowledge_base = KnowledgeBase(
             topic=self.runner_argument.topic,
             knowledge_base_lm=self.lm_config.knowledge_base_lm,
             node_expansion_trigger_count=self.runner_argument.node_expansion_trigger_count,
+            embedding_cache=self.embedding_cache,
         )
         self.discourse_manager = DiscourseManager(
             lm_config=self.lm_config,
@@ -567,6 +589,7 @@ class CoStormRunner:
             data=data["knowledge_base"],
             knowledge_base_lm=costorm_runner.lm_config.knowledge_base_lm,
             node_expansion_trigger_count=costorm_runner.runner_argument.node_expansion_trigger_count,
+            embedding_cache=costorm_runner.embedding_cache,
         )
         return costorm_runner
 
@@ -4,7 +4,6 @@ import re
 import traceback
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Union, Dict, Optional
 
 from .collaborative_storm_utils import trim_output_after_hint
@@ -152,6 +151,8 @@ class InsertInformationModule(dspy.Module):
         question: str,
         query: str,
     ):
+        from sklearn.metrics.pairwise import cosine_similarity
+
         if encoded_outline is not None and encoded_outline.size > 0:
             encoded_query, token_usage = get_text_embeddings(f"{question}, {query}")
             sim = cosine_similarity([encoded_query], encoded_outline)[0]
@@ -0,0 +1,553 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ConcurrencyLimiter:
+    """Process-wide limiter for blocking LM and RM calls issued from asynchronous code.
+
+    The asynchronous execution path (e.g., `STORMWikiRunner.arun`) dispatches every blocking LM/RM call
+    through a single shared thread pool instead of spinning up a new pool in every module. The size of the
+    pool is the maximum number of in-flight calls in the process, no matter how many topics or event loops
+    share it. Calls beyond the limit are queued.
+
+    Usage:
+        limiter = ConcurrencyLimiter(max_concurrency=64)
+        result = await limiter.run(lm, prompt)
+    """
+
+    def __init__(self, max_concurrency: int = 32):
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._lock = threading.Lock()
+        # The limit is enforced by counting running calls rather than by the pool size, so that it also holds while
+        # the calls submitted to a pool replaced by `set_max_concurrency` are draining.
+        self._slots = threading.Condition()
+        self._running = 0
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="storm-limiter",
+                )
+            return self._executor
+
+    def _call(self, func: Callable):
+        with self._slots:
+            while self._running >= self.max_concurrency:
+                self._slots.wait()
+            self._running += 1
+        try:
+            return func()
+        finally:
+            with self._slots:
+                self._running -= 1
+                self._slots.notify()
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """Change the limit. Calls that are already running are not interrupted; queued calls wait until the number of
+        running calls is below the new limit."""
+        with self._lock:
+            with self._slots:
+                self.max_concurrency = max_concurrency
+                self._slots.notify_all()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking callable under the limiter and await its result."""
+        loop = asyncio.get_running_loop()
+        # Run the call in a copy of the caller's context so that context variables (e.g., the `UsageScope` of
+        # the task) are visible in the worker thread.
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            context.run,
+            self._call,
+            functools.partial(func, *args, **kwargs),
+        )
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+global_limiter = ConcurrencyLimiter()
+
+
+def set_global_concurrency_limit(max_concurrency: int):
+    """Set the maximum number of LM/RM calls in flight for the asynchronous execution path."""
+    global_limiter.set_max_concurrency(max_concurrency)
+
+
+class UsageScope:
+    """Token usage, number of queries and call history of the LM and RM calls made within one context.
+
+    Several pipelines that share the same LM and RM objects (e.g., the topics of `STORMWikiRunner.abatch_run`) cannot
+    tell their usage apart from the counters of these objects. Each of them runs in its own scope instead: while a
+    scope is active in a context, the calls made from it are accounted to the scope, including calls dispatched
+    through the `global_limiter`. The LM call history is recorded only in the scope, the counters of the LM and RM
+    objects are still updated.
+
+    Usage:
+        with usage_scope() as scope:
+            ...
+        lm_usage = scope.collect_lm_usage_and_reset()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lm_usage = {}
+        self.lm_history = []
+        self.rm_usage = {}
+        # Execution time and usage per stage, filled in by `Engine` in place of its own attributes.
+        self.time = {}
+        self.lm_cost = {}
+        self.rm_cost = {}
+
+    def record_lm_usage(
+        self, model_name: str, prompt_tokens: int, completion_tokens: int
+    ):
+        with self._lock:
+            usage = self.lm_usage.setdefault(
+                model_name, {"prompt_tokens": 0, "completion_tokens": 0}
+            )
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+
+    def record_lm_history(self, entry: Dict):
+        with self._lock:
+            self.lm_history.append(entry)
+
+    def record_rm_usage(self, rm_name: str, num_queries: int):
+        with self._lock:
+            self.rm_usage[rm_name] = self.rm_usage.get(rm_name, 0) + num_queries
+
+    def collect_lm_usage_and_reset(self) -> Dict:
+        with self._lock:
+            usage, self.lm_usage = self.lm_usage, {}
+        return usage
+
+    def collect_lm_history_and_reset(self) -> list:
+        with self._lock:
+            history, self.lm_history = self.lm_history, []
+        return history
+
+    def collect_rm_usage_and_reset(self) -> Dict:
+        with self._lock:
+            usage, self.rm_usage = self.rm_usage, {}
+        return usage
+
+
+_current_usage_scope = contextvars.ContextVar("storm_usage_scope", default=None)
+
+
+def get_usage_scope() -> Optional[UsageScope]:
+    """Return the `UsageScope` active in the current context, if any."""
+    return _current_usage_scope.get()
+
+
+@contextlib.contextmanager
+def usage_scope():
+    """Account the LM and RM calls made within the block (and the tasks and limiter calls it starts) to a new
+    `UsageScope`."""
+    scope = UsageScope()
+    token = _current_usage_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_usage_scope.reset(token)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one.
+
+    The first caller of a key (the leader) runs the call; callers that arrive with the same key while it is in flight
+    wait for the leader and receive its result or exception instead of issuing the call again. A cache cannot do this
+    since neither call has finished when the second one starts. Once the call has finished, the key is released.
+
+    Usage:
+        flights = SingleFlight()
+        result, shared = flights.do(key, lm, prompt)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def begin(self, key) -> Tuple[concurrent.futures.Future, bool]:
+        """Register interest in `key`. Return the future of the call and whether the caller is its leader.
+
+        The leader must call `finish` exactly once; the other callers wait on the future.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def finish(
+        self,
+        key,
+        future: concurrent.futures.Future,
+        result=None,
+        exception: Optional[BaseException] = None,
+    ):
+        """Release `key` and hand the result (or exception) of the leader to the waiting callers."""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """Run `func(*args, **kwargs)` unless an identical call is in flight.
+
+        Returns:
+            The result and whether it was shared with (i.e., computed by) another caller. Shared results are the same
+            object for all callers; copy them before modifying them in place.
+        """
+        future, is_leader = self.begin(key)
+        if not is_leader:
+            return future.result(), True
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, future, exception=e)
+            raise
+        self.finish(key, future, result=result)
+        return result, False
+
+
+def is_rate_limit_error(e: BaseException) -> bool:
+    """Check whether an exception raised by an API client signals HTTP 429 / quota exhaustion.
+
+    Works without importing the client libraries: it looks at the status code attached to the exception (requests,
+    openai, anthropic, httpx) and at the exception class names (e.g. `openai.RateLimitError`,
+    `google.api_core.exceptions.ResourceExhausted`).
+    """
+    response = getattr(e, "response", None)
+    for status_code in (
+        getattr(e, "status_code", None),
+        getattr(e, "code", None),
+        getattr(response, "status_code", None),
+        getattr(getattr(e, "resp", None), "status", None),
+    ):
+        if status_code == 429 or status_code == "429":
+            return True
+    return any(
+        "RateLimit" in cls.__name__ or cls.__name__ == "ResourceExhausted"
+        for cls in type(e).__mro__
+    )
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute` with a burst size of `capacity`.
+
+    Not thread-safe on its own; `RateGovernor` guards it with the lock of its provider.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` tokens and return the number of seconds to wait before they are available.
+
+        The bucket may go into debt so that concurrent callers queue up behind each other in arrival order.
+        """
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        """Give back (negative `amount`) or take extra tokens once the actual cost of a call is known."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _GovernedEndpoint:
+    """Limits and adaptive state of one (provider, model) pair."""
+
+    def __init__(
+        self,
+        rpm: Optional[float],
+        tpm: Optional[float],
+        max_concurrency: Optional[int],
+        min_concurrency: int,
+    ):
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency or math.inf
+        self.min_concurrency = min_concurrency
+        # Concurrency window adapted with AIMD. It starts at the configured maximum; without a maximum the
+        # endpoint is unbounded until the first rate limit error gives a measurement of what it can sustain.
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.latency_ewma = None
+        self.baseline_latency = None
+        self.latency_samples = 0
+        # Incremented on every decrease of the limit. Only calls started after the last decrease can trigger the
+        # next one, so that a burst of errors from calls that were already in flight counts once (as in TCP).
+        self.epoch = 0
+        self.cond = threading.Condition()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+
+class GovernorLease:
+    """Handle returned by `RateGovernor.acquire` to report what a governed call actually cost."""
+
+    def __init__(self, estimated_tokens: float, queue_wait: float, epoch: int):
+        self.estimated_tokens = estimated_tokens
+        self.epoch = epoch
+        self.queue_wait = queue_wait
+        self.used_tokens = None
+        self.rate_limited = False
+
+    def set_used_tokens(self, tokens: Optional[int]):
+        """Record the token usage reported by the API. Ignored if `tokens` is None."""
+        if tokens is not None:
+            self.used_tokens = tokens
+
+    def check_response(self, response):
+        """Mark the call as rate limited if `response` is an HTTP response with status 429."""
+        if getattr(response, "status_code", None) == 429:
+            self.rate_limited = True
+
+
+class RateGovernor:
+    """Process-wide rate limiter and concurrency governor shared by all LM and RM clients.
+
+    Every governed API call acquires a slot for its (provider, model) pair. A call waits until
+    1) fewer than the current concurrency limit of the pair are in flight, and
+    2) the requests/min and tokens/min token buckets of the pair (if configured) have capacity.
+    The concurrency limit adapts AIMD-style: it grows by about one slot per window of successful calls, is halved
+    when the API answers with a rate limit error, and, with `latency_tolerance`, shrinks slightly when latency climbs
+    well above the best latency observed so far (a sign that the provider is queueing our requests). The time spent
+    waiting for a slot is reported by `get_stats_and_reset()`.
+
+    Existing thread pools (e.g., `max_thread_num`) still bound the parallelism of each module; the governor decides
+    how many of those calls actually hit each provider at the same time.
+
+    Usage:
+        global_governor.configure("openai", "gpt-4o", rpm=500, tpm=30000)
+        with global_governor.acquire("openai", "gpt-4o", tokens=1200) as lease:
+            response = client.create(...)
+            lease.set_used_tokens(response["usage"]["total_tokens"])
+    """
+
+    def __init__(
+        self, min_concurrency: int = 1, latency_tolerance: Optional[float] = None
+    ):
+        """
+        Args:
+            min_concurrency: The concurrency limit never goes below this value.
+            latency_tolerance: Shrink the concurrency limit when the latency moving average exceeds this multiple of
+                the best average observed. Only meaningful when the calls to an endpoint are of similar size, since
+                long generations are slower whatever the load; the baseline is shared by all calls to an endpoint.
+                None (default) disables latency-based adaptation.
+        """
+        self.min_concurrency = min_concurrency
+        self.latency_tolerance = latency_tolerance
+        self._limits = {}
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Set the limits of `provider`. With `model=None`, the limits apply to every model of the provider that
+        has no limits of its own (each model still gets its own buckets, as providers meter models separately).
+        """
+        with self._lock:
+            self._limits[(provider, model)] = (rpm, tpm, max_concurrency)
+            # Recreate the affected endpoints with the new limits on their next use.
+            for key in list(self._endpoints):
+                if key[0] == provider and (model is None or key[1] == model):
+                    del self._endpoints[key]
+
+    def _get_endpoint(self, provider: str, model: Optional[str]) -> _GovernedEndpoint:
+        key = (provider, model)
+        with self._lock:
+            if key not in self._endpoints:
+                rpm, tpm, max_concurrency = self._limits.get(
+                    key, self._limits.get((provider, None), (None, None, None))
+                )
+                self._endpoints[key] = _GovernedEndpoint(
+                    rpm, tpm, max_concurrency, self.min_concurrency
+                )
+            return self._endpoints[key]
+
+    @contextlib.contextmanager
+    def acquire(self, provider: str, model: Optional[str] = None, tokens: float = 0):
+        """Context manager that holds a slot for one API call to `provider`/`model`.
+
+        Args:
+            provider: Name of the API provider, e.g. "openai" or "serper".
+            model: Model or endpoint name, if the provider meters models separately.
+            tokens: Estimated number of tokens of the call, charged to the tokens/min bucket. Call
+                `lease.set_used_tokens()` to correct the estimate once the actual usage is known.
+        """
+        endpoint = self._get_endpoint(provider, model)
+        start = time.monotonic()
+        with endpoint.cond:
+            while endpoint.in_flight >= max(endpoint.limit, self.min_concurrency):
+                endpoint.cond.wait()
+            endpoint.in_flight += 1
+            epoch = endpoint.epoch
+            now = time.monotonic()
+            delay = 0.0
+            if endpoint.request_bucket is not None:
+                delay = endpoint.request_bucket.reserve(1, now)
+            if endpoint.token_bucket is not None and tokens:
+                delay = max(delay, endpoint.token_bucket.reserve(tokens, now))
+        if delay > 0:
+            time.sleep(delay)
+
+        lease = GovernorLease(tokens, time.monotonic() - start, epoch)
+        call_start = time.monotonic()
+        try:
+            yield lease
+        except BaseException as e:
+            lease.rate_limited = lease.rate_limited or is_rate_limit_error(e)
+            raise
+        finally:
+            self._release(endpoint, lease, time.monotonic() - call_start)
+
+    def _release(
+        self, endpoint: _GovernedEndpoint, lease: GovernorLease, latency: float
+    ):
+        with endpoint.cond:
+            now = time.monotonic()
+            endpoint.requests += 1
+            endpoint.queue_wait_total += lease.queue_wait
+            endpoint.queue_wait_max = max(endpoint.queue_wait_max, lease.queue_wait)
+            if endpoint.token_bucket is not None and lease.used_tokens is not None:
+                endpoint.token_bucket.adjust(lease.used_tokens - lease.estimated_tokens)
+
+            if lease.rate_limited:
+                endpoint.rate_limited += 1
+                if lease.epoch == endpoint.epoch:
+                    # Multiplicative decrease from what was actually in flight when the provider pushed back.
+                    self._decrease(
+                        endpoint, min(endpoint.limit, endpoint.in_flight) / 2
+                    )
+                for bucket in (endpoint.request_bucket, endpoint.token_bucket):
+                    if bucket is not None:
+                        bucket.drain(now)
+            else:
+                self._observe_latency(endpoint, lease, latency)
+                if endpoint.limit < endpoint.max_concurrency:
+                    # Additive increase: about one more slot per window of successful calls.
+                    endpoint.limit = min(
+                        endpoint.max_concurrency,
+                        endpoint.limit + 1 / max(endpoint.limit, 1),
+                    )
+
+            endpoint.in_flight -= 1
+            endpoint.cond.notify_all()
+
+    def _decrease(self, endpoint: _GovernedEndpoint, limit: float):
+        endpoint.limit = max(self.min_concurrency, limit)
+        endpoint.epoch += 1
+        # Latency samples from before the decrease do not describe the new limit.
+        endpoint.latency_ewma = None
+        endpoint.latency_samples = 0
+
+    def _observe_latency(
+        self, endpoint: _GovernedEndpoint, lease: GovernorLease, latency: float
+    ):
+        if self.latency_tolerance is None or lease.epoch != endpoint.epoch:
+            return
+        if endpoint.latency_ewma is None:
+            endpoint.latency_ewma = latency
+        else:
+            endpoint.latency_ewma = 0.8 * endpoint.latency_ewma + 0.2 * latency
+        endpoint.latency_samples += 1
+        # Wait for a few samples so that a single fast call does not set an unreachable baseline.
+        if endpoint.latency_samples < 5:
+            return
+        if (
+            endpoint.baseline_latency is None
+            or endpoint.latency_ewma < endpoint.baseline_latency
+        ):
+            endpoint.baseline_latency = endpoint.latency_ewma
+        elif (
+            endpoint.latency_ewma > self.latency_tolerance * endpoint.baseline_latency
+            and endpoint.limit < math.inf
+        ):
+            self._decrease(endpoint, endpoint.limit * 0.9)
+
+    def get_stats_and_reset(self) -> Dict[str, Dict]:
+        """Get the number of calls, rate limit errors, queue wait time (in seconds) and current concurrency limit
+        of every endpoint used since the last call, and reset the counters."""
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        stats = {}
+        for (provider, model), endpoint in endpoints.items():
+            with endpoint.cond:
+                if not endpoint.requests:
+                    continue
+                stats[f"{provider}/{model}" if model else provider] = {
+                    "requests": endpoint.requests,
+                    "rate_limited": endpoint.rate_limited,
+                    "queue_wait_total": endpoint.queue_wait_total,
+                    "queue_wait_avg": endpoint.queue_wait_total / endpoint.requests,
+                    "queue_wait_max": endpoint.queue_wait_max,
+                    "concurrency_limit": (
+                        None if endpoint.limit == math.inf else endpoint.limit
+                    ),
+                }
+                endpoint._reset_stats()
+        return stats
+
+
+global_governor = RateGovernor()
+
+
+def set_rate_limit(
+    provider: str,
+    model: Optional[str] = None,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+):
+    """Set the requests/min, tokens/min and maximum concurrency of `provider` (and `model`) in the global governor."""
+    global_governor.configure(
+        provider, model, rpm=rpm, tpm=tpm, max_concurrency=max_concurrency
+    )
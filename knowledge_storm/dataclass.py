@@ -4,6 +4,7 @@ import re
 import threading
 from typing import Set, Dict, List, Optional, Union, Tuple
 
+from .cache import EmbeddingStore
 from .encoder import get_text_embeddings
 from .interface import Information
 
@@ -117,6 +118,26 @@ class KnowledgeNode:
         self.parent = parent
         self.synthesize_output = synthesize_output
         self.need_regenerate_synthesize_output = need_regenerate_synthesize_output
+        # Incremented on the top-most node whenever the tree structure or a node name changes.
+        self.structure_version = 0
+
+    def mark_structure_changed(self):
+        """
+        Records a change of the tree structure (node added, renamed, moved or removed) on the top-most node so that
+        cached views of the structure (e.g. KnowledgeBase.get_knowledge_base_structure_embedding) get refreshed.
+        """
+        top_node = self
+        while top_node.parent is not None:
+            top_node = top_node.parent
+        top_node.structure_version += 1
+
+    def rename(self, new_name: str):
+        """
+        Renames the node.
+        """
+        if new_name != self.name:
+            self.name = new_name
+            self.mark_structure_changed()
 
     def collect_all_content(self):
         """
@@ -152,6 +173,7 @@ class KnowledgeNode:
                 )
         child_node = KnowledgeNode(name=child_node_name, parent=self)
         self.children.append(child_node)
+        self.mark_structure_changed()
         return child_node
 
     def get_parent(self):
@@ -310,12 +332,15 @@ class KnowledgeBase:
         topic: str,
         knowledge_base_lm: Union[dspy.dsp.LM, dspy.dsp.HFModel],
         node_expansion_trigger_count: int,
+        embedding_cache: Optional[Union[Dict[str, np.ndarray], EmbeddingStore]] = None,
     ):
         """
         Initializes a KnowledgeBase instance.
 
         Args:
             topic (str): The topic of the knowledge base
+            embedding_cache (Optional[Union[Dict[str, np.ndarray], EmbeddingStore]]): Cache of text embeddings. Pass an
+                EmbeddingStore to persist embeddings and share them across sessions; defaults to an in-memory dict.
             expand_node_module (dspy.Module): The module that organize knowledge base in place.
                 The module should accept knowledge base as param. E.g. expand_node_module(self)
             article_generation_module (dspy.Module): The module that generate report from knowledge base.
@@ -348,12 +373,12 @@ class KnowledgeBase:
         self.gen_summary_module = KnowledgeBaseSummaryModule(engine=knowledge_base_lm)
 
         self.root: KnowledgeNode = KnowledgeNode(name="root")
-        self.kb_embedding = {
-            "hash": hash(""),
-            "encoded_structure": np.array([[]]),
-            "structure_string": "",
-        }
-        self.embedding_cache: Dict[str, np.ndarray] = {}
+        # Cached (structure version, embedding matrix, paths) view per root node of
+        # get_knowledge_base_structure_embedding.
+        self._structure_embedding_views: Dict[int, Tuple] = {}
+        self.embedding_cache: Union[Dict[str, np.ndarray], EmbeddingStore] = (
+            embedding_cache if embedding_cache is not None else {}
+        )
         self.info_uuid_to_info_dict: Dict[int, Information] = {}
         self.info_hash_to_uuid_dict: Dict[int, int] = {}
         self._lock = threading.Lock()
@@ -375,11 +400,13 @@ class KnowledgeBase:
         data: Dict,
         knowledge_base_lm: Union[dspy.dsp.LM, dspy.dsp.HFModel],
         node_expansion_trigger_count: int,
+        embedding_cache: Optional[Union[Dict[str, np.ndarray], EmbeddingStore]] = None,
     ):
         knowledge_base = cls(
             topic=data["topic"],
             knowledge_base_lm=knowledge_base_lm,
             node_expansion_trigger_count=node_expansion_trigger_count,
+            embedding_cache=embedding_cache,
         )
         knowledge_base.root = KnowledgeNode.from_dict(data["tree"])
         knowledge_base.info_hash_to_uuid_dict = {
@@ -393,33 +420,90 @@ class KnowledgeBase:
         knowledge_base.info_uuid_to_info_dict = info_uuid_to_info_dict
         return knowledge_base
 
+    def _collect_node_paths(self, root: Optional[KnowledgeNode] = None) -> List[str]:
+        """
+        Returns the " -> " joined path of every node in the same order and format as
+        `get_node_hierarchy_string(include_full_path=True, root=root)`. Paths are built incrementally from the parent
+        path instead of walking up from every node.
+        """
+        paths = []
+
+        def _helper(node, parent_path):
+            if root is not None and node.name == root.name:
+                # Same as KnowledgeNode.get_path_from_root, which stops at the first node named like the root.
+                path = [node.name]
+            else:
+                path = parent_path + [node.name]
+            paths.append(" -> ".join(path))
+            for child in node.children:
+                _helper(child, path)
+
+        if root is None:
+            for child in self.root.children:
+                _helper(child, [self.root.name])
+        else:
+            _helper(root, [])
+        return paths
+
     def get_knowledge_base_structure_embedding(
         self, root: Optional[KnowledgeNode] = None
     ) -> Tuple[np.ndarray, List[str]]:
-        outline_string = self.get_node_hierarchy_string(
-            include_indent=False,
-            include_full_path=True,
-            include_hash_tag=False,
-            root=root,
-        )
-        outline_string_hash = hash(outline_string)
-        if outline_string_hash != self.kb_embedding["hash"]:
-            outline_strings: List[str] = outline_string.split("\n")
-            cleaned_outline_strings = [
-                outline.replace(" -> ", ", ") for outline in outline_strings
-            ]
-            encoded_outline, _ = get_text_embeddings(
-                cleaned_outline_strings, embedding_cache=self.embedding_cache
+        """
+        Returns the embedding matrix of all node paths under `root` (the whole knowledge base if None) together with the
+        paths. The view is cached and only recomputed after the structure changes; on recomputation, rows of paths
+        that already existed are reused and only new paths are embedded.
+        """
+        view_root = self.root if root is None else root
+        top_node = view_root
+        while top_node.parent is not None:
+            top_node = top_node.parent
+        view_key = id(view_root) if root is not None else None
+        view = self._structure_embedding_views.get(view_key)
+        if (
+            view is not None
+            and view[0] is view_root
+            and view[1] == top_node.structure_version
+        ):
+            return view[2], view[3]
+
+        paths = self._collect_node_paths(root=root)
+        old_path_to_row = {}
+        old_encoded = None
+        if view is not None and view[0] is view_root and len(view[3]) > 0:
+            old_encoded = view[2]
+            old_path_to_row = {path: row for row, path in enumerate(view[3])}
+        new_paths = [
+            path for path in dict.fromkeys(paths) if path not in old_path_to_row
+        ]
+        new_path_to_row = {}
+        new_encoded = None
+        if new_paths:
+            new_encoded, _ = get_text_embeddings(
+                [path.replace(" -> ", ", ") for path in new_paths],
+                embedding_cache=self.embedding_cache,
             )
-            self.kb_embedding = {
-                "hash": outline_string_hash,
-                "encoded_structure": encoded_outline,
-                "structure_string": outline_strings,
-            }
-        return (
-            self.kb_embedding["encoded_structure"],
-            self.kb_embedding["structure_string"],
+            new_path_to_row = {path: row for row, path in enumerate(new_paths)}
+
+        if paths:
+            encoded_structure = np.array(
+                [
+                    (
+                        old_encoded[old_path_to_row[path]]
+                        if path in old_path_to_row
+                        else new_encoded[new_path_to_row[path]]
+                    )
+                    for path in paths
+                ]
+            )
+        else:
+            encoded_structure = np.array([[]])
+        self._structure_embedding_views[view_key] = (
+            view_root,
+            top_node.structure_version,
+            encoded_structure,
+            paths,
         )
+        return encoded_structure, paths
 
     def traverse_down(self, node):
         """
@@ -730,6 +814,7 @@ class KnowledgeBase:
             after_trim = len(self.get_all_leaf_nodes())
             if before_trim == after_trim:
                 break
+        self.root.mark_structure_changed()
 
     def get_all_leaf_nodes(self):
         """
@@ -769,6 +854,7 @@ class KnowledgeBase:
                     grandchild.parent = node
 
         merge_node(self.root)
+        self.root.mark_structure_changed()
 
     def update_all_info_path(self):
         def _helper(node):
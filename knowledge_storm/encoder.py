@@ -1,21 +1,60 @@
+import logging
 import requests
 import os
+import threading
 from typing import List, Tuple, Union, Optional, Dict, Literal
 import numpy as np
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+_sentence_transformers = {}
+_sentence_transformers_lock = threading.Lock()
+
+
+def get_sentence_transformer(model_name: str = "paraphrase-MiniLM-L6-v2"):
+    """
+    Return a process-wide shared SentenceTransformer for `model_name`.
+
+    Loading a SentenceTransformer takes seconds, so the model is loaded once per process and reused by all callers.
+    SentenceTransformer.encode is safe to call from multiple threads.
+    """
+    with _sentence_transformers_lock:
+        if model_name not in _sentence_transformers:
+            from sentence_transformers import SentenceTransformer
+
+            _sentence_transformers[model_name] = SentenceTransformer(model_name)
+        return _sentence_transformers[model_name]
+
 
 class EmbeddingModel:
+    # Maximum number of texts sent in one embedding request.
+    max_batch_size = 1
+
     def __init__(self):
         pass
 
     def get_embedding(self, text: str) -> Tuple[np.ndarray, int]:
         raise Exception("Not implemented")
 
+    def get_embeddings(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        """Embed a batch of texts. Subclasses that support batch requests should override this."""
+        embeddings, total_tokens = [], 0
+        for text in texts:
+            embedding, tokens = self.get_embedding(text)
+            embeddings.append(embedding)
+            total_tokens += tokens
+        return np.array(embeddings), total_tokens
+
 
 class OpenAIEmbeddingModel(EmbeddingModel):
-    def __init__(self, model: str = "text-embedding-3-small", api_key: str = None):
+    max_batch_size = 256
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: str = None,
+        pool_maxsize: int = 32,
+    ):
         if not api_key:
             api_key = os.getenv("OPENAI_API_KEY")
 
@@ -25,21 +64,34 @@ class OpenAIEmbeddingModel(EmbeddingModel):
             "Authorization": f"Bearer {api_key}",
         }
         self.model = model
+        # Keep-alive connection pool shared by all threads using this model.
+        self.session = requests.Session()
+        self.session.mount(
+            "https://", requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize)
+        )
 
     def get_embedding(self, text: str) -> Tuple[np.ndarray, int]:
-        data = {"input": text, "model": self.model}
+        embeddings, token = self.get_embeddings([text])
+        return embeddings[0], token
+
+    def get_embeddings(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        data = {"input": texts, "model": self.model}
 
-        response = requests.post(self.url, headers=self.headers, json=data)
+        response = self.session.post(self.url, headers=self.headers, json=data)
         if response.status_code == 200:
             data = response.json()
-            embedding = np.array(data["data"][0]["embedding"])
+            # The API returns one item per input with its position in the request.
+            items = sorted(data["data"], key=lambda x: x["index"])
+            embeddings = np.array([item["embedding"] for item in items])
             token = data["usage"]["prompt_tokens"]
-            return embedding, token
+            return embeddings, token
         else:
             response.raise_for_status()
 
 
-class TogetherEmbeddingModel:
+class TogetherEmbeddingModel(EmbeddingModel):
+    max_batch_size = 128
+
     def __init__(self, model: str = "BAAI/bge-large-en-v1.5", api_key: str = None):
         import together
 
@@ -52,8 +104,16 @@ class TogetherEmbeddingModel:
         response = self.together_client.embeddings.create(input=text, model=self.model)
         return response.data[0].embedding, -1
 
+    def get_embeddings(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        response = self.together_client.embeddings.create(input=texts, model=self.model)
+        items = sorted(response.data, key=lambda x: x.index)
+        # Together does not report token usage.
+        return np.array([item.embedding for item in items]), 0
+
+
+class AzureOpenAIEmbeddingModel(EmbeddingModel):
+    max_batch_size = 256
 
-class AzureOpenAIEmbeddingModel:
     def __init__(self, model: str = "text-embedding-3-small", api_key: str = None):
         from openai import AzureOpenAI
 
@@ -74,6 +134,83 @@ class AzureOpenAIEmbeddingModel:
         token = response.usage.prompt_tokens
         return embedding, token
 
+    def get_embeddings(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        response = self.client.embeddings.create(input=texts, model=self.model)
+        items = sorted(response.data, key=lambda x: x.index)
+        embeddings = np.array([item.embedding for item in items])
+        return embeddings, response.usage.prompt_tokens
+
+
+class LocalEmbeddingModel(EmbeddingModel):
+    """Run a sentence-transformers model on the local machine (CPU by default) with batched inference."""
+
+    max_batch_size = 512
+
+    def __init__(
+        self,
+        model: str = "paraphrase-MiniLM-L6-v2",
+        device: str = "cpu",
+        batch_size: int = 64,
+    ):
+        """
+        Args:
+            model: Name or path of the sentence-transformers model. The model is shared with other users of the same
+                model in the process (e.g., StormInformationTable).
+            device: Device passed to `SentenceTransformer.encode`.
+            batch_size: Inference batch size.
+        """
+        self.model = model
+        self.device = device
+        self.batch_size = batch_size
+        self.encoder = get_sentence_transformer(model)
+
+    def get_embedding(self, text: str) -> Tuple[np.ndarray, int]:
+        embeddings, token = self.get_embeddings([text])
+        return embeddings[0], token
+
+    def get_embeddings(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        embeddings = self.encoder.encode(
+            texts,
+            batch_size=self.batch_size,
+            device=self.device,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        # No API tokens are consumed by local inference.
+        return embeddings, 0
+
+
+_embedding_models = {}
+_embedding_models_lock = threading.Lock()
+
+
+def get_embedding_model(encoder_type: Optional[str] = None) -> EmbeddingModel:
+    """
+    Return the process-wide embedding model for `encoder_type` (defaults to the ENCODER_API_TYPE env var).
+
+    The model and its HTTP client/connection pool are created once per process and shared by all callers.
+    """
+    encoder_type = encoder_type or os.getenv("ENCODER_API_TYPE")
+    with _embedding_models_lock:
+        if encoder_type not in _embedding_models:
+            if encoder_type and encoder_type == "openai":
+                embedding_model = OpenAIEmbeddingModel()
+            elif encoder_type and encoder_type == "azure":
+                embedding_model = AzureOpenAIEmbeddingModel()
+            elif encoder_type and encoder_type == "together":
+                embedding_model = TogetherEmbeddingModel()
+            elif encoder_type and encoder_type == "local":
+                embedding_model = LocalEmbeddingModel(
+                    model=os.getenv("LOCAL_ENCODER_MODEL", "paraphrase-MiniLM-L6-v2"),
+                    device=os.getenv("LOCAL_ENCODER_DEVICE", "cpu"),
+                )
+            else:
+                raise Exception(
+                    "No valid encoder type is provided. Check <repo root>/secrets.toml for the field ENCODER_API_TYPE"
+                )
+            _embedding_models[encoder_type] = embedding_model
+        return _embedding_models[encoder_type]
+
 
 def get_text_embeddings(
     texts: Union[str, List[str]],
@@ -81,64 +218,65 @@ def get_text_embeddings(
     embedding_cache: Optional[Dict[str, np.ndarray]] = None,
 ) -> Tuple[np.ndarray, int]:
     """
-    Get text embeddings using OpenAI's text-embedding-3-small model.
+    Get text embeddings using the embedding model selected by the ENCODER_API_TYPE env var.
+
+    Identical texts and texts already in `embedding_cache` are embedded only once. The remaining texts are sent in
+    batch requests of up to `max_batch_size` inputs of the embedding model, and the batches run in parallel.
 
     Args:
         texts (Union[str, List[str]]): A single text string or a list of text strings to embed.
-        max_workers (int): The maximum number of workers for parallel processing.
-        api_key (str): The API key for accessing OpenAI's services.
-        embedding_cache (Optional[Dict[str, np.ndarray]]): A cache to store previously computed embeddings.
+        max_workers (int): The maximum number of batch requests in flight.
+        embedding_cache (Optional[Dict[str, np.ndarray]]): A cache to store previously computed embeddings. Any
+            dict-like object with `get` and item assignment works, e.g. `EmbeddingStore`.
 
     Returns:
-        Tuple[np.ndarray, int]: The 2D array of embeddings and the total token usage.
+        Tuple[np.ndarray, int]: The 2D array of embeddings (in the order of the input texts) and the total token usage.
     """
-    embedding_model = None
-    encoder_type = os.getenv("ENCODER_API_TYPE")
-    if encoder_type and encoder_type == "openai":
-        embedding_model = OpenAIEmbeddingModel()
-    elif encoder_type and encoder_type == "azure":
-        embedding_model = AzureOpenAIEmbeddingModel()
-    elif encoder_type == encoder_type == "together":
-        embedding_model = TogetherEmbeddingModel()
-    else:
-        raise Exception(
-            "No valid encoder type is provided. Check <repo root>/secrets.toml for the field ENCODER_API_TYPE"
-        )
-
-    def fetch_embedding(text: str) -> Tuple[str, np.ndarray, int]:
-        if embedding_cache is not None and text in embedding_cache:
-            return (
-                text,
-                embedding_cache[text],
-                0,
-            )  # Returning 0 tokens since no API call is made
-        embedding, token_usage = embedding_model.get_embedding(text)
-        return text, embedding, token_usage
+    embedding_model = get_embedding_model()
 
     if isinstance(texts, str):
-        _, embedding, tokens = fetch_embedding(texts)
+        cached = embedding_cache.get(texts) if embedding_cache is not None else None
+        if cached is not None:
+            # Returning 0 tokens since no API call is made
+            return np.array(cached), 0
+        embedding, tokens = embedding_model.get_embedding(texts)
         return np.array(embedding), tokens
 
-    embeddings = []
-    total_tokens = 0
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(fetch_embedding, text): text for text in texts}
+    text_to_embedding = {}
+    texts_to_embed = []
+    for text in dict.fromkeys(texts):
+        # `get` instead of `in` + `[]` so that a persistent cache (e.g. EmbeddingStore) needs a single lookup.
+        cached = embedding_cache.get(text) if embedding_cache is not None else None
+        if cached is not None:
+            text_to_embedding[text] = cached
+        else:
+            texts_to_embed.append(text)
 
-        for future in as_completed(futures):
-            try:
-                text, embedding, tokens = future.result()
-                embeddings.append((text, embedding, tokens))
+    batch_size = max(1, embedding_model.max_batch_size)
+    batches = [
+        texts_to_embed[i : i + batch_size]
+        for i in range(0, len(texts_to_embed), batch_size)
+    ]
+    total_tokens = 0
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            futures = {
+                executor.submit(embedding_model.get_embeddings, batch): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    embeddings, tokens = future.result()
+                except Exception as e:
+                    logging.error(
+                        f"Error occurs when embedding a batch of {len(batch)} texts: {e}"
+                    )
+                    raise
                 total_tokens += tokens
-            except Exception as e:
-                print(f"An error occurred for text: {futures[future]}")
-                print(e)
-
-    # Sort results to match the order of the input texts
-    embeddings.sort(key=lambda x: texts.index(x[0]))
-    if embedding_cache is not None:
-        for text, embedding, _ in embeddings:
-            embedding_cache[text] = embedding
-    embeddings = [result[1] for result in embeddings]
-
-    return np.array(embeddings), total_tokens
+                for text, embedding in zip(batch, embeddings):
+                    text_to_embedding[text] = embedding
+                    if embedding_cache is not None:
+                        embedding_cache[text] = embedding
+
+    return np.array([text_to_embedding[text] for text in texts]), total_tokens
@@ -1,14 +1,25 @@
+import asyncio
 import concurrent.futures
+import copy
 import dspy
 import functools
 import hashlib
+import inspect
 import json
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from typing import Dict, List, Optional, Union, TYPE_CHECKING
 
+from .cache import RetrievalCache, make_cache_key
+from .concurrency import (
+    SingleFlight,
+    get_usage_scope,
+    global_governor,
+    global_limiter,
+)
 from .utils import ArticleTextProcessing
 
 logging.basicConfig(
@@ -257,6 +268,67 @@ class Article(ABC):
             return node
 
 
+# RM attributes that change which results a query returns (index, endpoint, search options). RMs with other settings
+# that matter can define a `cache_namespace` property instead.
+_RM_CONFIG_ATTRIBUTES = (
+    "collection_name",
+    "search_params",
+    "sparse_index",
+    "hybrid_candidates",
+    "rrf_k",
+    "endpoint",
+    "params",
+    "search_url",
+    "query_params",
+    "searxng_api_url",
+    "google_cse_id",
+    "azure_ai_search_url",
+    "azure_ai_search_index_name",
+    "duck_duck_go_backend",
+    "duck_duck_go_safe_search",
+    "duck_duck_go_region",
+    "include_raw_content",
+)
+
+
+def _describe_callable(func) -> Optional[str]:
+    """Identify a callable by name so that the description is stable across runs."""
+    if func is None:
+        return None
+    namespace = getattr(func, "cache_namespace", None)
+    if namespace is None:
+        namespace = getattr(getattr(func, "__self__", None), "cache_namespace", None)
+    name = getattr(func, "__qualname__", None) or type(func).__qualname__
+    return f"{getattr(func, '__module__', '')}.{name}:{namespace or ''}"
+
+
+def _get_rm_cache_namespace(rm) -> str:
+    """
+    Fingerprint of the configuration of an RM, so that RMs of the same class with different settings (e.g., two
+    `VectorRM` over different collections) do not share cached or in-flight results.
+    """
+    namespace = getattr(rm, "cache_namespace", None)
+    if namespace is not None:
+        return namespace
+    config = {}
+    for attribute in _RM_CONFIG_ATTRIBUTES:
+        value = getattr(rm, attribute, None)
+        if value is not None:
+            # Indexes are identified by their file rather than by the object.
+            config[attribute] = getattr(value, "path", value)
+    return make_cache_key(
+        type(rm).__module__,
+        type(rm).__qualname__,
+        config,
+        _describe_callable(getattr(rm, "is_valid_source", None)),
+    )
+
+
+# Identical searches in flight anywhere in the process. Keys pair the RM instance with the cache key, so that searches
+# are only shared between callers of the same RM.
+_retrieval_single_flight = SingleFlight()
+
+
 class Retriever:
     """
     An abstract base class for retriever modules. It provides a template for retrieving information based on a query.
@@ -264,11 +336,127 @@ class Retriever:
     This class should be extended to implement specific retrieval functionalities.
     Users can design their retriever modules as needed by implementing the retrieve method.
     The retrieval model/search engine used for each part should be declared with a suffix '_rm' in the attribute name.
+
+    An RM that sets `supports_batch_queries = True` and implements `forward_batch(queries, exclude_urls)` (returning
+    one result list per query) receives all queries of a `retrieve` call at once instead of one call per query.
+
+    Concurrent searches for the same query (e.g., two personas issuing the same query at the same moment) share one
+    RM call; the number of coalesced queries is reported by `collect_and_reset_rm_usage()`.
     """
 
-    def __init__(self, rm: dspy.Retrieve, max_thread: int = 1):
+    def __init__(
+        self,
+        rm: dspy.Retrieve,
+        max_thread: int = 1,
+        cache: Optional[RetrievalCache] = None,
+    ):
         self.max_thread = max_thread
         self.rm = rm
+        self.cache = cache
+        self._coalesced_lock = threading.Lock()
+        self.coalesced_queries = 0
+
+    def set_cache(self, cache: Optional[RetrievalCache]):
+        """Attach a query-level search result cache (or detach it with None)."""
+        self.cache = cache
+
+    def _get_cache_key(self, q: str, exclude_urls: List[str]) -> str:
+        return make_cache_key(
+            _get_rm_cache_namespace(self.rm),
+            q,
+            getattr(self.rm, "k", None),
+            getattr(self.rm, "metadata_filter", None),
+            getattr(self.rm, "score_threshold", None),
+            sorted(exclude_urls),
+        )
+
+    def _get_flight_key(self, key: str) -> tuple:
+        return id(self.rm), key
+
+    def _count_coalesced(self, n: int):
+        if n:
+            with self._coalesced_lock:
+                self.coalesced_queries += n
+
+    def _count_rm_usage(self, num_queries: int):
+        scope = get_usage_scope()
+        if scope is not None and num_queries:
+            scope.record_rm_usage(type(self.rm).__name__, num_queries)
+
+    def _search_rm(self, key: str, q: str, exclude_urls: List[str]) -> List[Dict]:
+        retrieved_data_list = self.rm(query_or_queries=[q], exclude_urls=exclude_urls)
+        self._count_rm_usage(1)
+        # RMs return an empty list on errors, so empty results are not cached.
+        if self.cache is not None and retrieved_data_list:
+            self.cache.set(key, retrieved_data_list)
+        return retrieved_data_list
+
+    def _search(self, q: str, exclude_urls: List[str]) -> List[Dict]:
+        key = self._get_cache_key(q, exclude_urls)
+        if self.cache is not None:
+            retrieved_data_list = self.cache.get(key)
+            if retrieved_data_list is not None:
+                return retrieved_data_list
+        retrieved_data_list, shared = _retrieval_single_flight.do(
+            self._get_flight_key(key), self._search_rm, key, q, exclude_urls
+        )
+        if shared:
+            self._count_coalesced(1)
+            # The results are modified in place afterwards, so the callers must not share them.
+            retrieved_data_list = copy.deepcopy(retrieved_data_list)
+        return retrieved_data_list
+
+    def _search_batch(
+        self, queries: List[str], exclude_urls: List[str]
+    ) -> List[List[Dict]]:
+        """Search all queries not found in the cache with a single `forward_batch` call of the RM."""
+        unique_queries = list(dict.fromkeys(queries))
+        query_to_results = {}
+        if self.cache is not None:
+            for q in unique_queries:
+                cached = self.cache.get(self._get_cache_key(q, exclude_urls))
+                if cached is not None:
+                    query_to_results[q] = cached
+        misses = [q for q in unique_queries if q not in query_to_results]
+        # Queries searched by this call, and queries already in flight in another call that are awaited instead.
+        owned, awaited = {}, {}
+        for q in misses:
+            key = self._get_cache_key(q, exclude_urls)
+            future, is_leader = _retrieval_single_flight.begin(
+                self._get_flight_key(key)
+            )
+            (owned if is_leader else awaited)[q] = (key, future)
+        if owned:
+            try:
+                batch_results = dict(
+                    zip(
+                        owned,
+                        self.rm.forward_batch(list(owned), exclude_urls=exclude_urls),
+                    )
+                )
+            except BaseException as e:
+                for key, future in owned.values():
+                    _retrieval_single_flight.finish(
+                        self._get_flight_key(key), future, exception=e
+                    )
+                raise
+            self._count_rm_usage(len(owned))
+            for q, (key, future) in owned.items():
+                query_to_results[q] = batch_results.get(q, [])
+                _retrieval_single_flight.finish(
+                    self._get_flight_key(key), future, result=query_to_results[q]
+                )
+            for q, (key, _) in owned.items():
+                # RMs return an empty list on errors, so empty results are not cached.
+                if self.cache is not None and query_to_results[q]:
+                    self.cache.set(key, query_to_results[q])
+        # Searches of other calls are awaited only after our own are finished, so that two calls waiting for each
+        # other cannot deadlock.
+        for q, (key, future) in awaited.items():
+            query_to_results[q] = future.result()
+        self._count_coalesced(len(awaited))
+        # Each occurrence of a query gets its own copy since the results are modified in place afterwards.
+        return [copy.deepcopy(query_to_results[q]) for q in queries]
 
     def collect_and_reset_rm_usage(self):
         combined_usage = []
@@ -283,36 +471,86 @@ class Retriever:
                 else:
                     name_to_usage[model_name] += query_cnt
 
+        if self.cache is not None:
+            name_to_usage.update(self.cache.get_stats_and_reset())
+        with self._coalesced_lock:
+            # Only reported when it happened, so that runs without concurrency keep the usual usage format.
+            if self.coalesced_queries:
+                name_to_usage["coalesced_queries"] = self.coalesced_queries
+            self.coalesced_queries = 0
+
         return name_to_usage
 
+    def _process_query(self, q: str, exclude_urls: List[str]) -> List[Information]:
+        return self._to_information(q, self._search(q, exclude_urls))
+
+    @staticmethod
+    def _to_information(q: str, retrieved_data_list: List[Dict]) -> List[Information]:
+        local_to_return = []
+        for data in retrieved_data_list:
+            for i in range(len(data["snippets"])):
+                # STORM generate the article with citations. We do not consider multi-hop citations.
+                # Remove citations in the source to avoid confusion.
+                data["snippets"][i] = ArticleTextProcessing.remove_citations(
+                    data["snippets"][i]
+                )
+            storm_info = Information.from_dict(data)
+            storm_info.meta["query"] = q
+            local_to_return.append(storm_info)
+        return local_to_return
+
     def retrieve(
         self, query: Union[str, List[str]], exclude_urls: List[str] = []
     ) -> List[Information]:
         queries = query if isinstance(query, list) else [query]
         to_return = []
 
-        def process_query(q):
-            retrieved_data_list = self.rm(
-                query_or_queries=[q], exclude_urls=exclude_urls
-            )
-            local_to_return = []
-            for data in retrieved_data_list:
-                for i in range(len(data["snippets"])):
-                    # STORM generate the article with citations. We do not consider multi-hop citations.
-                    # Remove citations in the source to avoid confusion.
-                    data["snippets"][i] = ArticleTextProcessing.remove_citations(
-                        data["snippets"][i]
+        if getattr(self.rm, "supports_batch_queries", False):
+            results = [
+                self._to_information(q, retrieved_data_list)
+                for q, retrieved_data_list in zip(
+                    queries, self._search_batch(queries, exclude_urls)
+                )
+            ]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_thread
+            ) as executor:
+                results = list(
+                    executor.map(
+                        lambda q: self._process_query(q, exclude_urls), queries
                     )
-                storm_info = Information.from_dict(data)
-                storm_info.meta["query"] = q
-                local_to_return.append(storm_info)
-            return local_to_return
+                )
 
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.max_thread
-        ) as executor:
-            results = list(executor.map(process_query, queries))
+        for result in results:
+            to_return.extend(result)
 
+        return to_return
+
+    async def aretrieve(
+        self, query: Union[str, List[str]], exclude_urls: List[str] = []
+    ) -> List[Information]:
+        """Asynchronous version of `retrieve`.
+
+        Queries are dispatched through the process-wide `global_limiter` instead of a per-call thread pool.
+        """
+        queries = query if isinstance(query, list) else [query]
+        if getattr(self.rm, "supports_batch_queries", False):
+            batch_results = await global_limiter.run(
+                self._search_batch, queries, exclude_urls
+            )
+            results = [
+                self._to_information(q, retrieved_data_list)
+                for q, retrieved_data_list in zip(queries, batch_results)
+            ]
+        else:
+            results = await asyncio.gather(
+                *[
+                    global_limiter.run(self._process_query, q, exclude_urls)
+                    for q in queries
+                ]
+            )
+        to_return = []
         for result in results:
             to_return.extend(result)
 
@@ -440,6 +678,12 @@ class LMConfigs(ABC):
                     f"Language model for {attr_name} is not initialized. Please call set_{attr_name}()"
                 )
 
+    def set_lm_cache(self, cache):
+        """Attach a shared response cache (e.g., `DiskCache`) to all language models that support caching."""
+        for attr_name in self.__dict__:
+            if "_lm" in attr_name and hasattr(getattr(self, attr_name), "set_cache"):
+                getattr(self, attr_name).set_cache(cache)
+
     def collect_and_reset_lm_history(self):
         history = []
         for attr_name in self.__dict__:
@@ -463,12 +707,11 @@ class LMConfigs(ABC):
                 if model_name not in model_name_to_usage:
                     model_name_to_usage[model_name] = tokens
                 else:
-                    model_name_to_usage[model_name]["prompt_tokens"] += tokens[
-                        "prompt_tokens"
-                    ]
-                    model_name_to_usage[model_name]["completion_tokens"] += tokens[
-                        "completion_tokens"
-                    ]
+                    # Besides prompt/completion tokens, the usage may carry cache hit/miss counters.
+                    for key, value in tokens.items():
+                        model_name_to_usage[model_name][key] = (
+                            model_name_to_usage[model_name].get(key, 0) + value
+                        )
 
         return model_name_to_usage
 
@@ -489,23 +732,47 @@ class Engine(ABC):
         self.time = {}
         self.lm_cost = {}  # Cost of language models measured by in/out tokens.
         self.rm_cost = {}  # Cost of retrievers measured by number of queries.
+        # Calls, rate limit errors and queue wait time per API endpoint, from the process-wide governor.
+        self.rate_limit_stats = {}
 
     def log_execution_time_and_lm_rm_usage(self, func):
         """Decorator to log the execution time, language model usage, and retrieval model usage of a function."""
 
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = time.time()
-            result = func(*args, **kwargs)
+        def log_usage(start_time):
             end_time = time.time()
             execution_time = end_time - start_time
-            self.time[func.__name__] = execution_time
             logger.info(f"{func.__name__} executed in {execution_time:.4f} seconds")
+            scope = get_usage_scope()
+            if scope is not None:
+                # Several pipelines share this engine (see `UsageScope`): only the calls of this one are reported.
+                scope.time[func.__name__] = execution_time
+                scope.lm_cost[func.__name__] = scope.collect_lm_usage_and_reset()
+                scope.rm_cost[func.__name__] = scope.collect_rm_usage_and_reset()
+                return
+            self.time[func.__name__] = execution_time
             self.lm_cost[func.__name__] = self.lm_configs.collect_and_reset_lm_usage()
             if hasattr(self, "retriever"):
                 self.rm_cost[func.__name__] = (
                     self.retriever.collect_and_reset_rm_usage()
                 )
+            self.rate_limit_stats[func.__name__] = global_governor.get_stats_and_reset()
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.time()
+                result = await func(*args, **kwargs)
+                log_usage(start_time)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.time()
+            result = func(*args, **kwargs)
+            log_usage(start_time)
             return result
 
         return wrapper
@@ -515,7 +782,8 @@ class Engine(ABC):
         methods_to_decorate = [
             method_name
             for method_name in dir(self)
-            if callable(getattr(self, method_name)) and method_name.startswith("run_")
+            if callable(getattr(self, method_name))
+            and method_name.startswith(("run_", "arun_"))
         ]
         for method_name in methods_to_decorate:
             original_method = getattr(self, method_name)
@@ -557,10 +825,20 @@ class Engine(ABC):
         for k, v in self.rm_cost.items():
             print(f"{k}: {v}")
 
+        print("***** Queue wait time of API calls: *****")
+        for k, v in self.rate_limit_stats.items():
+            print(f"{k}")
+            for endpoint, stats in v.items():
+                print(
+                    f"    {endpoint}: {stats['requests']} calls, {stats['rate_limited']} rate limited, "
+                    f"waited {stats['queue_wait_total']:.2f} seconds (max {stats['queue_wait_max']:.2f})"
+                )
+
     def reset(self):
         self.time = {}
         self.lm_cost = {}
         self.rm_cost = {}
+        self.rate_limit_stats = {}
 
 
 class Agent(ABC):
@@ -1,8 +1,9 @@
+import functools
 import logging
 import os
 import random
 import threading
-from typing import Optional, Literal, Any
+from typing import Optional, Literal, Any, Tuple
 
 import backoff
 import dspy
@@ -10,29 +11,226 @@ import requests
 from dsp import ERRORS, backoff_hdlr, giveup_hdlr
 from dsp.modules.hf import openai_to_hf
 from dsp.modules.hf_client import send_hftgi_request_v01_wrapped
-from openai import OpenAI
-from transformers import AutoTokenizer
 
-try:
-    from anthropic import RateLimitError
-except ImportError:
-    RateLimitError = None
+from .cache import DiskCache, make_cache_key
+from .concurrency import SingleFlight, get_usage_scope, global_governor
 
 
-class OpenAIModel(dspy.OpenAI):
+def _is_anthropic_rate_limit_error(e: Exception) -> bool:
+    """Check for `anthropic.RateLimitError` without importing anthropic when knowledge_storm is imported."""
+    return any(
+        cls.__name__ == "RateLimitError" and cls.__module__.startswith("anthropic")
+        for cls in type(e).__mro__
+    )
+
+
+def _get_model_name(lm) -> Optional[str]:
+    return (
+        getattr(lm, "model", None) or lm.kwargs.get("model") or lm.kwargs.get("engine")
+    )
+
+
+def _get_token_usage(response) -> Optional[Tuple[int, int]]:
+    """Read the prompt and completion token usage from an API response of any of the supported providers, if it is
+    reported."""
+    if isinstance(response, dict):
+        usage = response.get("usage")
+        if not usage:
+            return None
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        if hasattr(usage, "input_tokens"):
+            return usage.input_tokens, usage.output_tokens
+        return usage.prompt_tokens, usage.completion_tokens
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return usage.prompt_token_count, usage.candidates_token_count
+    return None
+
+
+def governed_request(func):
+    """Decorator for the method of an LM wrapper that sends a single API request, to run it under the global
+    `RateGovernor` (see concurrency.py). It must be applied beneath any `backoff` decorator so that every retry
+    acquires a new slot and a rate limit error shrinks the concurrency of the provider before the retry.
+
+    The provider is the `governor_provider` class attribute of the wrapper. The tokens/min bucket is charged with
+    an estimate of the request size (prompt length / 4 + max_tokens) that is corrected with the reported usage.
+    The reported usage is also accounted to the active `UsageScope`, if any.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, prompt, **kwargs):
+        merged_kwargs = {**self.kwargs, **kwargs}
+        max_tokens = merged_kwargs.get("max_tokens") or merged_kwargs.get(
+            "max_output_tokens", 0
+        )
+        with global_governor.acquire(
+            self.governor_provider,
+            _get_model_name(self),
+            tokens=len(str(prompt)) // 4 + max_tokens,
+        ) as lease:
+            response = func(self, prompt, **kwargs)
+            token_usage = _get_token_usage(response)
+            lease.set_used_tokens(sum(token_usage) if token_usage else None)
+        scope = get_usage_scope()
+        if scope is not None and token_usage is not None:
+            scope.record_lm_usage(_get_model_name(self), *token_usage)
+        return response
+
+    return wrapper
+
+
+class _ScopedHistory(list):
+    """LM call history that records the calls made within a `UsageScope` in the scope instead."""
+
+    def append(self, entry):
+        scope = get_usage_scope()
+        if scope is not None:
+            scope.record_lm_history(entry)
+        else:
+            super().append(entry)
+
+
+class ScopedHistoryMixin:
+    """Makes the `history` of an LM wrapper record the calls made within a `UsageScope` (see concurrency.py) in the
+    scope, so that pipelines sharing the LM concurrently each get their own call history.
+    """
+
+    @property
+    def history(self):
+        return self.__dict__.setdefault("_history", _ScopedHistory())
+
+    @history.setter
+    def history(self, history):
+        self._history = _ScopedHistory(history)
+
+
+# Identical LM calls in flight anywhere in the process. Keys include the class and model name of the LM.
+_lm_single_flight = SingleFlight()
+
+
+class LMCacheMixin(ScopedHistoryMixin):
+    """Adds an optional persistent response cache to an LM wrapper.
+
+    Completions are stored in a `DiskCache` under a key derived from the model name, the prompt and the
+    effective generation kwargs, so the same cache file can be shared by several LM instances, runs and
+    processes. Cache hits do not count towards token usage; hit/miss counters are reported together with
+    the token usage in `get_usage_and_reset()`.
+
+    Concurrent deterministic calls (temperature 0, a single completion) with the same key, e.g. two threads sending
+    a byte-identical prompt at the same moment, are coalesced into one API call whose completions are returned to
+    all of them, with or without a cache. Sampled calls are never coalesced since each caller expects its own
+    sample. The number of coalesced calls is reported as `coalesced_calls` in `get_usage_and_reset()`.
+    """
+
+    def _init_cache(self, cache: Optional[DiskCache] = None):
+        self.cache = cache
+        self._cache_stats_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesce_calls = True
+        self.coalesced_calls = 0
+
+    def set_cache(self, cache: Optional[DiskCache]):
+        """Attach a response cache to the LM (or detach it by passing None)."""
+        self.cache = cache
+
+    def set_coalescing(self, enabled: bool):
+        """Enable or disable coalescing of concurrent identical deterministic calls."""
+        self.coalesce_calls = enabled
+
+    def _can_coalesce(self, kwargs: dict) -> bool:
+        if not self.coalesce_calls:
+            return False
+        merged_kwargs = {**self.kwargs, **kwargs}
+        return merged_kwargs.get("temperature") == 0 and merged_kwargs.get("n", 1) == 1
+
+    def _get_cache_key(self, prompt: str, args: tuple, kwargs: dict) -> str:
+        return make_cache_key(
+            self.__class__.__name__,
+            _get_model_name(self),
+            prompt,
+            args,
+            {**self.kwargs, **kwargs},
+        )
+
+    def _collect_cache_usage_and_reset(self):
+        usage = {}
+        with self._cache_stats_lock:
+            if getattr(self, "cache", None) is not None:
+                usage["cache_hits"] = self.cache_hits
+                usage["cache_misses"] = self.cache_misses
+            # Only reported when it happened, so that runs without concurrency keep the usual usage format.
+            if self.coalesced_calls:
+                usage["coalesced_calls"] = self.coalesced_calls
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.coalesced_calls = 0
+        return usage
+
+
+def cache_completions(func):
+    """Decorator for the `__call__` method of an `LMCacheMixin` subclass to serve completions from its cache and
+    coalesce concurrent identical calls (see `LMCacheMixin`)."""
+
+    def call_and_cache(self, key, prompt, args, kwargs):
+        completions = func(self, prompt, *args, **kwargs)
+        if getattr(self, "cache", None) is not None:
+            with self._cache_stats_lock:
+                self.cache_misses += 1
+            if completions:
+                self.cache.set(key, completions)
+        return completions
+
+    @functools.wraps(func)
+    def wrapper(self, prompt, *args, **kwargs):
+        cache = getattr(self, "cache", None)
+        coalesce = self._can_coalesce(kwargs)
+        if cache is None and not coalesce:
+            return func(self, prompt, *args, **kwargs)
+
+        key = self._get_cache_key(prompt, args, kwargs)
+        if cache is not None:
+            completions = cache.get(key)
+            if completions is not None:
+                with self._cache_stats_lock:
+                    self.cache_hits += 1
+                return completions
+
+        if not coalesce:
+            return call_and_cache(self, key, prompt, args, kwargs)
+        completions, shared = _lm_single_flight.do(
+            key, call_and_cache, self, key, prompt, args, kwargs
+        )
+        if shared:
+            with self._cache_stats_lock:
+                self.coalesced_calls += 1
+            # Each caller gets its own list; the completions themselves are strings.
+            completions = list(completions)
+        return completions
+
+    return wrapper
+
+
+class OpenAIModel(LMCacheMixin, dspy.OpenAI):
     """A wrapper class for dspy.OpenAI."""
 
+    governor_provider = "openai"
+
     def __init__(
         self,
         model: str = "gpt-4o-mini",
         api_key: Optional[str] = None,
         model_type: Literal["chat", "text"] = None,
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         super().__init__(model=model, api_key=api_key, model_type=model_type, **kwargs)
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
 
     def log_usage(self, response):
         """Log the total tokens from the OpenAI API response."""
@@ -42,6 +240,10 @@ class OpenAIModel(dspy.OpenAI):
                 self.prompt_tokens += usage_data.get("prompt_tokens", 0)
                 self.completion_tokens += usage_data.get("completion_tokens", 0)
 
+    @governed_request
+    def basic_request(self, prompt: str, **kwargs):
+        return super().basic_request(prompt, **kwargs)
+
     def get_usage_and_reset(self):
         """Get the total tokens used and reset the token usage."""
         usage = {
@@ -49,6 +251,7 @@ class OpenAIModel(dspy.OpenAI):
             or self.kwargs.get("engine"): {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -56,6 +259,7 @@ class OpenAIModel(dspy.OpenAI):
 
         return usage
 
+    @cache_completions
     def __call__(
         self,
         prompt: str,
@@ -109,20 +313,24 @@ class OpenAIModel(dspy.OpenAI):
         return completions
 
 
-class DeepSeekModel(dspy.OpenAI):
+class DeepSeekModel(LMCacheMixin, dspy.OpenAI):
     """A wrapper class for DeepSeek API, compatible with dspy.OpenAI."""
 
+    governor_provider = "deepseek"
+
     def __init__(
         self,
         model: str = "deepseek-chat",
         api_key: Optional[str] = None,
         api_base: str = "https://api.deepseek.com",
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         super().__init__(model=model, api_key=api_key, api_base=api_base, **kwargs)
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
         self.model = model
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         self.api_base = api_base
@@ -145,6 +353,7 @@ class DeepSeekModel(dspy.OpenAI):
             self.model: {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -158,6 +367,7 @@ class DeepSeekModel(dspy.OpenAI):
         on_backoff=backoff_hdlr,
         giveup=giveup_hdlr,
     )
+    @governed_request
     def _create_completion(self, prompt: str, **kwargs):
         """Create a completion using the DeepSeek API."""
         headers = {
@@ -175,6 +385,7 @@ class DeepSeekModel(dspy.OpenAI):
         response.raise_for_status()
         return response.json()
 
+    @cache_completions
     def __call__(
         self,
         prompt: str,
@@ -204,9 +415,11 @@ class DeepSeekModel(dspy.OpenAI):
         return completions
 
 
-class AzureOpenAIModel(dspy.AzureOpenAI):
+class AzureOpenAIModel(LMCacheMixin, dspy.AzureOpenAI):
     """A wrapper class for dspy.AzureOpenAI."""
 
+    governor_provider = "azure_openai"
+
     def __init__(
         self,
         api_base: Optional[str] = None,
@@ -214,6 +427,7 @@ class AzureOpenAIModel(dspy.AzureOpenAI):
         model: str = "gpt-4o-mini",
         api_key: Optional[str] = None,
         model_type: Literal["chat", "text"] = "chat",
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         super().__init__(
@@ -227,6 +441,7 @@ class AzureOpenAIModel(dspy.AzureOpenAI):
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
 
     def log_usage(self, response):
         """Log the total tokens from the OpenAI API response.
@@ -238,6 +453,10 @@ class AzureOpenAIModel(dspy.AzureOpenAI):
                 self.prompt_tokens += usage_data.get("prompt_tokens", 0)
                 self.completion_tokens += usage_data.get("completion_tokens", 0)
 
+    @governed_request
+    def basic_request(self, prompt: str, **kwargs):
+        return super().basic_request(prompt, **kwargs)
+
     def get_usage_and_reset(self):
         """Get the total tokens used and reset the token usage."""
         usage = {
@@ -245,6 +464,7 @@ class AzureOpenAIModel(dspy.AzureOpenAI):
             or self.kwargs.get("engine"): {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -252,21 +472,29 @@ class AzureOpenAIModel(dspy.AzureOpenAI):
 
         return usage
 
+    @cache_completions
+    def __call__(self, prompt: str, *args, **kwargs):
+        return super().__call__(prompt, *args, **kwargs)
+
 
-class GroqModel(dspy.OpenAI):
+class GroqModel(LMCacheMixin, dspy.OpenAI):
     """A wrapper class for Groq API (https://console.groq.com/), compatible with dspy.OpenAI."""
 
+    governor_provider = "groq"
+
     def __init__(
         self,
         model: str = "llama3-70b-8192",
         api_key: Optional[str] = None,
         api_base: str = "https://api.groq.com/openai/v1",
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         super().__init__(model=model, api_key=api_key, api_base=api_base, **kwargs)
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
         self.model = model
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         self.api_base = api_base
@@ -289,6 +517,7 @@ class GroqModel(dspy.OpenAI):
             self.model: {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -302,6 +531,7 @@ class GroqModel(dspy.OpenAI):
         on_backoff=backoff_hdlr,
         giveup=giveup_hdlr,
     )
+    @governed_request
     def _create_completion(self, prompt: str, **kwargs):
         """Create a completion using the Groq API."""
         headers = {
@@ -338,6 +568,7 @@ class GroqModel(dspy.OpenAI):
         response.raise_for_status()
         return response.json()
 
+    @cache_completions
     def __call__(
         self,
         prompt: str,
@@ -367,14 +598,17 @@ class GroqModel(dspy.OpenAI):
         return completions
 
 
-class ClaudeModel(dspy.dsp.modules.lm.LM):
+class ClaudeModel(LMCacheMixin, dspy.dsp.modules.lm.LM):
     """Copied from dspy/dsp/modules/anthropic.py with the addition of tracking token usage."""
 
+    governor_provider = "anthropic"
+
     def __init__(
         self,
         model: str,
         api_key: Optional[str] = None,
         api_base: Optional[str] = None,
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         super().__init__(model)
@@ -406,6 +640,7 @@ class ClaudeModel(dspy.dsp.modules.lm.LM):
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
 
     def log_usage(self, response):
         """Log the total tokens from the Anthropic API response."""
@@ -421,6 +656,7 @@ class ClaudeModel(dspy.dsp.modules.lm.LM):
             self.model: {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -428,6 +664,7 @@ class ClaudeModel(dspy.dsp.modules.lm.LM):
 
         return usage
 
+    @governed_request
     def basic_request(self, prompt: str, **kwargs):
         raw_kwargs = kwargs
         kwargs = {**self.kwargs, **kwargs}
@@ -463,16 +700,17 @@ class ClaudeModel(dspy.dsp.modules.lm.LM):
 
     @backoff.on_exception(
         backoff.expo,
-        (RateLimitError,),
+        Exception,
         max_time=1000,
         max_tries=8,
         on_backoff=backoff_hdlr,
-        giveup=giveup_hdlr,
+        giveup=lambda e: not _is_anthropic_rate_limit_error(e) or giveup_hdlr(e),
     )
     def request(self, prompt: str, **kwargs):
         """Handles retrieval of completions from Anthropic whilst handling API errors."""
         return self.basic_request(prompt, **kwargs)
 
+    @cache_completions
     def __call__(self, prompt, only_completed=True, return_sorted=False, **kwargs):
         """Retrieves completions from Anthropic.
 
@@ -503,12 +741,14 @@ class ClaudeModel(dspy.dsp.modules.lm.LM):
         return completions
 
 
-class VLLMClient(dspy.dsp.LM):
+class VLLMClient(LMCacheMixin, dspy.dsp.LM):
     """A client compatible with vLLM HTTP server.
 
     vLLM HTTP server is designed to be compatible with the OpenAI API. Use OpenAI client to interact with the server.
     """
 
+    governor_provider = "vllm"
+
     def __init__(
         self,
         model,
@@ -516,9 +756,12 @@ class VLLMClient(dspy.dsp.LM):
         model_type: Literal["chat", "text"] = "text",
         url="http://localhost",
         api_key="null",
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         """Check out https://docs.vllm.ai/en/latest/serving/openai_compatible_server.html for more information."""
+        from openai import OpenAI
+
         super().__init__(model=model)
         # Store additional kwargs for the generate method.
         self.kwargs = {**self.kwargs, **kwargs}
@@ -530,7 +773,9 @@ class VLLMClient(dspy.dsp.LM):
         self.prompt_tokens = 0
         self.completion_tokens = 0
         self._token_usage_lock = threading.Lock()
+        self._init_cache(cache)
 
+    @governed_request
     def basic_request(self, prompt, **kwargs):
         completion = self.client.chat.completions.create(
             **kwargs,
@@ -562,6 +807,7 @@ class VLLMClient(dspy.dsp.LM):
             or self.kwargs.get("engine"): {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -569,6 +815,7 @@ class VLLMClient(dspy.dsp.LM):
 
         return usage
 
+    @cache_completions
     def __call__(self, prompt: str, **kwargs):
         kwargs = {**self.kwargs, **kwargs}
 
@@ -593,9 +840,11 @@ class VLLMClient(dspy.dsp.LM):
         return completions
 
 
-class OllamaClient(dspy.OllamaLocal):
+class OllamaClient(ScopedHistoryMixin, dspy.OllamaLocal):
     """A wrapper class for dspy.OllamaClient."""
 
+    governor_provider = "ollama"
+
     def __init__(self, model, port, url="http://localhost", **kwargs):
         """Copied from dspy/dsp/modules/hf_client.py with the addition of storing additional kwargs."""
         # Check if the URL has 'http://' or 'https://'
@@ -605,8 +854,14 @@ class OllamaClient(dspy.OllamaLocal):
         # Store additional kwargs for the generate method.
         self.kwargs = {**self.kwargs, **kwargs}
 
+    @governed_request
+    def basic_request(self, prompt: str, **kwargs):
+        return super().basic_request(prompt, **kwargs)
+
+
+class TGIClient(ScopedHistoryMixin, dspy.HFClientTGI):
+    governor_provider = "tgi"
 
-class TGIClient(dspy.HFClientTGI):
     def __init__(self, model, port, url, http_request_kwargs=None, **kwargs):
         super().__init__(
             model=model,
@@ -616,6 +871,7 @@ class TGIClient(dspy.HFClientTGI):
             **kwargs,
         )
 
+    @governed_request
     def _generate(self, prompt, **kwargs):
         """Copied from dspy/dsp/modules/hf_client.py with the addition of removing hard-coded parameters."""
         kwargs = {**self.kwargs, **kwargs}
@@ -668,9 +924,11 @@ class TGIClient(dspy.HFClientTGI):
             raise Exception("Received invalid JSON response from server")
 
 
-class TogetherClient(dspy.HFModel):
+class TogetherClient(LMCacheMixin, dspy.HFModel):
     """A wrapper class for dspy.Together."""
 
+    governor_provider = "together"
+
     def __init__(
         self,
         model,
@@ -678,6 +936,7 @@ class TogetherClient(dspy.HFModel):
         apply_tokenizer_chat_template=False,
         hf_tokenizer_name=None,
         model_type: Literal["chat", "text"] = "chat",
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         """Copied from dspy/dsp/modules/hf_client.py with the support of applying tokenizer chat template."""
@@ -702,6 +961,8 @@ class TogetherClient(dspy.HFModel):
         #     self.use_inst_template = True
         self.apply_tokenizer_chat_template = apply_tokenizer_chat_template
         if self.apply_tokenizer_chat_template:
+            from transformers import AutoTokenizer
+
             logging.info("Loading huggingface tokenizer.")
             if hf_tokenizer_name is None:
                 hf_tokenizer_name = self.model
@@ -724,6 +985,7 @@ class TogetherClient(dspy.HFModel):
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
 
     def log_usage(self, response):
         """Log the total tokens from the OpenAI API response."""
@@ -739,6 +1001,7 @@ class TogetherClient(dspy.HFModel):
             self.model: {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -746,12 +1009,17 @@ class TogetherClient(dspy.HFModel):
 
         return usage
 
+    @cache_completions
+    def __call__(self, prompt: str, *args, **kwargs):
+        return super().__call__(prompt, *args, **kwargs)
+
     @backoff.on_exception(
         backoff.expo,
         ERRORS,
         max_time=1000,
         on_backoff=backoff_hdlr,
     )
+    @governed_request
     def _generate(self, prompt, **kwargs):
         kwargs = {**self.kwargs, **kwargs}
 
@@ -817,13 +1085,16 @@ class TogetherClient(dspy.HFModel):
             return response
 
 
-class GoogleModel(dspy.dsp.modules.lm.LM):
+class GoogleModel(LMCacheMixin, dspy.dsp.modules.lm.LM):
     """A wrapper class for Google Gemini API."""
 
+    governor_provider = "google"
+
     def __init__(
         self,
         model: str,
         api_key: Optional[str] = None,
+        cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         """You can use `genai.list_models()` to get a list of available models."""
@@ -867,6 +1138,7 @@ class GoogleModel(dspy.dsp.modules.lm.LM):
         self._token_usage_lock = threading.Lock()
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self._init_cache(cache)
 
     def log_usage(self, response):
         """Log the total tokens from the Google API response."""
@@ -882,6 +1154,7 @@ class GoogleModel(dspy.dsp.modules.lm.LM):
             self.model: {
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                **self._collect_cache_usage_and_reset(),
             }
         }
         self.prompt_tokens = 0
@@ -889,6 +1162,7 @@ class GoogleModel(dspy.dsp.modules.lm.LM):
 
         return usage
 
+    @governed_request
     def basic_request(self, prompt: str, **kwargs):
         raw_kwargs = kwargs
         kwargs = {
@@ -923,6 +1197,7 @@ class GoogleModel(dspy.dsp.modules.lm.LM):
         """Handles retrieval of completions from Google whilst handling API errors"""
         return self.basic_request(prompt, **kwargs)
 
+    @cache_completions
     def __call__(
         self,
         prompt: str,
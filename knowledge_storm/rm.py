@@ -1,21 +1,32 @@
 import logging
 import os
-from typing import Callable, Union, List
+from typing import Callable, Dict, Union, List, Optional, TYPE_CHECKING
 
 import backoff
 import dspy
-import requests
 from dsp import backoff_hdlr, giveup_hdlr
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_qdrant import Qdrant
-from qdrant_client import QdrantClient
+from .cache import DiskCache
+from .concurrency import global_governor
+from .utils import BM25Index, PooledSession, QdrantVectorStoreManager, WebPageHelper
 
-from .utils import WebPageHelper
+# langchain and qdrant_client are only needed by VectorRM and are imported there.
+if TYPE_CHECKING:
+    from qdrant_client import models
 
 
 class YouRM(dspy.Retrieve):
-    def __init__(self, ydc_api_key=None, k=3, is_valid_source: Callable = None):
+    def __init__(
+        self,
+        ydc_api_key=None,
+        k=3,
+        is_valid_source: Callable = None,
+        http_session: Optional[PooledSession] = None,
+    ):
+        """
+        Params:
+            http_session: Keep-alive HTTP session shared by all queries. Defaults to a new PooledSession.
+        """
         super().__init__(k=k)
         if not ydc_api_key and not os.environ.get("YDC_API_KEY"):
             raise RuntimeError(
@@ -25,6 +36,7 @@ class YouRM(dspy.Retrieve):
             self.ydc_api_key = ydc_api_key
         else:
             self.ydc_api_key = os.environ["YDC_API_KEY"]
+        self.http_session = http_session or PooledSession()
         self.usage = 0
 
         # If not None, is_valid_source shall be a function that takes a URL and returns a boolean.
@@ -61,10 +73,13 @@ class YouRM(dspy.Retrieve):
         for query in queries:
             try:
                 headers = {"X-API-Key": self.ydc_api_key}
-                results = requests.get(
+                response = self.http_session.governed_request(
+                    "you",
+                    "GET",
                     f"https://api.ydc-index.io/search?query={query}",
                     headers=headers,
-                ).json()
+                )
+                results = response.json()
 
                 authoritative_results = []
                 for r in results["hits"]:
@@ -89,6 +104,8 @@ class BingSearch(dspy.Retrieve):
         webpage_helper_max_threads=10,
         mkt="en-US",
         language="en",
+        http_session: Optional[PooledSession] = None,
+        page_cache: Optional[DiskCache] = None,
         **kwargs,
     ):
         """
@@ -96,6 +113,8 @@ class BingSearch(dspy.Retrieve):
             min_char_count: Minimum character count for the article to be considered valid.
             snippet_chunk_size: Maximum character count for each snippet.
             webpage_helper_max_threads: Maximum number of threads to use for webpage helper.
+            http_session: Keep-alive HTTP session shared by all queries. Defaults to a new PooledSession.
+            page_cache: Optional persistent cache of fetched pages, see WebPageHelper.
             mkt, language, **kwargs: Bing search API parameters.
             - Reference: https://learn.microsoft.com/en-us/bing/search-apis/bing-web-search/reference/query-parameters
         """
@@ -110,10 +129,12 @@ class BingSearch(dspy.Retrieve):
             self.bing_api_key = os.environ["BING_SEARCH_API_KEY"]
         self.endpoint = "https://api.bing.microsoft.com/v7.0/search"
         self.params = {"mkt": mkt, "setLang": language, "count": k, **kwargs}
+        self.http_session = http_session or PooledSession()
         self.webpage_helper = WebPageHelper(
             min_char_count=min_char_count,
             snippet_chunk_size=snippet_chunk_size,
             max_thread_num=webpage_helper_max_threads,
+            page_cache=page_cache,
         )
         self.usage = 0
 
@@ -154,9 +175,14 @@ class BingSearch(dspy.Retrieve):
 
         for query in queries:
             try:
-                results = requests.get(
-                    self.endpoint, headers=headers, params={**self.params, "q": query}
-                ).json()
+                response = self.http_session.governed_request(
+                    "bing",
+                    "GET",
+                    self.endpoint,
+                    headers=headers,
+                    params={**self.params, "q": query},
+                )
+                results = response.json()
 
                 for d in results["webPages"]["value"]:
                     if self.is_valid_source(d["url"]) and d["url"] not in exclude_urls:
@@ -190,14 +216,33 @@ class VectorRM(dspy.Retrieve):
             documents have different urls.
         - description (optional): The description of the document.
     The documents should be stored in a CSV file.
+
+    VectorRM supports batch queries: all queries of a `Retriever.retrieve` call are embedded in one forward pass of the
+    embedding model and sent to Qdrant in one batch search request.
+
+    `exclude_urls`, the metadata filter and the score threshold are applied by Qdrant during the search, so the top k
+    results only contain usable chunks.
+
+    With `sparse_index_path`, VectorRM runs in hybrid mode: the dense candidates and the BM25 candidates from the
+    keyword index built at ingestion are fused with reciprocal rank fusion (RRF). This helps queries that hinge on exact
+    identifiers, which dense embeddings tend to miss.
     """
 
+    supports_batch_queries = True
+
     def __init__(
         self,
         collection_name: str,
         embedding_model: str,
         device: str = "mps",
         k: int = 3,
+        metadata_filter: Optional[Dict] = None,
+        score_threshold: Optional[float] = None,
+        hnsw_ef: Optional[int] = None,
+        quantization_oversampling: Optional[float] = None,
+        sparse_index_path: Optional[str] = None,
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
     ):
         """
         Params:
@@ -205,7 +250,22 @@ class VectorRM(dspy.Retrieve):
             embedding_model: Name of the Hugging Face embedding model.
             device: Device to run the embeddings model on, can be "mps", "cuda", "cpu".
             k: Number of top chunks to retrieve.
+            metadata_filter: Only retrieve chunks whose metadata match all conditions. Maps a metadata field to a
+                value, a list of accepted values, or a range dict with any of "gt", "gte", "lt", "lte" (numbers, or
+                ISO 8601 strings for dates), e.g. {"label": ["law", "regulation"], "date": {"gte": "2020-01-01"}}.
+                Fields other than title/url/description must be stored with `metadata_columns` at ingestion.
+            score_threshold: Minimum similarity score of a retrieved chunk.
+            hnsw_ef: Size of the candidate list during HNSW search (defaults to the collection's ef_construct).
+                Larger is more accurate and slower.
+            quantization_oversampling: For quantized collections, fetch this many times k candidates with the
+                quantized vectors before rescoring them with the original vectors.
+            sparse_index_path: Path to the BM25 index built by `create_or_update_vector_store`. Enables hybrid mode.
+            hybrid_candidates: Number of dense and of sparse candidates per query that are fused in hybrid mode.
+            rrf_k: Constant of reciprocal rank fusion; a candidate at rank r in a ranking scores 1 / (rrf_k + r).
         """
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from qdrant_client import models
+
         super().__init__(k=k)
         self.usage = 0
         # check if the collection is provided
@@ -224,13 +284,95 @@ class VectorRM(dspy.Retrieve):
         )
 
         self.collection_name = collection_name
+        self.metadata_filter = metadata_filter
+        self.score_threshold = score_threshold
+        self.search_params = None
+        if hnsw_ef is not None or quantization_oversampling is not None:
+            self.search_params = models.SearchParams(
+                hnsw_ef=hnsw_ef,
+                quantization=(
+                    models.QuantizationSearchParams(
+                        rescore=True, oversampling=quantization_oversampling
+                    )
+                    if quantization_oversampling is not None
+                    else None
+                ),
+            )
+        self.sparse_index = BM25Index(sparse_index_path) if sparse_index_path else None
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
         self.client = None
         self.qdrant = None
 
+    @staticmethod
+    def _get_field_condition(key: str, condition) -> "models.FieldCondition":
+        from qdrant_client import models
+
+        if isinstance(condition, dict):
+            if any(isinstance(v, str) for v in condition.values()):
+                return models.FieldCondition(
+                    key=key, range=models.DatetimeRange(**condition)
+                )
+            return models.FieldCondition(key=key, range=models.Range(**condition))
+        if isinstance(condition, (list, tuple, set)):
+            return models.FieldCondition(
+                key=key, match=models.MatchAny(any=list(condition))
+            )
+        return models.FieldCondition(key=key, match=models.MatchValue(value=condition))
+
+    def _get_search_filter(self, exclude_urls: List[str]) -> Optional["models.Filter"]:
+        from qdrant_client import models
+
+        metadata_key = self.qdrant.metadata_payload_key
+        must = [
+            self._get_field_condition(f"{metadata_key}.{field}", condition)
+            for field, condition in (self.metadata_filter or {}).items()
+        ]
+        must_not = []
+        if exclude_urls:
+            must_not.append(
+                models.FieldCondition(
+                    key=f"{metadata_key}.url",
+                    match=models.MatchAny(any=list(exclude_urls)),
+                )
+            )
+        if not must and not must_not:
+            return None
+        return models.Filter(must=must or None, must_not=must_not or None)
+
+    @staticmethod
+    def _get_payload_schema(condition) -> "models.PayloadSchemaType":
+        from qdrant_client import models
+
+        if isinstance(condition, dict):
+            if any(isinstance(v, str) for v in condition.values()):
+                return models.PayloadSchemaType.DATETIME
+            return models.PayloadSchemaType.FLOAT
+        values = condition if isinstance(condition, (list, tuple, set)) else [condition]
+        if all(isinstance(v, bool) for v in values):
+            return models.PayloadSchemaType.BOOL
+        if all(isinstance(v, int) for v in values):
+            return models.PayloadSchemaType.INTEGER
+        return models.PayloadSchemaType.KEYWORD
+
+    def _create_payload_indexes(self):
+        """Index the payload fields used in filters."""
+        from qdrant_client import models
+
+        metadata_key = self.qdrant.metadata_payload_key
+        fields = {f"{metadata_key}.url": models.PayloadSchemaType.KEYWORD}
+        for field, condition in (self.metadata_filter or {}).items():
+            fields[f"{metadata_key}.{field}"] = self._get_payload_schema(condition)
+        QdrantVectorStoreManager.create_payload_indexes(
+            self.client, self.collection_name, fields
+        )
+
     def _check_collection(self):
         """
         Check if the Qdrant collection exists and create it if it does not.
         """
+        from langchain_qdrant import Qdrant
+
         if self.client is None:
             raise ValueError("Qdrant client is not initialized.")
         if self.client.collection_exists(collection_name=f"{self.collection_name}"):
@@ -242,6 +384,7 @@ class VectorRM(dspy.Retrieve):
                 collection_name=self.collection_name,
                 embeddings=self.model,
             )
+            self._create_payload_indexes()
         else:
             raise ValueError(
                 f"Collection {self.collection_name} does not exist. Please create the collection first."
@@ -262,6 +405,8 @@ class VectorRM(dspy.Retrieve):
         if url is None:
             raise ValueError("Please provide a url for the Qdrant server.")
 
+        from qdrant_client import QdrantClient
+
         try:
             self.client = QdrantClient(url=url, api_key=api_key)
             self._check_collection()
@@ -278,6 +423,8 @@ class VectorRM(dspy.Retrieve):
         if vector_store_path is None:
             raise ValueError("Please provide a folder path.")
 
+        from qdrant_client import QdrantClient
+
         try:
             self.client = QdrantClient(path=vector_store_path)
             self._check_collection()
@@ -299,13 +446,115 @@ class VectorRM(dspy.Retrieve):
         """
         return self.qdrant.client.count(collection_name=self.collection_name)
 
+    def forward_batch(
+        self, queries: List[str], exclude_urls: List[str] = []
+    ) -> List[List[Dict]]:
+        """
+        Search in your data for self.k top passages for each query, with one embedding call and one Qdrant request.
+
+        Args:
+            queries (List[str]): The queries to search for.
+            exclude_urls (List[str]): A list of urls to exclude from the search results.
+
+        Returns:
+            a list with one list of Dicts per query, each dict has keys of 'description', 'snippets' (list of
+            strings), 'title', 'url'
+        """
+        from qdrant_client import models
+
+        if not queries:
+            return []
+        self.usage += len(queries)
+        query_vectors = self.model.embed_documents(queries)
+        search_filter = self._get_search_filter(exclude_urls)
+        batch_results = self.client.search_batch(
+            collection_name=self.collection_name,
+            requests=[
+                models.SearchRequest(
+                    vector=vector,
+                    filter=search_filter,
+                    limit=(
+                        self.k
+                        if self.sparse_index is None
+                        else max(self.k, self.hybrid_candidates)
+                    ),
+                    score_threshold=self.score_threshold,
+                    params=self.search_params,
+                    with_payload=True,
+                )
+                for vector in query_vectors
+            ],
+        )
+        if self.sparse_index is None:
+            return [
+                [self._payload_to_result(point.payload) for point in points]
+                for points in batch_results
+            ]
+        return self._fuse_with_sparse(queries, batch_results, search_filter)
+
+    def _payload_to_result(self, payload: Dict) -> Dict:
+        metadata = payload[self.qdrant.metadata_payload_key]
+        return {
+            "description": metadata["description"],
+            "snippets": [payload[self.qdrant.content_payload_key]],
+            "title": metadata["title"],
+            "url": metadata["url"],
+        }
+
+    def _fuse_with_sparse(
+        self,
+        queries: List[str],
+        batch_results: List[List["models.ScoredPoint"]],
+        search_filter: Optional["models.Filter"],
+    ) -> List[List[Dict]]:
+        """Fuse the dense results with BM25 results by reciprocal rank fusion and keep the top k per query."""
+        from qdrant_client import models
+
+        payloads = {}
+        fused_rankings = []
+        for query, points in zip(queries, batch_results):
+            payloads.update({str(point.id): point.payload for point in points})
+            scores = {}
+            for ranking in (
+                [str(point.id) for point in points],
+                self.sparse_index.search(query, self.hybrid_candidates),
+            ):
+                for rank, point_id in enumerate(ranking, start=1):
+                    scores[point_id] = scores.get(point_id, 0) + 1 / (self.rrf_k + rank)
+            fused_rankings.append(sorted(scores, key=scores.get, reverse=True))
+
+        # Fetch the payloads of sparse-only candidates in one request, applying the same filter as the dense search.
+        missing = list(
+            {p for ranking in fused_rankings for p in ranking if p not in payloads}
+        )
+        if missing:
+            records, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=models.Filter(
+                    must=[models.HasIdCondition(has_id=missing)]
+                    + list((search_filter.must if search_filter else None) or []),
+                    must_not=search_filter.must_not if search_filter else None,
+                ),
+                limit=len(missing),
+                with_payload=True,
+                with_vectors=False,
+            )
+            payloads.update({str(record.id): record.payload for record in records})
+
+        return [
+            [self._payload_to_result(payloads[p]) for p in ranking if p in payloads][
+                : self.k
+            ]
+            for ranking in fused_rankings
+        ]
+
     def forward(self, query_or_queries: Union[str, List[str]], exclude_urls: List[str]):
         """
         Search in your data for self.k top passages for query or queries.
 
         Args:
             query_or_queries (Union[str, List[str]]): The query or queries to search for.
-            exclude_urls (List[str]): Dummy parameter to match the interface. Does not have any effect.
+            exclude_urls (List[str]): A list of urls to exclude from the search results.
 
         Returns:
             a list of Dicts, each dict has keys of 'description', 'snippets' (list of strings), 'title', 'url'
@@ -315,20 +564,9 @@ class VectorRM(dspy.Retrieve):
             if isinstance(query_or_queries, str)
             else query_or_queries
         )
-        self.usage += len(queries)
         collected_results = []
-        for query in queries:
-            related_docs = self.qdrant.similarity_search_with_score(query, k=self.k)
-            for i in range(len(related_docs)):
-                doc = related_docs[i][0]
-                collected_results.append(
-                    {
-                        "description": doc.metadata["description"],
-                        "snippets": [doc.page_content],
-                        "title": doc.metadata["title"],
-                        "url": doc.metadata["url"],
-                    }
-                )
+        for results in self.forward_batch(queries, exclude_urls):
+            collected_results.extend(results)
 
         return collected_results
 
@@ -336,9 +574,10 @@ class VectorRM(dspy.Retrieve):
 class StanfordOvalArxivRM(dspy.Retrieve):
     """[Alpha] This retrieval class is for internal use only, not intended for the public."""
 
-    def __init__(self, endpoint, k=3):
+    def __init__(self, endpoint, k=3, http_session: Optional[PooledSession] = None):
         super().__init__(k=k)
         self.endpoint = endpoint
+        self.http_session = http_session or PooledSession()
         self.usage = 0
 
     def get_usage_and_reset(self):
@@ -350,8 +589,12 @@ class StanfordOvalArxivRM(dspy.Retrieve):
     def _retrieve(self, query: str):
         payload = {"query": query, "num_blocks": self.k}
 
-        response = requests.post(
-            self.endpoint, json=payload, headers={"Content-Type": "application/json"}
+        response = self.http_session.governed_request(
+            "stanford_oval_arxiv",
+            "POST",
+            self.endpoint,
+            json=payload,
+            headers={"Content-Type": "application/json"},
         )
 
         # Check if the request was successful
@@ -405,6 +648,8 @@ class SerperRM(dspy.Retrieve):
         min_char_count: int = 150,
         snippet_chunk_size: int = 1000,
         webpage_helper_max_threads=10,
+        http_session: Optional[PooledSession] = None,
+        page_cache: Optional[DiskCache] = None,
     ):
         """Args:
         serper_search_api_key str: API key to run serper, can be found by creating an account on https://serper.dev/
@@ -423,8 +668,11 @@ class SerperRM(dspy.Retrieve):
                 qdr:w str: Date time range for past week.
                 qdr:m str: Date time range for past month.
                 qdr:y str: Date time range for past year.
+        http_session (PooledSession): Keep-alive HTTP session shared by all queries. Defaults to a new PooledSession.
+        page_cache (DiskCache): Optional persistent cache of fetched pages, see WebPageHelper.
         """
         super().__init__(k=k)
+        self.http_session = http_session or PooledSession()
         self.usage = 0
         self.query_params = None
         self.ENABLE_EXTRA_SNIPPET_EXTRACTION = ENABLE_EXTRA_SNIPPET_EXTRACTION
@@ -432,6 +680,7 @@ class SerperRM(dspy.Retrieve):
             min_char_count=min_char_count,
             snippet_chunk_size=snippet_chunk_size,
             max_thread_num=webpage_helper_max_threads,
+            page_cache=page_cache,
         )
 
         if query_params is None:
@@ -461,8 +710,8 @@ class SerperRM(dspy.Retrieve):
             "Content-Type": "application/json",
         }
 
-        response = requests.request(
-            "POST", self.search_url, headers=headers, json=query_params
+        response = self.http_session.governed_request(
+            "serper", "POST", self.search_url, headers=headers, json=query_params
         )
 
         if response == None:
@@ -496,12 +745,13 @@ class SerperRM(dspy.Retrieve):
         )
 
         self.usage += len(queries)
-        self.results = []
+        results = []
         collected_results = []
         for query in queries:
             if query == "Queries:":
                 continue
-            query_params = self.query_params
+            # Copy the parameters so that concurrent calls (e.g., from Retriever threads) do not overwrite each other's query.
+            query_params = dict(self.query_params)
 
             # All available parameters can be found in the playground: https://serper.dev/playground
             # Sets the json value for query to be the query that is being parsed.
@@ -510,15 +760,14 @@ class SerperRM(dspy.Retrieve):
             # Sets the type to be search, can be images, video, places, maps etc that Google provides.
             query_params["type"] = "search"
 
-            self.result = self.serper_runner(query_params)
-            self.results.append(self.result)
+            results.append(self.serper_runner(query_params))
 
         # Array of dictionaries that will be used by Storm to create the jsons
         collected_results = []
 
         if self.ENABLE_EXTRA_SNIPPET_EXTRACTION:
             urls = []
-            for result in self.results:
+            for result in results:
                 organic_results = result.get("organic", [])
                 for organic in organic_results:
                     url = organic.get("link")
@@ -528,7 +777,7 @@ class SerperRM(dspy.Retrieve):
         else:
             valid_url_to_snippets = {}
 
-        for result in self.results:
+        for result in results:
             try:
                 # An array of dictionaries that contains the snippets, title of the document and url that will be used.
                 organic_results = result.get("organic")
@@ -561,8 +810,16 @@ class SerperRM(dspy.Retrieve):
 
 class BraveRM(dspy.Retrieve):
     def __init__(
-        self, brave_search_api_key=None, k=3, is_valid_source: Callable = None
+        self,
+        brave_search_api_key=None,
+        k=3,
+        is_valid_source: Callable = None,
+        http_session: Optional[PooledSession] = None,
     ):
+        """
+        Params:
+            http_session: Keep-alive HTTP session shared by all queries. Defaults to a new PooledSession.
+        """
         super().__init__(k=k)
         if not brave_search_api_key and not os.environ.get("BRAVE_API_KEY"):
             raise RuntimeError(
@@ -572,6 +829,7 @@ class BraveRM(dspy.Retrieve):
             self.brave_search_api_key = brave_search_api_key
         else:
             self.brave_search_api_key = os.environ["BRAVE_API_KEY"]
+        self.http_session = http_session or PooledSession()
         self.usage = 0
 
         # If not None, is_valid_source shall be a function that takes a URL and returns a boolean.
@@ -612,10 +870,13 @@ class BraveRM(dspy.Retrieve):
                     "Accept-Encoding": "gzip",
                     "X-Subscription-Token": self.brave_search_api_key,
                 }
-                response = requests.get(
+                response = self.http_session.governed_request(
+                    "brave",
+                    "GET",
                     f"https://api.search.brave.com/res/v1/web/search?result_filter=web&q={query}",
                     headers=headers,
-                ).json()
+                )
+                response = response.json()
                 results = response.get("web", {}).get("results", [])
 
                 for result in results:
@@ -640,6 +901,7 @@ class SearXNG(dspy.Retrieve):
         searxng_api_key=None,
         k=3,
         is_valid_source: Callable = None,
+        http_session: Optional[PooledSession] = None,
     ):
         """Initialize the SearXNG search retriever.
         Please set up SearXNG according to https://docs.searxng.org/index.html.
@@ -650,12 +912,15 @@ class SearXNG(dspy.Retrieve):
             k (int, optional): The number of top passages to retrieve. Defaults to 3.
             is_valid_source (Callable, optional): A function that takes a URL and returns a boolean indicating if the
             source is valid. Defaults to None.
+            http_session (PooledSession, optional): Keep-alive HTTP session shared by all queries. Defaults to a new
+            PooledSession.
         """
         super().__init__(k=k)
         if not searxng_api_url:
             raise RuntimeError("You must supply searxng_api_url")
         self.searxng_api_url = searxng_api_url
         self.searxng_api_key = searxng_api_key
+        self.http_session = http_session or PooledSession()
         self.usage = 0
 
         if is_valid_source:
@@ -696,8 +961,12 @@ class SearXNG(dspy.Retrieve):
         for query in queries:
             try:
                 params = {"q": query, "format": "json"}
-                response = requests.get(
-                    self.searxng_api_url, headers=headers, params=params
+                response = self.http_session.governed_request(
+                    "searxng",
+                    "GET",
+                    self.searxng_api_url,
+                    headers=headers,
+                    params=params,
                 )
                 results = response.json()
 
@@ -729,12 +998,14 @@ class DuckDuckGoSearchRM(dspy.Retrieve):
         webpage_helper_max_threads=10,
         safe_search: str = "On",
         region: str = "us-en",
+        page_cache: Optional[DiskCache] = None,
     ):
         """
         Params:
             min_char_count: Minimum character count for the article to be considered valid.
             snippet_chunk_size: Maximum character count for each snippet.
             webpage_helper_max_threads: Maximum number of threads to use for webpage helper.
+            page_cache: Optional persistent cache of fetched pages, see WebPageHelper.
             **kwargs: Additional parameters for the OpenAI API.
         """
         super().__init__(k=k)
@@ -749,6 +1020,7 @@ class DuckDuckGoSearchRM(dspy.Retrieve):
             min_char_count=min_char_count,
             snippet_chunk_size=snippet_chunk_size,
             max_thread_num=webpage_helper_max_threads,
+            page_cache=page_cache,
         )
         self.usage = 0
         # All params for search can be found here:
@@ -786,9 +1058,10 @@ class DuckDuckGoSearchRM(dspy.Retrieve):
         giveup=giveup_hdlr,
     )
     def request(self, query: str):
-        results = self.ddgs.text(
-            query, max_results=self.k, backend=self.duck_duck_go_backend
-        )
+        with global_governor.acquire("duckduckgo"):
+            results = self.ddgs.text(
+                query, max_results=self.k, backend=self.duck_duck_go_backend
+            )
         return results
 
     def forward(
@@ -859,6 +1132,7 @@ class TavilySearchRM(dspy.Retrieve):
         snippet_chunk_size: int = 1000,
         webpage_helper_max_threads=10,
         include_raw_content=False,
+        page_cache: Optional[DiskCache] = None,
     ):
         """
         Params:
@@ -867,6 +1141,7 @@ class TavilySearchRM(dspy.Retrieve):
             snippet_chunk_size: Maximum character count for each snippet.
             webpage_helper_max_threads: Maximum number of threads to use for webpage helper.
             include_raw_content bool: Boolean that is used to determine if the full text should be returned.
+            page_cache: Optional persistent cache of fetched pages, see WebPageHelper.
         """
         super().__init__(k=k)
         try:
@@ -888,6 +1163,7 @@ class TavilySearchRM(dspy.Retrieve):
             min_char_count=min_char_count,
             snippet_chunk_size=snippet_chunk_size,
             max_thread_num=webpage_helper_max_threads,
+            page_cache=page_cache,
         )
 
         self.usage = 0
@@ -934,7 +1210,8 @@ class TavilySearchRM(dspy.Retrieve):
                 "include_raw_contents": self.include_raw_content,
             }
             #  list of dicts that will be parsed to return
-            responseData = self.tavily_client.search(query)
+            with global_governor.acquire("tavily"):
+                responseData = self.tavily_client.search(query)
             results = responseData.get("results")
             for d in results:
                 # assert d is dict
@@ -983,6 +1260,7 @@ class GoogleSearch(dspy.Retrieve):
         min_char_count: int = 150,
         snippet_chunk_size: int = 1000,
         webpage_helper_max_threads=10,
+        page_cache: Optional[DiskCache] = None,
     ):
         """
         Params:
@@ -995,6 +1273,7 @@ class GoogleSearch(dspy.Retrieve):
             min_char_count: Minimum character count for the article to be considered valid.
             snippet_chunk_size: Maximum character count for each snippet.
             webpage_helper_max_threads: Maximum number of threads to use for webpage helper.
+            page_cache: Optional persistent cache of fetched pages, see WebPageHelper.
         """
         super().__init__(k=k)
         try:
@@ -1029,6 +1308,7 @@ class GoogleSearch(dspy.Retrieve):
             min_char_count=min_char_count,
             snippet_chunk_size=snippet_chunk_size,
             max_thread_num=webpage_helper_max_threads,
+            page_cache=page_cache,
         )
         self.usage = 0
 
@@ -1060,15 +1340,16 @@ class GoogleSearch(dspy.Retrieve):
 
         for query in queries:
             try:
-                response = (
-                    self.service.cse()
-                    .list(
-                        q=query,
-                        cx=self.google_cse_id,
-                        num=self.k,
+                with global_governor.acquire("google_search"):
+                    response = (
+                        self.service.cse()
+                        .list(
+                            q=query,
+                            cx=self.google_cse_id,
+                            num=self.k,
+                        )
+                        .execute()
                     )
-                    .execute()
-                )
 
                 for item in response.get("items", []):
                     if (
@@ -1214,7 +1495,9 @@ class AzureAISearch(dspy.Retrieve):
         for query in queries:
             try:
                 # https://learn.microsoft.com/en-us/python/api/azure-search-documents/azure.search.documents.searchclient?view=azure-python#azure-search-documents-searchclient-search
-                results = client.search(search_text=query, top=1)
+                with global_governor.acquire("azure_ai_search"):
+                    # The results are fetched lazily; materialize them so the request runs under the governor.
+                    results = list(client.search(search_text=query, top=1))
 
                 for result in results:
                     document = {
@@ -1,8 +1,11 @@
+import asyncio
+import contextvars
 import json
 import logging
 import os
+import time
 from dataclasses import dataclass, field
-from typing import Union, Literal, Optional
+from typing import Dict, List, Union, Literal, Optional
 
 import dspy
 
@@ -12,7 +15,12 @@ from .modules.callback import BaseCallbackHandler
 from .modules.knowledge_curation import StormKnowledgeCurationModule
 from .modules.outline_generation import StormOutlineGenerationModule
 from .modules.persona_generator import StormPersonaGenerator
-from .modules.storm_dataclass import StormInformationTable, StormArticle
+from .modules.storm_dataclass import (
+    StormCheckpoint,
+    StormInformationTable,
+    StormArticle,
+)
+from ..concurrency import get_usage_scope, global_governor, global_limiter, usage_scope
 from ..interface import Engine, LMConfigs, Retriever
 from ..lm import OpenAIModel, AzureOpenAIModel
 from ..utils import FileIOHelper, makeStringRed, truncate_filename
@@ -167,11 +175,78 @@ class STORMWikiRunnerArguments:
             "Consider reducing it if keep getting 'Exceed rate limit' error when calling LM API."
         },
     )
+    speculative_questions: bool = field(
+        default=False,
+        metadata={
+            "help": "If True, ask the next question while the current one is being searched and answered. "
+            "The next question does not see the answer to the current one."
+        },
+    )
+    max_turns_without_new_urls: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": "Stop a conversation early after this many consecutive turns that find no new URLs. "
+            "None disables early stop."
+        },
+    )
+    query_similarity_threshold: Optional[float] = field(
+        default=None,
+        metadata={
+            "help": "If set, a search query whose embedding has at least this cosine similarity to a query already "
+            "searched by any persona reuses its results instead of calling the retriever. None disables it."
+        },
+    )
+    min_turn_novelty: Optional[float] = field(
+        default=None,
+        metadata={
+            "help": "If set, stop a persona's conversation once a turn finds less than this fraction of URL/snippet "
+            "pairs not found by any persona before. None disables it."
+        },
+    )
+
+
+# Per-topic state of the topic currently being processed. It lives in a context variable rather than on the
+# runner so that one runner can process several topics concurrently (threads and asyncio tasks each see their own
+# value).
+_current_topic_state = contextvars.ContextVar("storm_current_topic_state", default=None)
 
 
 class STORMWikiRunner(Engine):
     """STORM Wiki pipeline runner."""
 
+    @property
+    def topic(self) -> Optional[str]:
+        state = _current_topic_state.get()
+        return state["topic"] if state is not None else None
+
+    @topic.setter
+    def topic(self, topic: str):
+        state = dict(_current_topic_state.get() or {})
+        state["topic"] = topic
+        _current_topic_state.set(state)
+
+    @property
+    def article_dir_name(self) -> Optional[str]:
+        state = _current_topic_state.get()
+        return state["article_dir_name"] if state is not None else None
+
+    @article_dir_name.setter
+    def article_dir_name(self, article_dir_name: str):
+        state = dict(_current_topic_state.get() or {})
+        state["article_dir_name"] = article_dir_name
+        _current_topic_state.set(state)
+
+    @property
+    def article_output_dir(self) -> Optional[str]:
+        state = _current_topic_state.get()
+        return state["article_output_dir"] if state is not None else None
+
+    @article_output_dir.setter
+    def article_output_dir(self, article_output_dir: str):
+        state = dict(_current_topic_state.get() or {})
+        state["article_output_dir"] = article_output_dir
+        _current_topic_state.set(state)
+
     def __init__(
         self, args: STORMWikiRunnerArguments, lm_configs: STORMWikiLMConfigs, rm
     ):
@@ -192,6 +267,10 @@ class STORMWikiRunner(Engine):
             search_top_k=self.args.search_top_k,
             max_conv_turn=self.args.max_conv_turn,
             max_thread_num=self.args.max_thread_num,
+            speculative_questions=self.args.speculative_questions,
+            max_turns_without_new_urls=self.args.max_turns_without_new_urls,
+            query_similarity_threshold=self.args.query_similarity_threshold,
+            min_turn_novelty=self.args.min_turn_novelty,
         )
         self.storm_outline_generation_module = StormOutlineGenerationModule(
             outline_gen_lm=self.lm_configs.outline_gen_lm
@@ -213,8 +292,10 @@ class STORMWikiRunner(Engine):
         self,
         ground_truth_url: str = "None",
         callback_handler: BaseCallbackHandler = None,
+        resume: bool = False,
     ) -> StormInformationTable:
 
+        checkpoint = self._get_checkpoint(clear_research=not resume)
         information_table, conversation_log = (
             self.storm_knowledge_curation_module.research(
                 topic=self.topic,
@@ -223,9 +304,59 @@ class STORMWikiRunner(Engine):
                 max_perspective=self.args.max_perspective,
                 disable_perspective=False,
                 return_conversation_log=True,
+                checkpoint=checkpoint,
             )
         )
+        self._dump_knowledge_curation_results(information_table, conversation_log)
+        # conversation_log.json now contains everything saved in the checkpoint.
+        checkpoint.clear_research()
+        return information_table
+
+    async def arun_knowledge_curation_module(
+        self,
+        ground_truth_url: str = "None",
+        callback_handler: BaseCallbackHandler = None,
+        resume: bool = False,
+    ) -> StormInformationTable:
 
+        checkpoint = self._get_checkpoint(clear_research=not resume)
+        information_table, conversation_log = (
+            await self.storm_knowledge_curation_module.aresearch(
+                topic=self.topic,
+                ground_truth_url=ground_truth_url,
+                callback_handler=callback_handler,
+                max_perspective=self.args.max_perspective,
+                disable_perspective=False,
+                return_conversation_log=True,
+                checkpoint=checkpoint,
+            )
+        )
+        self._dump_knowledge_curation_results(information_table, conversation_log)
+        # conversation_log.json now contains everything saved in the checkpoint.
+        checkpoint.clear_research()
+        return information_table
+
+    def _get_checkpoint(
+        self, clear_research: bool = False, clear_sections: bool = False
+    ) -> StormCheckpoint:
+        checkpoint = StormCheckpoint(
+            os.path.join(self.article_output_dir, "checkpoints")
+        )
+        if clear_research:
+            checkpoint.clear_research()
+        if clear_sections:
+            checkpoint.clear_sections()
+        return checkpoint
+
+    def _has_outputs(self, *file_names: str) -> bool:
+        return all(
+            os.path.exists(os.path.join(self.article_output_dir, file_name))
+            for file_name in file_names
+        )
+
+    def _dump_knowledge_curation_results(
+        self, information_table: StormInformationTable, conversation_log
+    ):
         FileIOHelper.dump_json(
             conversation_log,
             os.path.join(self.article_output_dir, "conversation_log.json"),
@@ -233,7 +364,6 @@ class STORMWikiRunner(Engine):
         information_table.dump_url_to_info(
             os.path.join(self.article_output_dir, "raw_search_results.json")
         )
-        return information_table
 
     def run_outline_generation_module(
         self,
@@ -247,34 +377,93 @@ class STORMWikiRunner(Engine):
             return_draft_outline=True,
             callback_handler=callback_handler,
         )
+        self._dump_outline_generation_results(outline, draft_outline)
+        return outline
+
+    async def arun_outline_generation_module(
+        self,
+        information_table: StormInformationTable,
+        callback_handler: BaseCallbackHandler = None,
+    ) -> StormArticle:
+
+        outline, draft_outline = await global_limiter.run(
+            self.storm_outline_generation_module.generate_outline,
+            topic=self.topic,
+            information_table=information_table,
+            return_draft_outline=True,
+            callback_handler=callback_handler,
+        )
+        self._dump_outline_generation_results(outline, draft_outline)
+        return outline
+
+    def _dump_outline_generation_results(
+        self, outline: StormArticle, draft_outline: StormArticle
+    ):
         outline.dump_outline_to_file(
             os.path.join(self.article_output_dir, "storm_gen_outline.txt")
         )
         draft_outline.dump_outline_to_file(
             os.path.join(self.article_output_dir, "direct_gen_outline.txt")
         )
-        return outline
 
     def run_article_generation_module(
         self,
         outline: StormArticle,
         information_table: StormInformationTable,
         callback_handler: BaseCallbackHandler = None,
+        resume: bool = False,
     ) -> StormArticle:
 
+        # Reuse the snippet embeddings saved next to raw_search_results.json by a previous run if they are valid.
+        information_table.prepare_table_for_retrieval(
+            encoded_snippets_path=self._get_encoded_snippets_path()
+        )
+        checkpoint = self._get_checkpoint(clear_sections=not resume)
         draft_article = self.storm_article_generation.generate_article(
             topic=self.topic,
             information_table=information_table,
             article_with_outline=outline,
             callback_handler=callback_handler,
+            checkpoint=checkpoint,
         )
+        self._dump_article_generation_results(draft_article)
+        checkpoint.clear_sections()
+        return draft_article
+
+    async def arun_article_generation_module(
+        self,
+        outline: StormArticle,
+        information_table: StormInformationTable,
+        callback_handler: BaseCallbackHandler = None,
+        resume: bool = False,
+    ) -> StormArticle:
+
+        await global_limiter.run(
+            information_table.prepare_table_for_retrieval,
+            encoded_snippets_path=self._get_encoded_snippets_path(),
+        )
+        checkpoint = self._get_checkpoint(clear_sections=not resume)
+        draft_article = await self.storm_article_generation.agenerate_article(
+            topic=self.topic,
+            information_table=information_table,
+            article_with_outline=outline,
+            callback_handler=callback_handler,
+            checkpoint=checkpoint,
+        )
+        self._dump_article_generation_results(draft_article)
+        checkpoint.clear_sections()
+        return draft_article
+
+    def _get_encoded_snippets_path(self) -> str:
+        return os.path.join(self.article_output_dir, "encoded_snippets.npz")
+
+    def _dump_article_generation_results(self, draft_article: StormArticle):
         draft_article.dump_article_as_plain_text(
             os.path.join(self.article_output_dir, "storm_gen_article.txt")
         )
         draft_article.dump_reference_to_file(
             os.path.join(self.article_output_dir, "url_to_info.json")
         )
-        return draft_article
 
     def run_article_polishing_module(
         self, draft_article: StormArticle, remove_duplicate: bool = False
@@ -285,27 +474,47 @@ class STORMWikiRunner(Engine):
             draft_article=draft_article,
             remove_duplicate=remove_duplicate,
         )
+        self._dump_article_polishing_results(polished_article)
+        return polished_article
+
+    async def arun_article_polishing_module(
+        self, draft_article: StormArticle, remove_duplicate: bool = False
+    ) -> StormArticle:
+
+        polished_article = await global_limiter.run(
+            self.storm_article_polishing_module.polish_article,
+            topic=self.topic,
+            draft_article=draft_article,
+            remove_duplicate=remove_duplicate,
+        )
+        self._dump_article_polishing_results(polished_article)
+        return polished_article
+
+    def _dump_article_polishing_results(self, polished_article: StormArticle):
         FileIOHelper.write_str(
             polished_article.to_string(),
             os.path.join(self.article_output_dir, "storm_gen_article_polished.txt"),
         )
-        return polished_article
 
-    def post_run(self):
+    def post_run(self, output_dir: Optional[str] = None):
         """
         Post-run operations, including:
         1. Dumping the run configuration.
         2. Dumping the LLM call history.
+
+        Args:
+            output_dir: Directory to dump to. Defaults to the output directory of the current topic.
         """
+        output_dir = output_dir or self.article_output_dir
         config_log = self.lm_configs.log()
-        FileIOHelper.dump_json(
-            config_log, os.path.join(self.article_output_dir, "run_config.json")
-        )
+        FileIOHelper.dump_json(config_log, os.path.join(output_dir, "run_config.json"))
 
-        llm_call_history = self.lm_configs.collect_and_reset_lm_history()
-        with open(
-            os.path.join(self.article_output_dir, "llm_call_history.jsonl"), "w"
-        ) as f:
+        scope = get_usage_scope()
+        if scope is not None:
+            llm_call_history = scope.collect_lm_history_and_reset()
+        else:
+            llm_call_history = self.lm_configs.collect_and_reset_lm_history()
+        with open(os.path.join(output_dir, "llm_call_history.jsonl"), "w") as f:
             for call in llm_call_history:
                 if "kwargs" in call:
                     call.pop(
@@ -342,6 +551,21 @@ class STORMWikiRunner(Engine):
             topic_name=topic, article_text=article_text, references=references
         )
 
+    def _get_article_dir_name(self, topic: str) -> str:
+        return truncate_filename(topic.replace(" ", "_").replace("/", "_"))
+
+    def _set_topic(self, topic: str):
+        article_dir_name = self._get_article_dir_name(topic)
+        article_output_dir = os.path.join(self.args.output_dir, article_dir_name)
+        _current_topic_state.set(
+            {
+                "topic": topic,
+                "article_dir_name": article_dir_name,
+                "article_output_dir": article_output_dir,
+            }
+        )
+        os.makedirs(article_output_dir, exist_ok=True)
+
     def run(
         self,
         topic: str,
@@ -352,6 +576,7 @@ class STORMWikiRunner(Engine):
         do_polish_article: bool = True,
         remove_duplicate: bool = False,
         callback_handler: BaseCallbackHandler = BaseCallbackHandler(),
+        resume: bool = False,
     ):
         """
         Run the STORM pipeline.
@@ -369,6 +594,10 @@ class STORMWikiRunner(Engine):
              duplicated content.
             remove_duplicate: If True, remove duplicated content.
             callback_handler: A callback handler to handle the intermediate results.
+            resume: If True, continue an interrupted run in the output directory: stages whose output files exist are
+             skipped, and within the research and article generation stages, the personas, conversations (up to the
+             last finished dialogue turn) and sections saved in `checkpoints/` are reused. If False, the checkpoints
+             of a previous run are discarded.
         """
         assert (
             do_research
@@ -379,24 +608,24 @@ class STORMWikiRunner(Engine):
             "No action is specified. Please set at least one of --do-research, --do-generate-outline, --do-generate-article, --do-polish-article"
         )
 
-        self.topic = topic
-        self.article_dir_name = truncate_filename(
-            topic.replace(" ", "_").replace("/", "_")
-        )
-        self.article_output_dir = os.path.join(
-            self.args.output_dir, self.article_dir_name
-        )
-        os.makedirs(self.article_output_dir, exist_ok=True)
+        self._set_topic(topic)
 
         # research module
         information_table: StormInformationTable = None
-        if do_research:
+        if do_research and not (
+            resume
+            and self._has_outputs("conversation_log.json", "raw_search_results.json")
+        ):
             information_table = self.run_knowledge_curation_module(
-                ground_truth_url=ground_truth_url, callback_handler=callback_handler
+                ground_truth_url=ground_truth_url,
+                callback_handler=callback_handler,
+                resume=resume,
             )
         # outline generation module
         outline: StormArticle = None
-        if do_generate_outline:
+        if do_generate_outline and not (
+            resume and self._has_outputs("storm_gen_outline.txt")
+        ):
             # load information table if it's not initialized
             if information_table is None:
                 information_table = self._load_information_table_from_local_fs(
@@ -408,7 +637,9 @@ class STORMWikiRunner(Engine):
 
         # article generation module
         draft_article: StormArticle = None
-        if do_generate_article:
+        if do_generate_article and not (
+            resume and self._has_outputs("storm_gen_article.txt", "url_to_info.json")
+        ):
             if information_table is None:
                 information_table = self._load_information_table_from_local_fs(
                     os.path.join(self.article_output_dir, "conversation_log.json")
@@ -424,6 +655,7 @@ class STORMWikiRunner(Engine):
                 outline=outline,
                 information_table=information_table,
                 callback_handler=callback_handler,
+                resume=resume,
             )
             
             # Debugging step to ensure data is loaded
@@ -438,7 +670,9 @@ class STORMWikiRunner(Engine):
                 print(f"[DEBUG] Outline loaded with") #{len(outline)} sections.")
 
         # article polishing module
-        if do_polish_article:
+        if do_polish_article and not (
+            resume and self._has_outputs("storm_gen_article_polished.txt")
+        ):
             if draft_article is None:
                 draft_article_path = os.path.join(
                     self.article_output_dir, "storm_gen_article.txt"
@@ -454,3 +688,243 @@ class STORMWikiRunner(Engine):
             self.run_article_polishing_module(
                 draft_article=draft_article, remove_duplicate=remove_duplicate
             )
+
+    async def arun(
+        self,
+        topic: str,
+        ground_truth_url: str = "",
+        do_research: bool = True,
+        do_generate_outline: bool = True,
+        do_generate_article: bool = True,
+        do_polish_article: bool = True,
+        remove_duplicate: bool = False,
+        callback_handler: BaseCallbackHandler = BaseCallbackHandler(),
+        resume: bool = False,
+    ):
+        """
+        Asynchronous version of `run`. Takes the same arguments.
+
+        Persona conversations, search queries and section writing are scheduled as concurrent tasks, and every
+        blocking LM/RM call is dispatched through the process-wide `global_limiter`. Use
+        `set_global_concurrency_limit` to bound the number of in-flight calls across all pipelines in the process.
+        """
+        assert (
+            do_research
+            or do_generate_outline
+            or do_generate_article
+            or do_polish_article
+        ), makeStringRed(
+            "No action is specified. Please set at least one of --do-research, --do-generate-outline, --do-generate-article, --do-polish-article"
+        )
+
+        self._set_topic(topic)
+
+        # research module
+        information_table: StormInformationTable = None
+        if do_research and not (
+            resume
+            and self._has_outputs("conversation_log.json", "raw_search_results.json")
+        ):
+            information_table = await self.arun_knowledge_curation_module(
+                ground_truth_url=ground_truth_url,
+                callback_handler=callback_handler,
+                resume=resume,
+            )
+        # outline generation module
+        outline: StormArticle = None
+        if do_generate_outline and not (
+            resume and self._has_outputs("storm_gen_outline.txt")
+        ):
+            # load information table if it's not initialized
+            if information_table is None:
+                information_table = self._load_information_table_from_local_fs(
+                    os.path.join(self.article_output_dir, "conversation_log.json")
+                )
+            outline = await self.arun_outline_generation_module(
+                information_table=information_table, callback_handler=callback_handler
+            )
+
+        # article generation module
+        draft_article: StormArticle = None
+        if do_generate_article and not (
+            resume and self._has_outputs("storm_gen_article.txt", "url_to_info.json")
+        ):
+            if information_table is None:
+                information_table = self._load_information_table_from_local_fs(
+                    os.path.join(self.article_output_dir, "conversation_log.json")
+                )
+            if outline is None:
+                outline = self._load_outline_from_local_fs(
+                    topic=topic,
+                    outline_local_path=os.path.join(
+                        self.article_output_dir, "storm_gen_outline.txt"
+                    ),
+                )
+            draft_article = await self.arun_article_generation_module(
+                outline=outline,
+                information_table=information_table,
+                callback_handler=callback_handler,
+                resume=resume,
+            )
+
+        # article polishing module
+        if do_polish_article and not (
+            resume and self._has_outputs("storm_gen_article_polished.txt")
+        ):
+            if draft_article is None:
+                draft_article = self._load_draft_article_from_local_fs(
+                    topic=topic,
+                    draft_article_path=os.path.join(
+                        self.article_output_dir, "storm_gen_article.txt"
+                    ),
+                    url_to_info_path=os.path.join(
+                        self.article_output_dir, "url_to_info.json"
+                    ),
+                )
+            await self.arun_article_polishing_module(
+                draft_article=draft_article, remove_duplicate=remove_duplicate
+            )
+
+    @staticmethod
+    def load_batch_topics(topics: Union[str, List[Union[str, Dict]]]) -> List[Dict]:
+        """
+        Normalize the input of `batch_run` to a list of {"topic": ..., "ground_truth_url": ...} dictionaries.
+
+        Args:
+            topics: A list of topic strings or dictionaries with a "topic" key and an optional "ground_truth_url"
+             key, or a path to a JSONL file with one such dictionary per line (a plain text file with one topic
+             per line is also accepted).
+        """
+        if isinstance(topics, str):
+            items = []
+            with open(topics, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    items.append(json.loads(line) if line.startswith("{") else line)
+            topics = items
+
+        normalized = []
+        for item in topics:
+            if isinstance(item, str):
+                item = {"topic": item}
+            if "topic" not in item:
+                raise ValueError(f"Invalid batch item (missing 'topic'): {item}")
+            normalized.append(
+                {
+                    "topic": item["topic"],
+                    "ground_truth_url": item.get("ground_truth_url", ""),
+                }
+            )
+        return normalized
+
+    def _is_topic_completed(self, topic: str, do_polish_article: bool) -> bool:
+        final_artifact = (
+            "storm_gen_article_polished.txt"
+            if do_polish_article
+            else "storm_gen_article.txt"
+        )
+        return os.path.exists(
+            os.path.join(
+                self.args.output_dir, self._get_article_dir_name(topic), final_artifact
+            )
+        )
+
+    async def abatch_run(
+        self,
+        topics: Union[str, List[Union[str, Dict]]],
+        max_concurrent_topics: int = 8,
+        skip_completed: bool = True,
+        do_research: bool = True,
+        do_generate_outline: bool = True,
+        do_generate_article: bool = True,
+        do_polish_article: bool = True,
+        remove_duplicate: bool = False,
+        callback_handler: BaseCallbackHandler = BaseCallbackHandler(),
+        resume: bool = False,
+    ) -> List[Dict]:
+        """
+        Run the STORM pipeline for many topics concurrently with this runner.
+
+        All topics share the LM/RM wrappers of the runner (and therefore their caches) and the process-wide
+        `global_limiter`, so the total number of in-flight LM/RM calls stays bounded by one global budget no matter
+        how many topics are in progress. Per-topic artifacts are written to their own output directories as each
+        stage finishes, followed by the run configuration and LLM call history of the topic (see `post_run`); a
+        failure in one topic is logged and does not stop the batch. The status of every topic, with its execution
+        time and LM/RM usage per stage, is appended to `batch_status.jsonl` in `args.output_dir` as soon as it
+        finishes. Each topic runs in its own `UsageScope`, so these are not mixed up between concurrent topics; the
+        totals of the batch are reported in `time`, `lm_cost`, `rm_cost` and `rate_limit_stats` under "abatch_run".
+
+        Args:
+            topics: See `load_batch_topics`.
+            max_concurrent_topics: Maximum number of topics in progress at the same time.
+            skip_completed: If True, skip topics whose final article already exists in the output directory.
+            resume: If True, continue the unfinished topics of an interrupted batch from their checkpoints (see `run`).
+            Other arguments are the same as `run` and apply to every topic.
+
+        Returns:
+            A list of status dictionaries, one per topic, in input order.
+        """
+        items = self.load_batch_topics(topics)
+        os.makedirs(self.args.output_dir, exist_ok=True)
+        status_path = os.path.join(self.args.output_dir, "batch_status.jsonl")
+        semaphore = asyncio.Semaphore(max_concurrent_topics)
+
+        async def process(item):
+            topic = item["topic"]
+            if skip_completed and self._is_topic_completed(topic, do_polish_article):
+                status = {"topic": topic, "status": "skipped"}
+            else:
+                async with semaphore:
+                    start_time = time.time()
+                    topic_output_dir = os.path.join(
+                        self.args.output_dir, self._get_article_dir_name(topic)
+                    )
+                    # Each task runs in its own copy of the context, so the topic state set by `arun` and the
+                    # usage scope are private to this task.
+                    with usage_scope() as scope:
+                        try:
+                            await self.arun(
+                                topic=topic,
+                                ground_truth_url=item["ground_truth_url"],
+                                do_research=do_research,
+                                do_generate_outline=do_generate_outline,
+                                do_generate_article=do_generate_article,
+                                do_polish_article=do_polish_article,
+                                remove_duplicate=remove_duplicate,
+                                callback_handler=callback_handler,
+                                resume=resume,
+                            )
+                            status = {"topic": topic, "status": "success"}
+                        except Exception as e:
+                            logging.error(
+                                f"Error occurs when running topic {topic}: {e}"
+                            )
+                            status = {
+                                "topic": topic,
+                                "status": "failed",
+                                "error": str(e),
+                            }
+                        if os.path.isdir(topic_output_dir):
+                            self.post_run(topic_output_dir)
+                    status["time"] = time.time() - start_time
+                    status["stage_time"] = scope.time
+                    status["lm_cost"] = scope.lm_cost
+                    status["rm_cost"] = scope.rm_cost
+            with open(status_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(status) + "\n")
+            return status
+
+        start_time = time.time()
+        statuses = await asyncio.gather(*[process(item) for item in items])
+        # The counters of the shared LM/RM objects (including cache and coalescing statistics) cover the whole batch.
+        self.time["abatch_run"] = time.time() - start_time
+        self.lm_cost["abatch_run"] = self.lm_configs.collect_and_reset_lm_usage()
+        self.rm_cost["abatch_run"] = self.retriever.collect_and_reset_rm_usage()
+        self.rate_limit_stats["abatch_run"] = global_governor.get_stats_and_reset()
+        return statuses
+
+    def batch_run(self, topics: Union[str, List[Union[str, Dict]]], **kwargs):
+        """Synchronous entry point of `abatch_run`. Takes the same arguments."""
+        return asyncio.run(self.abatch_run(topics, **kwargs))
@@ -1,13 +1,15 @@
+import asyncio
 import concurrent.futures
 import copy
 import logging
 from concurrent.futures import as_completed
-from typing import List, Union
+from typing import List, Optional, Union
 
 import dspy
 
 from .callback import BaseCallbackHandler
-from .storm_dataclass import StormInformationTable, StormArticle
+from .storm_dataclass import StormCheckpoint, StormInformationTable, StormArticle
+from ...concurrency import global_limiter
 from ...interface import ArticleGenerationModule, Information
 from ...utils import ArticleTextProcessing
 
@@ -50,12 +52,34 @@ class StormArticleGenerationModule(ArticleGenerationModule):
             "collected_info": collected_info,
         }
 
+    def _generate_section_with_checkpoint(
+        self,
+        topic,
+        section_name,
+        information_table,
+        section_outline,
+        section_query,
+        checkpoint: Optional[StormCheckpoint] = None,
+    ):
+        """`generate_section` that reuses the section saved in `checkpoint` and saves newly written sections."""
+        if checkpoint is not None:
+            section_output_dict = checkpoint.load_section(section_name, section_outline)
+            if section_output_dict is not None:
+                return section_output_dict
+        section_output_dict = self.generate_section(
+            topic, section_name, information_table, section_outline, section_query
+        )
+        if checkpoint is not None:
+            checkpoint.save_section(section_outline, section_output_dict)
+        return section_output_dict
+
     def generate_article(
         self,
         topic: str,
         information_table: StormInformationTable,
         article_with_outline: StormArticle,
         callback_handler: BaseCallbackHandler = None,
+        checkpoint: Optional[StormCheckpoint] = None,
     ) -> StormArticle:
         """
         Generate article for the topic based on the information table and article outline.
@@ -66,6 +90,8 @@ class StormArticleGenerationModule(ArticleGenerationModule):
             article_with_outline (StormArticle): The article with specified outline.
             callback_handler (BaseCallbackHandler): An optional callback handler that can be used to trigger
                 custom callbacks at various stages of the article generation process. Defaults to None.
+            checkpoint (StormCheckpoint): If not None, each section is saved as soon as it is written, and sections
+                already saved for the same outline are reused instead of being written again.
         """
         information_table.prepare_table_for_retrieval()
 
@@ -79,12 +105,13 @@ class StormArticleGenerationModule(ArticleGenerationModule):
             logging.error(
                 f"No outline for {topic}. Will directly search with the topic."
             )
-            section_output_dict = self.generate_section(
+            section_output_dict = self._generate_section_with_checkpoint(
                 topic=topic,
                 section_name=topic,
                 information_table=information_table,
                 section_outline="",
                 section_query=[topic],
+                checkpoint=checkpoint,
             )
             section_output_dict_collection = [section_output_dict]
         else:
@@ -93,36 +120,110 @@ class StormArticleGenerationModule(ArticleGenerationModule):
                 max_workers=self.max_thread_num
             ) as executor:
                 future_to_sec_title = {}
-                for section_title in sections_to_write:
-                    # We don't want to write a separate introduction section.
-                    if section_title.lower().strip() == "introduction":
-                        continue
-                        # We don't want to write a separate conclusion section.
-                    if section_title.lower().strip().startswith(
-                        "conclusion"
-                    ) or section_title.lower().strip().startswith("summary"):
-                        continue
-                    section_query = article_with_outline.get_outline_as_list(
-                        root_section_name=section_title, add_hashtags=False
-                    )
-                    queries_with_hashtags = article_with_outline.get_outline_as_list(
-                        root_section_name=section_title, add_hashtags=True
-                    )
-                    section_outline = "\n".join(queries_with_hashtags)
+                for section_args in self._get_section_tasks(
+                    topic, article_with_outline
+                ):
                     future_to_sec_title[
                         executor.submit(
-                            self.generate_section,
-                            topic,
-                            section_title,
-                            information_table,
-                            section_outline,
-                            section_query,
+                            self._generate_section_with_checkpoint,
+                            topic=topic,
+                            information_table=information_table,
+                            checkpoint=checkpoint,
+                            **section_args,
                         )
-                    ] = section_title
+                    ] = section_args["section_name"]
 
                 for future in as_completed(future_to_sec_title):
                     section_output_dict_collection.append(future.result())
 
+        return self._assemble_article(
+            topic, article_with_outline, section_output_dict_collection
+        )
+
+    async def agenerate_article(
+        self,
+        topic: str,
+        information_table: StormInformationTable,
+        article_with_outline: StormArticle,
+        callback_handler: BaseCallbackHandler = None,
+        checkpoint: Optional[StormCheckpoint] = None,
+    ) -> StormArticle:
+        """
+        Asynchronous version of `generate_article`. Sections are written concurrently and every LM call is
+        dispatched through `global_limiter` instead of a module-local thread pool.
+        """
+        await global_limiter.run(information_table.prepare_table_for_retrieval)
+
+        if article_with_outline is None:
+            article_with_outline = StormArticle(topic_name=topic)
+
+        if len(article_with_outline.get_first_level_section_names()) == 0:
+            logging.error(
+                f"No outline for {topic}. Will directly search with the topic."
+            )
+            section_output_dict_collection = [
+                await global_limiter.run(
+                    self._generate_section_with_checkpoint,
+                    topic=topic,
+                    section_name=topic,
+                    information_table=information_table,
+                    section_outline="",
+                    section_query=[topic],
+                    checkpoint=checkpoint,
+                )
+            ]
+        else:
+            section_output_dict_collection = await asyncio.gather(
+                *[
+                    global_limiter.run(
+                        self._generate_section_with_checkpoint,
+                        topic=topic,
+                        information_table=information_table,
+                        checkpoint=checkpoint,
+                        **section_args,
+                    )
+                    for section_args in self._get_section_tasks(
+                        topic, article_with_outline
+                    )
+                ]
+            )
+
+        return self._assemble_article(
+            topic, article_with_outline, section_output_dict_collection
+        )
+
+    @staticmethod
+    def _get_section_tasks(topic: str, article_with_outline: StormArticle):
+        """Return the arguments of `generate_section` for every first-level section that needs to be written."""
+        section_tasks = []
+        for section_title in article_with_outline.get_first_level_section_names():
+            # We don't want to write a separate introduction section.
+            if section_title.lower().strip() == "introduction":
+                continue
+                # We don't want to write a separate conclusion section.
+            if section_title.lower().strip().startswith(
+                "conclusion"
+            ) or section_title.lower().strip().startswith("summary"):
+                continue
+            section_query = article_with_outline.get_outline_as_list(
+                root_section_name=section_title, add_hashtags=False
+            )
+            queries_with_hashtags = article_with_outline.get_outline_as_list(
+                root_section_name=section_title, add_hashtags=True
+            )
+            section_tasks.append(
+                {
+                    "section_name": section_title,
+                    "section_outline": "\n".join(queries_with_hashtags),
+                    "section_query": section_query,
+                }
+            )
+        return section_tasks
+
+    @staticmethod
+    def _assemble_article(
+        topic: str, article_with_outline: StormArticle, section_output_dict_collection
+    ) -> StormArticle:
         article = copy.deepcopy(article_with_outline)
         for section_output_dict in section_output_dict_collection:
             article.update_section(
@@ -1,4 +1,6 @@
+import asyncio
 import concurrent.futures
+import contextlib
 import logging
 import os
 from concurrent.futures import as_completed
@@ -8,7 +10,13 @@ import dspy
 
 from .callback import BaseCallbackHandler
 from .persona_generator import StormPersonaGenerator
-from .storm_dataclass import DialogueTurn, StormInformationTable
+from .storm_dataclass import (
+    DialogueTurn,
+    ResearchBlackboard,
+    StormCheckpoint,
+    StormInformationTable,
+)
+from ...concurrency import global_limiter
 from ...interface import KnowledgeCurationModule, Retriever, Information
 from ...utils import ArticleTextProcessing
 
@@ -23,7 +31,13 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 
 
 class ConvSimulator(dspy.Module):
-    """Simulate a conversation between a Wikipedia writer with specific persona and an expert."""
+    """Simulate a conversation between a Wikipedia writer with specific persona and an expert.
+
+    By default, each turn asks a question, searches and answers it before the next question is asked. With
+    `speculative_questions=True`, the next question is asked (and its queries generated and searched) while the
+    current question is still being searched and answered. The speculative question sees the current question but
+    not its answer, which trades a little question quality for removing one LM round-trip per turn.
+    """
 
     def __init__(
         self,
@@ -33,7 +47,19 @@ class ConvSimulator(dspy.Module):
         max_search_queries_per_turn: int,
         search_top_k: int,
         max_turn: int,
+        speculative_questions: bool = False,
+        max_turns_without_new_urls: Optional[int] = None,
+        min_turn_novelty: Optional[float] = None,
     ):
+        """
+        Args:
+            speculative_questions: Ask the next question while the current one is being searched and answered.
+            max_turns_without_new_urls: Stop the conversation early after this many consecutive turns whose search
+                results bring no URL that earlier turns of the conversation have not found. None disables early stop.
+            min_turn_novelty: When a `ResearchBlackboard` is passed to `forward`, stop the conversation early once a
+                turn finds less than this fraction of (URL, snippet) pairs that no conversation on the topic has found
+                before. None disables novelty-based early stop.
+        """
         super().__init__()
         self.wiki_writer = WikiWriter(engine=question_asker_engine)
         self.topic_expert = TopicExpert(
@@ -43,6 +69,118 @@ class ConvSimulator(dspy.Module):
             retriever=retriever,
         )
         self.max_turn = max_turn
+        self.speculative_questions = speculative_questions
+        self.max_turns_without_new_urls = max_turns_without_new_urls
+        self.min_turn_novelty = min_turn_novelty
+
+    @staticmethod
+    def _is_end_of_conversation(user_utterance: str) -> bool:
+        if user_utterance == "":
+            logging.error("Simulated Wikipedia writer utterance is empty.")
+            return True
+        return user_utterance.startswith("Thank you so much for your help!")
+
+    @staticmethod
+    def _provisional_history(
+        dlg_history: List[DialogueTurn], user_utterance: str
+    ) -> List[DialogueTurn]:
+        """The dialogue history used to ask the next question before the expert has answered `user_utterance`."""
+        return dlg_history + [
+            DialogueTurn(
+                agent_utterance="Omit the answer here due to space limit.",
+                user_utterance=user_utterance,
+            )
+        ]
+
+    def _ask_and_search(
+        self,
+        topic: str,
+        persona: str,
+        dlg_history: List[DialogueTurn],
+        ground_truth_url: str,
+        blackboard: Optional[ResearchBlackboard] = None,
+    ) -> Tuple[str, Optional[Tuple[List[str], List[Information]]]]:
+        """Ask the next question and search for it. The search is None if the writer ends the conversation."""
+        user_utterance = self.wiki_writer(
+            topic=topic, persona=persona, dialogue_turns=dlg_history
+        ).question
+        if self._is_end_of_conversation(user_utterance):
+            return user_utterance, None
+        return user_utterance, self.topic_expert._search(
+            topic=topic,
+            question=user_utterance,
+            ground_truth_url=ground_truth_url,
+            blackboard=blackboard,
+        )
+
+    async def _aask_and_search(
+        self,
+        topic: str,
+        persona: str,
+        dlg_history: List[DialogueTurn],
+        ground_truth_url: str,
+        blackboard: Optional[ResearchBlackboard] = None,
+    ) -> Tuple[str, Optional[Tuple[List[str], List[Information]]]]:
+        user_utterance = (
+            await global_limiter.run(
+                self.wiki_writer,
+                topic=topic,
+                persona=persona,
+                dialogue_turns=dlg_history,
+            )
+        ).question
+        if self._is_end_of_conversation(user_utterance):
+            return user_utterance, None
+        return user_utterance, await self.topic_expert._asearch(
+            topic=topic,
+            question=user_utterance,
+            ground_truth_url=ground_truth_url,
+            blackboard=blackboard,
+        )
+
+    @staticmethod
+    def _brings_new_urls(dlg_turn: DialogueTurn, seen_urls: set) -> bool:
+        urls = {r.url for r in dlg_turn.search_results}
+        new_urls = urls - seen_urls
+        seen_urls.update(urls)
+        return len(new_urls) > 0
+
+    def _replay_history(
+        self,
+        dlg_history: List[DialogueTurn],
+        blackboard: Optional[ResearchBlackboard],
+    ) -> Tuple[set, int]:
+        """Restore the early-stop state from the turns of a resumed conversation."""
+        seen_urls = set()
+        turns_without_new_urls = 0
+        for dlg_turn in dlg_history:
+            if self._brings_new_urls(dlg_turn, seen_urls):
+                turns_without_new_urls = 0
+            else:
+                turns_without_new_urls += 1
+            if blackboard is not None:
+                blackboard.record_coverage(dlg_turn.search_results)
+        return seen_urls, turns_without_new_urls
+
+    def _should_stop(
+        self,
+        dlg_turn: DialogueTurn,
+        turns_without_new_urls: int,
+        blackboard: Optional[ResearchBlackboard],
+    ) -> bool:
+        if blackboard is not None:
+            novelty = blackboard.record_coverage(dlg_turn.search_results)
+            # Turns without search results (e.g., a failed search) are not judged by their novelty.
+            if (
+                self.min_turn_novelty is not None
+                and novelty is not None
+                and novelty < self.min_turn_novelty
+            ):
+                return True
+        return (
+            self.max_turns_without_new_urls is not None
+            and turns_without_new_urls >= self.max_turns_without_new_urls
+        )
 
     def forward(
         self,
@@ -50,33 +188,160 @@ class ConvSimulator(dspy.Module):
         persona: str,
         ground_truth_url: str,
         callback_handler: BaseCallbackHandler,
+        blackboard: Optional[ResearchBlackboard] = None,
+        dlg_history: Optional[List[DialogueTurn]] = None,
     ):
         """
         topic: The topic to research.
         persona: The persona of the Wikipedia writer.
         ground_truth_url: The ground_truth_url will be excluded from search to avoid ground truth leakage in evaluation.
+        blackboard: Optional research state shared with the conversations of other personas on the same topic.
+        dlg_history: Turns of an interrupted conversation to continue from (e.g., loaded from a checkpoint).
         """
-        dlg_history: List[DialogueTurn] = []
-        for _ in range(self.max_turn):
-            user_utterance = self.wiki_writer(
-                topic=topic, persona=persona, dialogue_turns=dlg_history
-            ).question
-            if user_utterance == "":
-                logging.error("Simulated Wikipedia writer utterance is empty.")
-                break
-            if user_utterance.startswith("Thank you so much for your help!"):
-                break
-            expert_output = self.topic_expert(
-                topic=topic, question=user_utterance, ground_truth_url=ground_truth_url
-            )
-            dlg_turn = DialogueTurn(
-                agent_utterance=expert_output.answer,
-                user_utterance=user_utterance,
-                search_queries=expert_output.queries,
-                search_results=expert_output.searched_results,
+        dlg_history: List[DialogueTurn] = list(dlg_history or [])
+        seen_urls, turns_without_new_urls = self._replay_history(
+            dlg_history, blackboard
+        )
+        first_turn_idx = len(dlg_history)
+        executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            if self.speculative_questions and self.max_turn - first_turn_idx > 1
+            else None
+        )
+        try:
+            step = (
+                self._ask_and_search(
+                    topic, persona, dlg_history, ground_truth_url, blackboard
+                )
+                if first_turn_idx < self.max_turn
+                else None
             )
-            dlg_history.append(dlg_turn)
-            callback_handler.on_dialogue_turn_end(dlg_turn=dlg_turn)
+            for turn_idx in range(first_turn_idx, self.max_turn):
+                user_utterance, search = step
+                if search is None:
+                    break
+                next_step = None
+                if executor is not None and turn_idx + 1 < self.max_turn:
+                    next_step = executor.submit(
+                        self._ask_and_search,
+                        topic,
+                        persona,
+                        self._provisional_history(dlg_history, user_utterance),
+                        ground_truth_url,
+                        blackboard,
+                    )
+                queries, searched_results = search
+                answer = self.topic_expert._answer_question(
+                    topic=topic,
+                    question=user_utterance,
+                    searched_results=searched_results,
+                )
+                dlg_turn = DialogueTurn(
+                    agent_utterance=answer,
+                    user_utterance=user_utterance,
+                    search_queries=queries,
+                    search_results=searched_results,
+                )
+                dlg_history.append(dlg_turn)
+                callback_handler.on_dialogue_turn_end(dlg_turn=dlg_turn)
+
+                if self._brings_new_urls(dlg_turn, seen_urls):
+                    turns_without_new_urls = 0
+                else:
+                    turns_without_new_urls += 1
+                if (
+                    self._should_stop(dlg_turn, turns_without_new_urls, blackboard)
+                    or turn_idx + 1 == self.max_turn
+                ):
+                    break
+                if next_step is not None:
+                    step = next_step.result()
+                else:
+                    step = self._ask_and_search(
+                        topic, persona, dlg_history, ground_truth_url, blackboard
+                    )
+        finally:
+            if executor is not None:
+                # After an early stop, a speculative step that has not started is cancelled, and one that is running
+                # is waited for and its result discarded, so that no LM/RM calls outlive the conversation.
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return dspy.Prediction(dlg_history=dlg_history)
+
+    async def aforward(
+        self,
+        topic: str,
+        persona: str,
+        ground_truth_url: str,
+        callback_handler: BaseCallbackHandler,
+        blackboard: Optional[ResearchBlackboard] = None,
+        dlg_history: Optional[List[DialogueTurn]] = None,
+    ):
+        """Asynchronous version of `forward`. LM and RM calls are dispatched through `global_limiter`."""
+        dlg_history: List[DialogueTurn] = list(dlg_history or [])
+        seen_urls, turns_without_new_urls = self._replay_history(
+            dlg_history, blackboard
+        )
+        first_turn_idx = len(dlg_history)
+        if first_turn_idx >= self.max_turn:
+            return dspy.Prediction(dlg_history=dlg_history)
+        step = await self._aask_and_search(
+            topic, persona, dlg_history, ground_truth_url, blackboard
+        )
+        # The speculative step of the next turn, which is discarded if the conversation stops.
+        next_step = None
+        try:
+            for turn_idx in range(first_turn_idx, self.max_turn):
+                user_utterance, search = step
+                if search is None:
+                    break
+                if self.speculative_questions and turn_idx + 1 < self.max_turn:
+                    next_step = asyncio.ensure_future(
+                        self._aask_and_search(
+                            topic,
+                            persona,
+                            self._provisional_history(dlg_history, user_utterance),
+                            ground_truth_url,
+                            blackboard,
+                        )
+                    )
+                queries, searched_results = search
+                answer = await global_limiter.run(
+                    self.topic_expert._answer_question,
+                    topic=topic,
+                    question=user_utterance,
+                    searched_results=searched_results,
+                )
+                dlg_turn = DialogueTurn(
+                    agent_utterance=answer,
+                    user_utterance=user_utterance,
+                    search_queries=queries,
+                    search_results=searched_results,
+                )
+                dlg_history.append(dlg_turn)
+                callback_handler.on_dialogue_turn_end(dlg_turn=dlg_turn)
+
+                if self._brings_new_urls(dlg_turn, seen_urls):
+                    turns_without_new_urls = 0
+                else:
+                    turns_without_new_urls += 1
+                if (
+                    self._should_stop(dlg_turn, turns_without_new_urls, blackboard)
+                    or turn_idx + 1 == self.max_turn
+                ):
+                    break
+                if next_step is not None:
+                    step, next_step = await next_step, None
+                else:
+                    step = await self._aask_and_search(
+                        topic, persona, dlg_history, ground_truth_url, blackboard
+                    )
+        finally:
+            if next_step is not None:
+                next_step.cancel()
+                # Retrieve the outcome of the discarded step so that it does not linger or log an unretrieved error.
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await next_step
 
         return dspy.Prediction(dlg_history=dlg_history)
 
@@ -201,49 +466,156 @@ class TopicExpert(dspy.Module):
         self.max_search_queries = max_search_queries
         self.search_top_k = search_top_k
 
-    def forward(self, topic: str, question: str, ground_truth_url: str):
+    def _generate_queries(self, topic: str, question: str) -> List[str]:
         with dspy.settings.context(lm=self.engine, show_guidelines=False):
             # Identify: Break down question into queries.
             queries = self.generate_queries(topic=topic, question=question).queries
-            queries = [
-                q.replace("-", "").strip().strip('"').strip('"').strip()
-                for q in queries.split("\n")
-            ]
-            queries = queries[: self.max_search_queries]
-            # Search
-            searched_results: List[Information] = self.retriever.retrieve(
-                list(set(queries)), exclude_urls=[ground_truth_url]
-            )
-            if len(searched_results) > 0:
-                # Evaluate: Simplify this part by directly using the top 1 snippet.
-                info = ""
-                for n, r in enumerate(searched_results):
-                    info += "\n".join(f"[{n + 1}]: {s}" for s in r.snippets[:1])
-                    info += "\n\n"
-
-                info = ArticleTextProcessing.limit_word_count_preserve_newline(
-                    info, 1000
-                )
-
-                try:
+        queries = [
+            q.replace("-", "").strip().strip('"').strip('"').strip()
+            for q in queries.split("\n")
+        ]
+        return queries[: self.max_search_queries]
+
+    def _answer_question(
+        self, topic: str, question: str, searched_results: List[Information]
+    ) -> str:
+        if len(searched_results) > 0:
+            # Evaluate: Simplify this part by directly using the top 1 snippet.
+            info = ""
+            for n, r in enumerate(searched_results):
+                info += "\n".join(f"[{n + 1}]: {s}" for s in r.snippets[:1])
+                info += "\n\n"
+
+            info = ArticleTextProcessing.limit_word_count_preserve_newline(info, 1000)
+
+            try:
+                with dspy.settings.context(lm=self.engine, show_guidelines=False):
                     answer = self.answer_question(
                         topic=topic, conv=question, info=info
                     ).answer
-                    answer = ArticleTextProcessing.remove_uncompleted_sentences_with_citations(
+                answer = (
+                    ArticleTextProcessing.remove_uncompleted_sentences_with_citations(
                         answer
                     )
-                except Exception as e:
-                    logging.error(f"Error occurs when generating answer: {e}")
-                    answer = "Sorry, I cannot answer this question. Please ask another question."
-            else:
-                # When no information is found, the expert shouldn't hallucinate.
-                answer = "Sorry, I cannot find information for this question. Please ask another question."
+                )
+            except Exception as e:
+                logging.error(f"Error occurs when generating answer: {e}")
+                answer = (
+                    "Sorry, I cannot answer this question. Please ask another question."
+                )
+        else:
+            # When no information is found, the expert shouldn't hallucinate.
+            answer = "Sorry, I cannot find information for this question. Please ask another question."
+        return answer
+
+    def _search(
+        self,
+        topic: str,
+        question: str,
+        ground_truth_url: str,
+        blackboard: Optional[ResearchBlackboard] = None,
+    ) -> Tuple[List[str], List[Information]]:
+        queries = self._generate_queries(topic=topic, question=question)
+        if blackboard is None:
+            searched_results: List[Information] = self.retriever.retrieve(
+                list(set(queries)), exclude_urls=[ground_truth_url]
+            )
+            return queries, searched_results
+        # Only search the queries that are not similar to queries searched by this or other conversations.
+        queries_to_search, reused_results = blackboard.claim_queries(queries)
+        searched_results = (
+            self.retriever.retrieve(queries_to_search, exclude_urls=[ground_truth_url])
+            if queries_to_search
+            else []
+        )
+        blackboard.add_search_results(queries_to_search, searched_results)
+        return queries, searched_results + reused_results
+
+    async def _asearch(
+        self,
+        topic: str,
+        question: str,
+        ground_truth_url: str,
+        blackboard: Optional[ResearchBlackboard] = None,
+    ) -> Tuple[List[str], List[Information]]:
+        queries = await global_limiter.run(
+            self._generate_queries, topic=topic, question=question
+        )
+        if blackboard is None:
+            searched_results: List[Information] = await self.retriever.aretrieve(
+                list(set(queries)), exclude_urls=[ground_truth_url]
+            )
+            return queries, searched_results
+        queries_to_search, reused_results = await global_limiter.run(
+            blackboard.claim_queries, queries
+        )
+        searched_results = (
+            await self.retriever.aretrieve(
+                queries_to_search, exclude_urls=[ground_truth_url]
+            )
+            if queries_to_search
+            else []
+        )
+        blackboard.add_search_results(queries_to_search, searched_results)
+        return queries, searched_results + reused_results
+
+    def forward(self, topic: str, question: str, ground_truth_url: str):
+        queries, searched_results = self._search(
+            topic=topic, question=question, ground_truth_url=ground_truth_url
+        )
+        answer = self._answer_question(
+            topic=topic, question=question, searched_results=searched_results
+        )
+
+        return dspy.Prediction(
+            queries=queries, searched_results=searched_results, answer=answer
+        )
+
+    async def aforward(self, topic: str, question: str, ground_truth_url: str):
+        """Asynchronous version of `forward`. LM and RM calls are dispatched through `global_limiter`."""
+        queries, searched_results = await self._asearch(
+            topic=topic, question=question, ground_truth_url=ground_truth_url
+        )
+        answer = await global_limiter.run(
+            self._answer_question,
+            topic=topic,
+            question=question,
+            searched_results=searched_results,
+        )
 
         return dspy.Prediction(
             queries=queries, searched_results=searched_results, answer=answer
         )
 
 
+class _CheckpointCallbackHandler:
+    """Save the conversation of one persona to a `StormCheckpoint` after every dialogue turn."""
+
+    def __init__(
+        self,
+        callback_handler: BaseCallbackHandler,
+        checkpoint: StormCheckpoint,
+        persona_idx: int,
+        persona: str,
+        dlg_history: List[DialogueTurn],
+    ):
+        self.callback_handler = callback_handler
+        self.checkpoint = checkpoint
+        self.persona_idx = persona_idx
+        self.persona = persona
+        self.dlg_history = list(dlg_history)
+
+    def on_dialogue_turn_end(self, dlg_turn, **kwargs):
+        self.dlg_history.append(dlg_turn)
+        self.checkpoint.save_conversation(
+            self.persona_idx, self.persona, self.dlg_history, completed=False
+        )
+        self.callback_handler.on_dialogue_turn_end(dlg_turn=dlg_turn, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.callback_handler, name)
+
+
 class StormKnowledgeCurationModule(KnowledgeCurationModule):
     """
     The interface for knowledge curation stage. Given topic, return collected information.
@@ -259,15 +631,24 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
         search_top_k: int,
         max_conv_turn: int,
         max_thread_num: int,
+        speculative_questions: bool = False,
+        max_turns_without_new_urls: Optional[int] = None,
+        query_similarity_threshold: Optional[float] = None,
+        min_turn_novelty: Optional[float] = None,
     ):
         """
-        Store args and finish initialization.
+        Store args and finish initialization. See `ConvSimulator` for `speculative_questions`,
+        `max_turns_without_new_urls` and `min_turn_novelty`, and `ResearchBlackboard` for
+        `query_similarity_threshold`. The conversations of one `research` call share a `ResearchBlackboard` if
+        `query_similarity_threshold` or `min_turn_novelty` is set.
         """
         self.retriever = retriever
         self.persona_generator = persona_generator
         self.conv_simulator_lm = conv_simulator_lm
         self.search_top_k = search_top_k
         self.max_thread_num = max_thread_num
+        self.query_similarity_threshold = query_similarity_threshold
+        self.min_turn_novelty = min_turn_novelty
         self.retriever = retriever
         self.conv_simulator = ConvSimulator(
             topic_expert_engine=conv_simulator_lm,
@@ -276,6 +657,16 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
             max_search_queries_per_turn=max_search_queries_per_turn,
             search_top_k=search_top_k,
             max_turn=max_conv_turn,
+            speculative_questions=speculative_questions,
+            max_turns_without_new_urls=max_turns_without_new_urls,
+            min_turn_novelty=min_turn_novelty,
+        )
+
+    def _create_blackboard(self) -> Optional[ResearchBlackboard]:
+        if self.query_similarity_threshold is None and self.min_turn_novelty is None:
+            return None
+        return ResearchBlackboard(
+            query_similarity_threshold=self.query_similarity_threshold
         )
 
     def _get_considered_personas(self, topic: str, max_num_persona) -> List[str]:
@@ -283,6 +674,32 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
             topic=topic, max_num_persona=max_num_persona
         )
 
+    @staticmethod
+    def _prepare_conversation(
+        persona_idx: int,
+        persona: str,
+        callback_handler: BaseCallbackHandler,
+        blackboard: Optional[ResearchBlackboard],
+        checkpoint: Optional[StormCheckpoint],
+    ):
+        """
+        Return the finished conversation of the persona saved in `checkpoint` (or None), and the keyword arguments
+        to run or continue the conversation otherwise.
+        """
+        kwargs = {"callback_handler": callback_handler}
+        if blackboard is not None:
+            kwargs["blackboard"] = blackboard
+        if checkpoint is not None:
+            dlg_history, completed = checkpoint.load_conversation(persona_idx, persona)
+            if completed:
+                return dspy.Prediction(dlg_history=dlg_history), kwargs
+            if dlg_history:
+                kwargs["dlg_history"] = dlg_history
+            kwargs["callback_handler"] = _CheckpointCallbackHandler(
+                callback_handler, checkpoint, persona_idx, persona, dlg_history
+            )
+        return None, kwargs
+
     def _run_conversation(
         self,
         conv_simulator,
@@ -290,6 +707,8 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
         ground_truth_url,
         considered_personas,
         callback_handler: BaseCallbackHandler,
+        blackboard: Optional[ResearchBlackboard] = None,
+        checkpoint: Optional[StormCheckpoint] = None,
     ) -> List[Tuple[str, List[DialogueTurn]]]:
         """
         Executes multiple conversation simulations concurrently, each with a different persona,
@@ -306,6 +725,11 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
                 will be conducted. Each persona is passed to `conv_simulator` individually.
             callback_handler (callable): A callback function that is passed to `conv_simulator`. It
                 should handle any callbacks or events during the simulation.
+            blackboard (ResearchBlackboard, optional): Research state shared by all conversations. If not None, it
+                is passed to `conv_simulator` as the `blackboard` keyword argument.
+            checkpoint (StormCheckpoint, optional): If not None, every conversation is saved after each turn.
+                Finished conversations found in the checkpoint are reused, and interrupted ones are continued by
+                passing their turns to `conv_simulator` as the `dlg_history` keyword argument.
 
         Returns:
             list of tuples: A list where each tuple contains a persona and its corresponding cleaned
@@ -314,20 +738,30 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
 
         conversations = []
 
-        def run_conv(persona):
-            return conv_simulator(
+        def run_conv(persona_idx, persona):
+            conv, kwargs = self._prepare_conversation(
+                persona_idx, persona, callback_handler, blackboard, checkpoint
+            )
+            if conv is not None:
+                return conv
+            conv = conv_simulator(
                 topic=topic,
                 ground_truth_url=ground_truth_url,
                 persona=persona,
-                callback_handler=callback_handler,
+                **kwargs,
             )
+            if checkpoint is not None:
+                checkpoint.save_conversation(
+                    persona_idx, persona, conv.dlg_history, completed=True
+                )
+            return conv
 
         max_workers = min(self.max_thread_num, len(considered_personas))
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_persona = {
-                executor.submit(run_conv, persona): persona
-                for persona in considered_personas
+                executor.submit(run_conv, persona_idx, persona): persona
+                for persona_idx, persona in enumerate(considered_personas)
             }
 
             if streamlit_connection:
@@ -352,12 +786,15 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
         max_perspective: int = 0,
         disable_perspective: bool = True,
         return_conversation_log=False,
+        checkpoint: Optional[StormCheckpoint] = None,
     ) -> Union[StormInformationTable, Tuple[StormInformationTable, Dict]]:
         """
         Curate information and knowledge for the given topic
 
         Args:
             topic: topic of interest in natural language.
+            checkpoint: If not None, the personas and conversations are saved as they finish, and the ones already
+                saved are reused (see `_run_conversation`).
 
         Returns:
             collected_information: collected information in InformationTable type.
@@ -368,21 +805,120 @@ class StormKnowledgeCurationModule(KnowledgeCurationModule):
         considered_personas = []
         if disable_perspective:
             considered_personas = [""]
+        elif checkpoint is not None and checkpoint.load_personas() is not None:
+            considered_personas = checkpoint.load_personas()
         else:
             considered_personas = self._get_considered_personas(
                 topic=topic, max_num_persona=max_perspective
             )
+            if checkpoint is not None:
+                checkpoint.save_personas(considered_personas)
         callback_handler.on_identify_perspective_end(perspectives=considered_personas)
 
         # run conversation
         callback_handler.on_information_gathering_start()
+        blackboard = self._create_blackboard()
         conversations = self._run_conversation(
             conv_simulator=self.conv_simulator,
             topic=topic,
             ground_truth_url=ground_truth_url,
             considered_personas=considered_personas,
             callback_handler=callback_handler,
+            blackboard=blackboard,
+            checkpoint=checkpoint,
+        )
+        if blackboard is not None:
+            logging.info(f"Research blackboard for {topic}: {blackboard.get_stats()}")
+
+        information_table = StormInformationTable(conversations)
+        callback_handler.on_information_gathering_end()
+        if return_conversation_log:
+            return information_table, StormInformationTable.construct_log_dict(
+                conversations
+            )
+        return information_table
+
+    async def _arun_conversation(
+        self,
+        conv_simulator,
+        topic,
+        ground_truth_url,
+        considered_personas,
+        callback_handler: BaseCallbackHandler,
+        blackboard: Optional[ResearchBlackboard] = None,
+        checkpoint: Optional[StormCheckpoint] = None,
+    ) -> List[Tuple[str, List[DialogueTurn]]]:
+        """Asynchronous version of `_run_conversation`. Conversations of all personas run as concurrent tasks."""
+
+        async def run_conv(persona_idx, persona):
+            conv, kwargs = self._prepare_conversation(
+                persona_idx, persona, callback_handler, blackboard, checkpoint
+            )
+            if conv is not None:
+                return conv
+            conv = await conv_simulator.aforward(
+                topic=topic,
+                ground_truth_url=ground_truth_url,
+                persona=persona,
+                **kwargs,
+            )
+            if checkpoint is not None:
+                checkpoint.save_conversation(
+                    persona_idx, persona, conv.dlg_history, completed=True
+                )
+            return conv
+
+        convs = await asyncio.gather(
+            *[
+                run_conv(persona_idx, persona)
+                for persona_idx, persona in enumerate(considered_personas)
+            ]
+        )
+        return [
+            (persona, ArticleTextProcessing.clean_up_citation(conv).dlg_history)
+            for persona, conv in zip(considered_personas, convs)
+        ]
+
+    async def aresearch(
+        self,
+        topic: str,
+        ground_truth_url: str,
+        callback_handler: BaseCallbackHandler,
+        max_perspective: int = 0,
+        disable_perspective: bool = True,
+        return_conversation_log=False,
+        checkpoint: Optional[StormCheckpoint] = None,
+    ) -> Union[StormInformationTable, Tuple[StormInformationTable, Dict]]:
+        """Asynchronous version of `research`."""
+        callback_handler.on_identify_perspective_start()
+        considered_personas = []
+        if disable_perspective:
+            considered_personas = [""]
+        elif checkpoint is not None and checkpoint.load_personas() is not None:
+            considered_personas = checkpoint.load_personas()
+        else:
+            considered_personas = await global_limiter.run(
+                self._get_considered_personas,
+                topic=topic,
+                max_num_persona=max_perspective,
+            )
+            if checkpoint is not None:
+                checkpoint.save_personas(considered_personas)
+        callback_handler.on_identify_perspective_end(perspectives=considered_personas)
+
+        callback_handler.on_information_gathering_start()
+        blackboard = self._create_blackboard()
+        conversations = await self._arun_conversation(
+            conv_simulator=self.conv_simulator,
+            topic=topic,
+            ground_truth_url=ground_truth_url,
+            considered_personas=considered_personas,
+            callback_handler=callback_handler,
+            blackboard=blackboard,
+            checkpoint=checkpoint,
         )
+        if blackboard is not None:
+            logging.info(f"Research blackboard for {topic}: {blackboard.get_stats()}")
 
         information_table = StormInformationTable(conversations)
         callback_handler.on_information_gathering_end()
@@ -1,8 +1,12 @@
-from typing import Union, List
+import functools
+import json
+import re
+from typing import Iterable, Union, List
 from urllib.parse import urlparse
 
 import dspy
 
+from ...cache import make_cache_key
 from ...interface import Retriever, Information
 from ...utils import ArticleTextProcessing
 
@@ -222,12 +226,225 @@ BLACKLISTED = {
 }
 
 
-def is_valid_wikipedia_source(url):
-    parsed_url = urlparse(url)
-    # Check if the URL is from a reliable domain
-    combined_set = GENERALLY_UNRELIABLE | DEPRECATED | BLACKLISTED
-    for domain in combined_set:
-        if domain in parsed_url.netloc:
+# Entries of the lists above whose website cannot be derived from the name.
+_SOURCE_DOMAINS = {
+    "Advameg": ["city-data.com"],
+    "Baidu_Baike": ["baike.baidu.com"],
+    "Blogger": ["blogspot.com"],
+    "Breitbart_News": ["breitbart.com"],
+    "Centre_for_Research_on_Globalization": ["globalresearch.ca"],
+    "China_Global_Television_Network": ["cgtn.com"],
+    "Daily_Express": ["express.co.uk"],
+    "Encyclopaedia_Metallum": ["metal-archives.com"],
+    "International_Business_Times": ["ibtimes.com", "ibtimes.co.uk"],
+    "New_York_Post": ["nypost.com"],
+    "One_America_News_Network": ["oann.com"],
+    "Sputnik": ["sputniknews.com"],
+    "Swarajya": ["swarajyamag.com"],
+    "Tasnim_News_Agency": ["tasnimnews.com"],
+    "Telesur": ["telesurtv.net", "telesurenglish.net"],
+    "The_Unz_Review": ["unz.com"],
+    "Washington_Free_Beacon": ["freebeacon.com"],
+    "WorldNetDaily": ["wnd.com"],
+    "Worldometer": ["worldometers.info"],
+}
+
+# Second-level labels under which country-code TLDs register domains (e.g., "co.uk", "com.au").
+_SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "net", "org"}
+
+
+def _normalize_host(host: str) -> str:
+    return host.strip().lower().rstrip(".")
+
+
+def _registered_label(host: str) -> str:
+    """Return the label that identifies the site, e.g. "dailymail" for "www.dailymail.co.uk"."""
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return labels[-3]
+    return labels[-2] if len(labels) >= 2 else labels[0]
+
+
+def _name_to_labels(name: str) -> List[str]:
+    """Turn a source name like "The_Daily_Wire" into the site labels it is likely served under."""
+    words = [
+        re.sub(r"[^a-z0-9]", "", word)
+        for word in name.lower().replace("-", "_").split("_")
+    ]
+    words = [word for word in words if word]
+    if not words:
+        return []
+    labels = ["".join(words)]
+    # "The_Daily_Wire" -> "dailywire", but "The_Sun" is only "thesun" to avoid matching unrelated sites.
+    if words[0] == "the" and len(words) > 2:
+        labels.append("".join(words[1:]))
+    return labels
+
+
+class SourcePolicy:
+    """
+    Decide whether a URL comes from an acceptable source based on deny and allow lists.
+
+    Each entry is either a domain (e.g., "lulu.com"), which matches the domain and its subdomains, or a source name
+    without a dot (e.g., "Daily_Kos"). By default, a name denies hosts whose netloc contains it verbatim, which is the
+    rule `is_valid_wikipedia_source` has always used. With `match_names=True`, a name with known domains (e.g.,
+    "Breitbart_News") instead matches those domains and the sites whose registered label is the name without
+    separators ("breitbart.com", "breitbartnews.co.uk" but not "breitbartnews.example.org"); other names keep the
+    substring rule, so that sites merely named in the lists (e.g., youtube.com or reddit.com) are not denied.
+    Allowed domains take precedence over denied domains and names, and the most specific domain wins.
+    The lists are compiled once and verdicts are cached per host.
+    """
+
+    def __init__(
+        self,
+        deny: Iterable[str] = (),
+        allow: Iterable[str] = (),
+        match_names: bool = False,
+        deny_substrings: Iterable[str] = (),
+        cache_size: int = 100000,
+    ):
+        """
+        Args:
+            deny: Denied domains and source names.
+            allow: Allowed domains and source names.
+            match_names: If True, match source names with known domains against the host instead of the netloc.
+            deny_substrings: Entries that deny every netloc containing them verbatim, whatever their form.
+            cache_size: Number of per-host verdicts to cache.
+        """
+        self.match_names = match_names
+        self._domains = {}
+        self._labels = set()
+        self._substrings = set(deny_substrings)
+        for entry in deny:
+            self._add(entry, allowed=False)
+        for entry in allow:
+            self._add(entry, allowed=True)
+        self._substring_pattern = (
+            re.compile("|".join(re.escape(entry) for entry in sorted(self._substrings)))
+            if self._substrings
+            else None
+        )
+        self._is_netloc_allowed = functools.lru_cache(maxsize=cache_size)(
+            self._compute_verdict
+        )
+
+    def _add(self, entry: str, allowed: bool):
+        entry = entry.strip()
+        if not entry:
+            return
+        if "." in entry and "_" not in entry and "/" not in entry:
+            self._domains[_normalize_host(entry)] = allowed
+        elif not self.match_names or entry not in _SOURCE_DOMAINS:
+            if allowed:
+                self._substrings.discard(entry)
+            else:
+                self._substrings.add(entry)
+        else:
+            for domain in _SOURCE_DOMAINS[entry]:
+                self._domains[domain] = allowed
+            if allowed:
+                # An allow-listed name exempts the sites it is served under from name-based denial.
+                self._labels.difference_update(_name_to_labels(entry))
+            else:
+                self._labels.update(_name_to_labels(entry))
+
+    @classmethod
+    def from_wikipedia_lists(
+        cls,
+        deny: Iterable[str] = (),
+        allow: Iterable[str] = (),
+        match_names: bool = False,
+    ):
+        """
+        Create a policy from the Wikipedia perennial source lists plus custom entries.
+
+        Args:
+            deny: Additional denied domains and source names.
+            allow: Allowed domains and source names, which override the lists.
+            match_names: If False, every entry of the lists denies the netlocs containing it verbatim, which gives
+                the same verdicts as the original `is_valid_wikipedia_source`. If True, the entries with known domains
+                are matched against the host instead (see `SourcePolicy`).
+        """
+        names = GENERALLY_UNRELIABLE | DEPRECATED | BLACKLISTED
+        if not match_names:
+            return cls(deny=deny, allow=allow, deny_substrings=names)
+        return cls(deny=sorted(names) + list(deny), allow=allow, match_names=True)
+
+    @classmethod
+    def from_file(
+        cls, path: str, include_wikipedia_lists: bool = True, match_names: bool = False
+    ):
+        """
+        Load custom deny/allow lists from a file.
+
+        Args:
+            path: A JSON file of the form {"deny": [...], "allow": [...]}, or a text file with one entry per line where
+                entries prefixed with "!" are allowed, and empty lines and lines starting with "#" are ignored.
+            include_wikipedia_lists: Whether to start from the Wikipedia perennial source lists.
+            match_names: Whether to match source names with known domains against the host (see `SourcePolicy`).
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                data = json.load(f)
+                deny, allow = data.get("deny", []), data.get("allow", [])
+            else:
+                deny, allow = [], []
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    if line.startswith("!"):
+                        allow.append(line[1:])
+                    else:
+                        deny.append(line)
+        if include_wikipedia_lists:
+            return cls.from_wikipedia_lists(
+                deny=deny, allow=allow, match_names=match_names
+            )
+        return cls(deny=deny, allow=allow, match_names=match_names)
+
+    def _compute_verdict(self, netloc: str) -> bool:
+        host = _normalize_host(urlparse(f"//{netloc}").hostname or "")
+        if not host:
+            return True
+        labels = host.split(".")
+        # Walk the host from the most specific suffix ("a.b.example.com") to the least specific ("com").
+        for i in range(len(labels)):
+            verdict = self._domains.get(".".join(labels[i:]))
+            if verdict is not None:
+                return verdict
+        if self._substring_pattern is not None and self._substring_pattern.search(
+            netloc
+        ):
             return False
+        return _registered_label(host) not in self._labels
+
+    @functools.cached_property
+    def cache_namespace(self) -> str:
+        """Fingerprint of the lists, so that results filtered by different policies are cached separately."""
+        return make_cache_key(
+            sorted(self._domains.items()),
+            sorted(self._labels),
+            sorted(self._substrings),
+        )
 
-    return True
+    def is_allowed(self, url: str) -> bool:
+        parsed_url = urlparse(url)
+        if not parsed_url.netloc and "//" not in url:
+            # URLs without a scheme, e.g. "example.com/page".
+            parsed_url = urlparse(f"//{url}")
+        if not parsed_url.netloc:
+            return True
+        return self._is_netloc_allowed(parsed_url.netloc)
+
+    def __call__(self, url: str) -> bool:
+        return self.is_allowed(url)
+
+
+# Same verdicts as the substring check on the netloc this function has always done, compiled once.
+_wikipedia_source_policy = SourcePolicy.from_wikipedia_lists()
+
+
+def is_valid_wikipedia_source(url):
+    # Check if the URL is from a reliable domain
+    return _wikipedia_source_policy.is_allowed(url)
@@ -1,12 +1,15 @@
 import copy
+import hashlib
+import logging
+import os
 import re
+import threading
 from collections import OrderedDict
 from typing import Union, Optional, Any, List, Tuple, Dict
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from ...encoder import get_sentence_transformer
 from ...interface import Information, InformationTable, Article, ArticleSectionNode
 from ...utils import ArticleTextProcessing, FileIOHelper
 
@@ -80,7 +83,8 @@ class StormInformationTable(InformationTable):
                     else:
                         url_to_info[storm_info.url] = storm_info
         for url in url_to_info:
-            url_to_info[url].snippets = list(set(url_to_info[url].snippets))
+            # Order-preserving deduplication keeps the snippet order stable across processes.
+            url_to_info[url].snippets = list(dict.fromkeys(url_to_info[url].snippets))
         return url_to_info
 
     @staticmethod
@@ -110,17 +114,63 @@ class StormInformationTable(InformationTable):
             conversations.append((persona, dialogue_turns))
         return cls(conversations)
 
-    def prepare_table_for_retrieval(self):
-        self.encoder = SentenceTransformer("paraphrase-MiniLM-L6-v2")
+    def _get_snippets_fingerprint(self, encoder_model_name: str) -> str:
+        hasher = hashlib.sha256(encoder_model_name.encode("utf-8"))
+        for url, snippet in zip(self.collected_urls, self.collected_snippets):
+            hasher.update(b"\0" + url.encode("utf-8") + b"\0" + snippet.encode("utf-8"))
+        return hasher.hexdigest()
+
+    def prepare_table_for_retrieval(
+        self,
+        encoded_snippets_path: Optional[str] = None,
+        encoder_model_name: str = "paraphrase-MiniLM-L6-v2",
+    ):
+        """
+        Encode all collected snippets for `retrieve_information`.
+
+        Args:
+            encoded_snippets_path: Optional .npz file to load the encoded snippets from and save them to. The file is
+                only reused if it was built from exactly the same snippets with the same encoder.
+            encoder_model_name: Name of the SentenceTransformer model. The model is shared across the process.
+        """
+        if getattr(self, "encoded_snippets", None) is not None:
+            # Already prepared, e.g. by the runner with a path to the saved snippet embeddings.
+            return
+        self.encoder = get_sentence_transformer(encoder_model_name)
         self.collected_urls = []
         self.collected_snippets = []
         for url, information in self.url_to_info.items():
             for snippet in information.snippets:
                 self.collected_urls.append(url)
                 self.collected_snippets.append(snippet)
-        self.encoded_snippets = self.encoder.encode(
-            self.collected_snippets, show_progress_bar=False
-        )
+
+        fingerprint = self._get_snippets_fingerprint(encoder_model_name)
+        if encoded_snippets_path is not None and os.path.exists(encoded_snippets_path):
+            try:
+                with np.load(encoded_snippets_path) as saved:
+                    if str(saved["fingerprint"]) == fingerprint:
+                        self.encoded_snippets = saved["encoded_snippets"]
+                        return
+            except Exception as e:
+                logging.error(
+                    f"Error occurs when loading encoded snippets from {encoded_snippets_path}: {e}"
+                )
+
+        # Normalized float32 embeddings so that cosine similarity is a plain matrix product.
+        self.encoded_snippets = np.asarray(
+            self.encoder.encode(
+                self.collected_snippets,
+                show_progress_bar=False,
+                normalize_embeddings=True,
+            ),
+            dtype=np.float32,
+        ).reshape(len(self.collected_snippets), -1)
+        if encoded_snippets_path is not None:
+            np.savez(
+                encoded_snippets_path,
+                encoded_snippets=self.encoded_snippets,
+                fingerprint=np.array(fingerprint),
+            )
 
     def retrieve_information(
         self, queries: Union[List[str], str], search_top_k
@@ -129,11 +179,22 @@ class StormInformationTable(InformationTable):
         selected_snippets = []
         if type(queries) is str:
             queries = [queries]
-        for query in queries:
-            encoded_query = self.encoder.encode(query, show_progress_bar=False)
-            sim = cosine_similarity([encoded_query], self.encoded_snippets)[0]
-            sorted_indices = np.argsort(sim)
-            for i in sorted_indices[-search_top_k:][::-1]:
+        if len(queries) == 0 or len(self.collected_snippets) == 0:
+            return []
+        encoded_queries = np.asarray(
+            self.encoder.encode(
+                queries, show_progress_bar=False, normalize_embeddings=True
+            ),
+            dtype=np.float32,
+        )
+        sim = encoded_queries @ self.encoded_snippets.T
+        top_k = min(search_top_k, sim.shape[1])
+        if top_k < sim.shape[1]:
+            top_indices = np.argpartition(-sim, top_k - 1, axis=1)[:, :top_k]
+        else:
+            top_indices = np.tile(np.arange(sim.shape[1]), (sim.shape[0], 1))
+        for row, indices in zip(sim, top_indices):
+            for i in indices[np.argsort(-row[indices])]:
                 selected_urls.append(self.collected_urls[i])
                 selected_snippets.append(self.collected_snippets[i])
 
@@ -151,6 +212,230 @@ class StormInformationTable(InformationTable):
         return list(selected_url_to_info.values())
 
 
+class ResearchBlackboard:
+    """
+    Thread-safe research state shared by the conversations of all personas on one topic.
+
+    The blackboard serves two purposes:
+    1. Query deduplication: a query whose embedding is close to a query that has already been searched (by any
+       persona) is not sent to the retriever again; the results of the earlier query are reused instead.
+    2. Coverage tracking: it records the (URL, snippet) pairs found so far so that a conversation can measure the
+       novelty of each turn and stop once it mostly finds information that other turns have already found.
+    """
+
+    def __init__(
+        self,
+        query_similarity_threshold: Optional[float] = 0.9,
+        encoder_model_name: str = "paraphrase-MiniLM-L6-v2",
+    ):
+        """
+        Args:
+            query_similarity_threshold: Queries with a cosine similarity of at least this value to a searched query
+                reuse its results. None disables query deduplication.
+            encoder_model_name: Name of the SentenceTransformer model used to embed queries.
+        """
+        self.query_similarity_threshold = query_similarity_threshold
+        self.encoder_model_name = encoder_model_name
+        self._lock = threading.Lock()
+        self._searched_queries: List[str] = []
+        self._searched_query_embeddings: List[np.ndarray] = []
+        self._query_to_results: Dict[str, List[Information]] = {}
+        self._url_to_snippets: Dict[str, set] = {}
+        self.num_searched_queries = 0
+        self.num_deduplicated_queries = 0
+
+    def _encode(self, queries: List[str]) -> np.ndarray:
+        encoder = get_sentence_transformer(self.encoder_model_name)
+        return np.asarray(
+            encoder.encode(queries, show_progress_bar=False, normalize_embeddings=True),
+            dtype=np.float32,
+        ).reshape(len(queries), -1)
+
+    def claim_queries(self, queries: List[str]) -> Tuple[List[str], List[Information]]:
+        """
+        Split `queries` into the queries that still need to be searched and the results reused for the others.
+
+        The returned queries are registered as searched; their results must be reported with `add_search_results`.
+        Until then, similar queries are searched again rather than waiting for them.
+        """
+        queries = list(dict.fromkeys(queries))
+        if self.query_similarity_threshold is None or len(queries) == 0:
+            with self._lock:
+                self.num_searched_queries += len(queries)
+            return queries, []
+
+        # Embed outside the lock so that personas do not wait for each other's encoder calls.
+        embeddings = self._encode(queries)
+        to_search, reused_results = [], []
+        with self._lock:
+            for query, embedding in zip(queries, embeddings):
+                similar_query = None
+                if self._searched_query_embeddings:
+                    sim = np.stack(self._searched_query_embeddings) @ embedding
+                    best = int(np.argmax(sim))
+                    if sim[best] >= self.query_similarity_threshold:
+                        similar_query = self._searched_queries[best]
+                if similar_query is not None and (
+                    similar_query in self._query_to_results
+                    or similar_query in to_search
+                ):
+                    self.num_deduplicated_queries += 1
+                    reused_results.extend(
+                        copy.deepcopy(self._query_to_results.get(similar_query, []))
+                    )
+                    continue
+                to_search.append(query)
+                self._searched_queries.append(query)
+                self._searched_query_embeddings.append(embedding)
+            self.num_searched_queries += len(to_search)
+        return to_search, reused_results
+
+    def add_search_results(self, queries: List[str], results: List[Information]):
+        """Record the results of queries returned by `claim_queries` so that similar queries can reuse them."""
+        query_to_results = {q: [] for q in queries}
+        for result in results:
+            query = result.meta.get("query")
+            if query in query_to_results:
+                query_to_results[query].append(copy.deepcopy(result))
+        with self._lock:
+            self._query_to_results.update(query_to_results)
+
+    def record_coverage(self, results: List[Information]) -> Optional[float]:
+        """
+        Record the (URL, snippet) pairs in `results` and return the fraction of them that were not found before.
+
+        Returns None if `results` is empty, since such a turn says nothing about the coverage of the topic.
+        """
+        pairs = {(r.url, snippet) for r in results for snippet in r.snippets}
+        if not pairs:
+            return None
+        with self._lock:
+            new_pairs = [
+                (url, snippet)
+                for url, snippet in pairs
+                if snippet not in self._url_to_snippets.get(url, ())
+            ]
+            for url, snippet in new_pairs:
+                self._url_to_snippets.setdefault(url, set()).add(snippet)
+        return len(new_pairs) / len(pairs)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "num_searched_queries": self.num_searched_queries,
+                "num_deduplicated_queries": self.num_deduplicated_queries,
+                "num_urls": len(self._url_to_snippets),
+                "num_snippets": sum(len(s) for s in self._url_to_snippets.values()),
+            }
+
+
+class StormCheckpoint:
+    """
+    Fine-grained checkpoints of one topic in the STORM pipeline.
+
+    The selected personas, every persona conversation (after each dialogue turn) and every generated section are
+    saved as separate JSON files as soon as they finish, so that a run that dies in the middle of a stage only has to
+    redo the unfinished parts. Files are written atomically with `FileIOHelper.dump_json_atomic`.
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+        self.conversation_dir = os.path.join(checkpoint_dir, "conversations")
+        self.section_dir = os.path.join(checkpoint_dir, "sections")
+        os.makedirs(self.conversation_dir, exist_ok=True)
+        os.makedirs(self.section_dir, exist_ok=True)
+
+    @staticmethod
+    def _load(path: str) -> Optional[Any]:
+        if not os.path.exists(path):
+            return None
+        try:
+            return FileIOHelper.load_json(path)
+        except Exception as e:
+            logging.error(f"Error occurs when loading checkpoint {path}: {e}")
+            return None
+
+    @staticmethod
+    def _clear_dir(directory: str):
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+
+    def save_personas(self, personas: List[str]):
+        FileIOHelper.dump_json_atomic(
+            personas, os.path.join(self.checkpoint_dir, "personas.json")
+        )
+
+    def load_personas(self) -> Optional[List[str]]:
+        return self._load(os.path.join(self.checkpoint_dir, "personas.json"))
+
+    def _get_conversation_path(self, persona_idx: int) -> str:
+        return os.path.join(self.conversation_dir, f"{persona_idx}.json")
+
+    def save_conversation(
+        self,
+        persona_idx: int,
+        persona: str,
+        dlg_history: List[DialogueTurn],
+        completed: bool,
+    ):
+        FileIOHelper.dump_json_atomic(
+            {
+                "perspective": persona,
+                "dlg_turns": [turn.log() for turn in dlg_history],
+                "completed": completed,
+            },
+            self._get_conversation_path(persona_idx),
+        )
+
+    def load_conversation(
+        self, persona_idx: int, persona: str
+    ) -> Tuple[List[DialogueTurn], bool]:
+        """Return the saved dialogue turns of the persona and whether its conversation has finished."""
+        data = self._load(self._get_conversation_path(persona_idx))
+        if data is None or data["perspective"] != persona:
+            return [], False
+        return [DialogueTurn(**turn) for turn in data["dlg_turns"]], data["completed"]
+
+    def clear_research(self):
+        personas_path = os.path.join(self.checkpoint_dir, "personas.json")
+        if os.path.exists(personas_path):
+            os.remove(personas_path)
+        self._clear_dir(self.conversation_dir)
+
+    def _get_section_path(self, section_name: str, section_outline: str) -> str:
+        # The outline is part of the key so that sections of an outdated outline are not reused.
+        key = hashlib.sha256(
+            f"{section_name}\0{section_outline}".encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.section_dir, f"{key}.json")
+
+    def save_section(self, section_outline: str, section_output_dict: Dict):
+        FileIOHelper.dump_json_atomic(
+            {
+                "section_name": section_output_dict["section_name"],
+                "section_content": section_output_dict["section_content"],
+                "collected_info": [
+                    info.to_dict() for info in section_output_dict["collected_info"]
+                ],
+            },
+            self._get_section_path(
+                section_output_dict["section_name"], section_outline
+            ),
+        )
+
+    def load_section(self, section_name: str, section_outline: str) -> Optional[Dict]:
+        data = self._load(self._get_section_path(section_name, section_outline))
+        if data is None:
+            return None
+        data["collected_info"] = [
+            Information.from_dict(info) for info in data["collected_info"]
+        ]
+        return data
+
+    def clear_sections(self):
+        self._clear_dir(self.section_dir)
+
+
 class StormArticle(Article):
     def __init__(self, topic_name):
         super().__init__(topic_name=topic_name)
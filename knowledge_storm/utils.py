@@ -1,29 +1,56 @@
+import asyncio
 import concurrent.futures
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import pickle
 import re
 import regex
+import sqlite3
 import sys
+import threading
 import time
-from typing import List, Dict
+import uuid
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Optional, Tuple, Union, TYPE_CHECKING
+from urllib.parse import urlparse
 
-import httpx
-import pandas as pd
+import requests
 import toml
-from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_qdrant import Qdrant
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from qdrant_client import QdrantClient, models
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
-from trafilatura import extract
+from urllib3.util.retry import Retry
 
+from .cache import DiskCache, make_cache_key
+from .concurrency import global_governor
 from .lm import OpenAIModel
 
+# Heavy dependencies (pandas, langchain, qdrant_client, trafilatura, httpx) are imported where they are used so that
+# importing knowledge_storm stays fast for users who do not need the vector store or the web page helper.
+if TYPE_CHECKING:
+    import httpx
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from qdrant_client import QdrantClient, models
+
 logging.getLogger("httpx").setLevel(logging.WARNING)  # Disable INFO logging for httpx.
 
+_SNIPPET_SEPARATORS = [
+    "\n\n",
+    "\n",
+    ".",
+    "\uff0e",  # Fullwidth full stop
+    "\u3002",  # Ideographic full stop
+    ",",
+    "\uff0c",  # Fullwidth comma
+    "\u3001",  # Ideographic comma
+    " ",
+    "\u200B",  # Zero-width space
+    "",
+]
+
 
 def truncate_filename(filename, max_length=125):
     """Truncate filename to max_length to ensure the filename won't exceed the file system limit.
@@ -62,6 +89,230 @@ def makeStringRed(message):
     return f"\033[91m {message}\033[00m"
 
 
+class _IngestionCheckpoint:
+    """
+    CSV rows that have been fully written to a Qdrant collection and the IDs of their points, persisted in SQLite.
+
+    Rows and points are recorded under the hash of the ingestion settings (store location, collection, embedding
+    model, chunking), so one checkpoint file can serve several stores and models without a point written under one
+    of them being taken as written under another. Rows seen in the current run are tracked in a temporary table so
+    that points of rows that disappeared from the CSV file can be found without holding all point IDs in memory.
+    """
+
+    # SQLite limits the number of host parameters in one statement.
+    _MAX_PARAMS = 900
+
+    def __init__(self, path: str, settings_hash: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.settings_hash = settings_hash
+        self._conn = sqlite3.connect(path)
+        columns = [
+            column
+            for (_, column, *_) in self._conn.execute("PRAGMA table_info(points)")
+        ]
+        if columns and "settings_hash" not in columns:
+            # Checkpoints written before points were scoped by settings cannot be trusted for any settings.
+            self._conn.executescript(
+                """
+                DROP TABLE IF EXISTS points;
+                DROP TABLE IF EXISTS rows;
+                """
+            )
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS rows (
+                row_hash TEXT PRIMARY KEY, settings_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS points (
+                point_id TEXT, row_hash TEXT, settings_hash TEXT NOT NULL,
+                PRIMARY KEY (point_id, row_hash)
+            );
+            CREATE INDEX IF NOT EXISTS points_row_hash ON points (row_hash);
+            CREATE INDEX IF NOT EXISTS points_settings_hash ON points (settings_hash, point_id);
+            CREATE INDEX IF NOT EXISTS rows_settings_hash ON rows (settings_hash);
+            CREATE TEMP TABLE IF NOT EXISTS seen (row_hash TEXT PRIMARY KEY);
+            """
+        )
+        self._conn.commit()
+
+    def __contains__(self, row_hash: str) -> bool:
+        return (
+            self._conn.execute(
+                "SELECT 1 FROM rows WHERE row_hash = ?", (row_hash,)
+            ).fetchone()
+            is not None
+        )
+
+    def add(self, row_points: Dict[str, List[str]]):
+        """Record rows (row hash -> point IDs) whose points are all written."""
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO points (point_id, row_hash, settings_hash) VALUES (?, ?, ?)",
+            [
+                (p, h, self.settings_hash)
+                for h, point_ids in row_points.items()
+                for p in point_ids
+            ],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO rows (row_hash, settings_hash) VALUES (?, ?)",
+            [(h, self.settings_hash) for h in row_points],
+        )
+        self._conn.commit()
+
+    def mark_seen(self, row_hashes: Iterable[str]):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO seen (row_hash) VALUES (?)",
+            [(h,) for h in row_hashes],
+        )
+
+    def __len__(self) -> int:
+        """Number of rows recorded under the current settings."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM rows WHERE settings_hash = ?", (self.settings_hash,)
+        ).fetchone()[0]
+
+    def reset(self):
+        """Forget the rows recorded under the current settings, e.g. because their collection is empty."""
+        self._conn.execute(
+            "DELETE FROM points WHERE settings_hash = ?", (self.settings_hash,)
+        )
+        self._conn.execute(
+            "DELETE FROM rows WHERE settings_hash = ?", (self.settings_hash,)
+        )
+        self._conn.commit()
+
+    def _select_point_ids(self, query: str, point_ids: List[str]) -> set:
+        selected = set()
+        for i in range(0, len(point_ids), self._MAX_PARAMS):
+            batch = point_ids[i : i + self._MAX_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            selected.update(
+                p
+                for (p,) in self._conn.execute(
+                    query.format(placeholders=placeholders),
+                    (self.settings_hash, *batch),
+                )
+            )
+        return selected
+
+    def get_written_point_ids(self, point_ids: List[str]) -> set:
+        """Return the subset of `point_ids` that belong to a row recorded under the current settings, i.e., that are
+        in the collection with vectors of the current embedding model."""
+        return self._select_point_ids(
+            "SELECT DISTINCT point_id FROM points "
+            "WHERE settings_hash = ? AND point_id IN ({placeholders})",
+            point_ids,
+        )
+
+    def get_live_point_ids(self, point_ids: List[str]) -> set:
+        """Return the subset of `point_ids` that belong to a row seen in the current run."""
+        return self._select_point_ids(
+            "SELECT point_id FROM points JOIN seen USING (row_hash) "
+            "WHERE settings_hash = ? AND point_id IN ({placeholders})",
+            point_ids,
+        )
+
+    def remove_unseen_rows(self):
+        """Forget the rows recorded under the current settings that were not seen in the current run."""
+        self._conn.execute(
+            "DELETE FROM points WHERE settings_hash = ? "
+            "AND row_hash NOT IN (SELECT row_hash FROM seen)",
+            (self.settings_hash,),
+        )
+        self._conn.execute(
+            "DELETE FROM rows WHERE settings_hash = ? "
+            "AND row_hash NOT IN (SELECT row_hash FROM seen)",
+            (self.settings_hash,),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class BM25Index:
+    """
+    Keyword index of text chunks ranked with BM25, backed by SQLite FTS5.
+
+    It is kept next to a Qdrant collection for the hybrid mode of `VectorRM`: chunks are identified by their Qdrant
+    point ID, and exact identifiers (e.g., document numbers) that dense embeddings tend to miss are matched literally.
+    The index is built by `QdrantVectorStoreManager.create_or_update_vector_store` with `sparse_index_path`.
+    """
+
+    # SQLite limits the number of host parameters in one statement.
+    _MAX_PARAMS = 900
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = os.path.abspath(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY, point_id TEXT UNIQUE NOT NULL, text TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                text, content='chunks', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def add(self, chunks: Iterable[Tuple[str, str]]):
+        """Index (point ID, text) pairs. Chunks that are already indexed are ignored."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (point_id, text) VALUES (?, ?)", chunks
+            )
+            self._conn.commit()
+
+    def delete(self, point_ids: List[str]):
+        with self._lock:
+            for i in range(0, len(point_ids), self._MAX_PARAMS):
+                batch = point_ids[i : i + self._MAX_PARAMS]
+                self._conn.execute(
+                    f"DELETE FROM chunks WHERE point_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+            self._conn.commit()
+
+    @staticmethod
+    def _to_match_query(query: str) -> str:
+        # Quote every term so that punctuation in the query is never parsed as FTS5 syntax.
+        terms = dict.fromkeys(re.findall(r"\w+", query.lower()))
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def search(self, query: str, limit: int) -> List[str]:
+        """Return the point IDs of the `limit` best matching chunks, best first."""
+        match_query = self._to_match_query(query)
+        if not match_query:
+            return []
+        with self._lock:
+            return [
+                point_id
+                for (point_id,) in self._conn.execute(
+                    "SELECT chunks.point_id FROM chunks_fts JOIN chunks ON chunks.id = chunks_fts.rowid "
+                    "WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+                    (match_query, limit),
+                )
+            ]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class QdrantVectorStoreManager:
     """
     Helper class for managing the Qdrant vector store, can be used with `VectorRM` in rm.py.
@@ -70,20 +321,182 @@ class QdrantVectorStoreManager:
     Once you have the vector store, you can initialize `VectorRM` with the vector store path or the Qdrant server URL.
     """
 
+    @staticmethod
+    def _get_row_hash(values: Tuple, settings: Tuple) -> str:
+        """Hash of the row content and the ingestion settings that affect its chunks and vectors."""
+        import pandas as pd
+
+        return make_cache_key(*[None if pd.isna(v) else v for v in values], *settings)
+
+    @staticmethod
+    def _get_point_id(url: str, start_index: int, text: str, metadata: Dict) -> str:
+        """
+        Deterministic point ID of a chunk derived from its URL, start index and a hash of its content.
+
+        The hash covers the chunk text and its metadata, so re-ingesting an unchanged chunk maps to the same point
+        while any change (including to the title or description) yields a new point.
+        """
+        content_hash = make_cache_key(text, metadata)
+        return str(
+            uuid.uuid5(uuid.NAMESPACE_URL, f"{url}#{start_index}#{content_hash}")
+        )
+
+    @staticmethod
+    def _wait_for_upserts(futures: List[concurrent.futures.Future]):
+        for future in futures:
+            future.result()
+
+    @staticmethod
+    def _delete_stale_points(
+        client: "QdrantClient",
+        collection_name: str,
+        checkpoint: _IngestionCheckpoint,
+        sparse_index: Optional[BM25Index] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Delete all points that do not belong to a row of the current CSV file. Returns the number deleted."""
+        from qdrant_client import models
+
+        num_deleted, offset = 0, None
+        while True:
+            records, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            live = checkpoint.get_live_point_ids([str(r.id) for r in records])
+            stale = [r.id for r in records if str(r.id) not in live]
+            if stale:
+                client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(points=stale),
+                )
+                if sparse_index is not None:
+                    sparse_index.delete([str(point_id) for point_id in stale])
+                num_deleted += len(stale)
+            if offset is None:
+                break
+        checkpoint.remove_unseen_rows()
+        return num_deleted
+
+    @staticmethod
+    def create_payload_indexes(
+        client: "QdrantClient",
+        collection_name: str,
+        fields: Dict[str, "models.PayloadSchemaType"],
+    ):
+        """
+        Create payload indexes for the given fields (e.g., {"metadata.url": models.PayloadSchemaType.KEYWORD}) unless
+        they exist already. Payload indexes let Qdrant evaluate filters without scanning the payloads of all points.
+        """
+        existing = client.get_collection(collection_name=collection_name).payload_schema
+        for field_name, field_schema in fields.items():
+            if field_name not in existing:
+                client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
+
+    @staticmethod
+    def _get_vector_size(model: "HuggingFaceEmbeddings") -> int:
+        """Infer the dimension of the embedding model by embedding a probe text."""
+        return len(model.embed_query("dimension probe"))
+
+    @staticmethod
+    def _get_quantization_config(quantization: Optional[str]):
+        from qdrant_client import models
+
+        if quantization is None:
+            return None
+        if quantization == "scalar":
+            # int8 codes: 4x less memory with little recall loss.
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio.X16, always_ram=True
+                )
+            )
+        raise ValueError(
+            f"Invalid quantization: {quantization}. Choose either 'scalar', 'product' or None."
+        )
+
     @staticmethod
     def _check_create_collection(
-        client: QdrantClient, collection_name: str, model: HuggingFaceEmbeddings
+        client: "QdrantClient",
+        collection_name: str,
+        model: Union[str, "HuggingFaceEmbeddings"],
+        on_disk: bool = False,
+        quantization: Optional[str] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
     ):
-        """Check if the Qdrant collection exists and create it if it does not."""
+        """
+        Check if the Qdrant collection exists and create it if it does not.
+
+        If the collection exists, the on-disk, quantization and HNSW options that are given are applied to it.
+
+        Args:
+            client: Qdrant client.
+            collection_name: Name of the Qdrant collection.
+            model: The embedding model (or the name of a Hugging Face embedding model). The vector size of the
+                collection is inferred from it.
+            on_disk: If True, store the original vectors (and payloads) on disk instead of in RAM.
+            quantization: "scalar" (int8) or "product" quantization of the vectors kept in RAM for search, or None.
+                Search results are rescored with the original vectors.
+            hnsw_m: Number of edges per node in the HNSW graph (Qdrant default 16). Larger is more accurate and uses
+                more memory.
+            hnsw_ef_construct: Size of the candidate list when building the HNSW graph (Qdrant default 100).
+        """
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from langchain_qdrant import Qdrant
+        from qdrant_client import models
+
         if client is None:
             raise ValueError("Qdrant client is not initialized.")
+        if isinstance(model, str):
+            model = HuggingFaceEmbeddings(
+                model_name=model, encode_kwargs={"normalize_embeddings": True}
+            )
+        vector_size = QdrantVectorStoreManager._get_vector_size(model)
+        hnsw_config = None
+        if hnsw_m is not None or hnsw_ef_construct is not None:
+            hnsw_config = models.HnswConfigDiff(
+                m=hnsw_m, ef_construct=hnsw_ef_construct
+            )
+        quantization_config = QdrantVectorStoreManager._get_quantization_config(
+            quantization
+        )
+
         if client.collection_exists(collection_name=f"{collection_name}"):
             print(f"Collection {collection_name} exists. Loading the collection...")
-            return Qdrant(
-                client=client,
-                collection_name=collection_name,
-                embeddings=model,
-            )
+            vectors_config = client.get_collection(
+                collection_name=collection_name
+            ).config.params.vectors
+            if (
+                isinstance(vectors_config, models.VectorParams)
+                and vectors_config.size != vector_size
+            ):
+                raise ValueError(
+                    f"Collection {collection_name} has vectors of size {vectors_config.size}, but the embedding "
+                    f"model produces vectors of size {vector_size}."
+                )
+            if hnsw_config is not None or quantization_config is not None or on_disk:
+                client.update_collection(
+                    collection_name=collection_name,
+                    vectors_config=(
+                        {"": models.VectorParamsDiff(on_disk=True)} if on_disk else None
+                    ),
+                    hnsw_config=hnsw_config,
+                    quantization_config=quantization_config,
+                )
         else:
             print(
                 f"Collection {collection_name} does not exist. Creating the collection..."
@@ -92,24 +505,38 @@ class QdrantVectorStoreManager:
             client.create_collection(
                 collection_name=f"{collection_name}",
                 vectors_config=models.VectorParams(
-                    size=1024, distance=models.Distance.COSINE
+                    size=vector_size, distance=models.Distance.COSINE, on_disk=on_disk
                 ),
+                on_disk_payload=on_disk,
+                hnsw_config=hnsw_config,
+                quantization_config=quantization_config,
             )
-            return Qdrant(
-                client=client,
-                collection_name=collection_name,
-                embeddings=model,
-            )
+        # VectorRM filters on the url to exclude sources.
+        QdrantVectorStoreManager.create_payload_indexes(
+            client,
+            collection_name,
+            {"metadata.url": models.PayloadSchemaType.KEYWORD},
+        )
+        return Qdrant(
+            client=client,
+            collection_name=collection_name,
+            embeddings=model,
+        )
 
     @staticmethod
     def _init_online_vector_db(
-        url: str, api_key: str, collection_name: str, model: HuggingFaceEmbeddings
+        url: str,
+        api_key: str,
+        collection_name: str,
+        model: "HuggingFaceEmbeddings",
+        **collection_options,
     ):
         """Initialize the Qdrant client that is connected to an online vector store with the given URL and API key.
 
         Args:
             url (str): URL of the Qdrant server.
             api_key (str): API key for the Qdrant server.
+            **collection_options: Options of the collection, see `_check_create_collection`.
         """
         if api_key is None:
             if not os.getenv("QDRANT_API_KEY"):
@@ -118,30 +545,44 @@ class QdrantVectorStoreManager:
         if url is None:
             raise ValueError("Please provide a url for the Qdrant server.")
 
+        from qdrant_client import QdrantClient
+
         try:
             client = QdrantClient(url=url, api_key=api_key, timeout=18000)
             return QdrantVectorStoreManager._check_create_collection(
-                client=client, collection_name=collection_name, model=model
+                client=client,
+                collection_name=collection_name,
+                model=model,
+                **collection_options,
             )
         except Exception as e:
             raise ValueError(f"Error occurs when connecting to the server: {e}")
 
     @staticmethod
     def _init_offline_vector_db(
-        vector_store_path: str, collection_name: str, model: HuggingFaceEmbeddings
+        vector_store_path: str,
+        collection_name: str,
+        model: "HuggingFaceEmbeddings",
+        **collection_options,
     ):
         """Initialize the Qdrant client that is connected to an offline vector store with the given vector store folder path.
 
         Args:
             vector_store_path (str): Path to the vector store.
+            **collection_options: Options of the collection, see `_check_create_collection`.
         """
         if vector_store_path is None:
             raise ValueError("Please provide a folder path.")
 
+        from qdrant_client import QdrantClient
+
         try:
             client = QdrantClient(path=vector_store_path)
             return QdrantVectorStoreManager._check_create_collection(
-                client=client, collection_name=collection_name, model=model
+                client=client,
+                collection_name=collection_name,
+                model=model,
+                **collection_options,
             )
         except Exception as e:
             raise ValueError(f"Error occurs when loading the vector store: {e}")
@@ -155,6 +596,7 @@ class QdrantVectorStoreManager:
         title_column: str = "title",
         url_column: str = "url",
         desc_column: str = "description",
+        metadata_columns: Optional[List[str]] = None,
         batch_size: int = 64,
         chunk_size: int = 500,
         chunk_overlap: int = 100,
@@ -163,6 +605,17 @@ class QdrantVectorStoreManager:
         qdrant_api_key: str = None,
         embedding_model: str = "BAAI/bge-m3",
         device: str = "mps",
+        csv_chunk_size: int = 10000,
+        embed_batch_size: int = 1024,
+        embed_multi_process: bool = False,
+        max_upsert_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        sync: bool = False,
+        on_disk: bool = False,
+        quantization: Optional[str] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        sparse_index_path: Optional[str] = None,
     ):
         """
         Takes a CSV file and adds each row in the CSV file to the Qdrant collection.
@@ -170,6 +623,17 @@ class QdrantVectorStoreManager:
         This function expects each row of the CSV file as a document.
         The CSV file should have columns for "content", "title", "URL", and "description".
 
+        The CSV file is streamed in chunks of `csv_chunk_size` rows. The chunks of each row are embedded in large
+        batches and upserted in parallel while the next rows are read and embedded, so memory use is bounded by a
+        couple of CSV chunks. Rows are recorded in a checkpoint once all their chunks are written; an interrupted
+        ingestion can be rerun with the same arguments and rows already in the collection (same content and
+        settings) are skipped.
+
+        Point IDs are derived from (url, chunk start index, content hash), so writing the same chunk twice is
+        idempotent and chunks already written for another row are not embedded again. With `sync=True` the collection is
+        made to mirror the CSV file: points of rows that were changed or removed are deleted after the new chunks
+        are written.
+
         Args:
             collection_name: Name of the Qdrant collection.
             vector_store_path (str): Path to the directory where the vector store is stored or will be stored.
@@ -179,13 +643,37 @@ class QdrantVectorStoreManager:
             title_column (str): Name of the column containing the title. Default is "title".
             url_column (str): Name of the column containing the URL. Default is "url".
             desc_column (str): Name of the column containing the description. Default is "description".
+            metadata_columns (List[str]): Additional columns stored in the metadata of each chunk (e.g., a label or a
+                date), which can be used in the `metadata_filter` of VectorRM.
             batch_size (int): Batch size for adding documents to the collection.
             chunk_size: Size of each chunk if you need to build the vector store from documents.
             chunk_overlap: Overlap between chunks if you need to build the vector store from documents.
             embedding_model: Name of the Hugging Face embedding model.
             device: Device to run the embeddings model on, can be "mps", "cuda", "cpu".
             qdrant_api_key: API key for the Qdrant server (Only required if the Qdrant server is online).
+            csv_chunk_size: Number of CSV rows read and processed at a time.
+            embed_batch_size: Number of text chunks embedded per call to the embedding model.
+            embed_multi_process: If True, embed on a pool of worker processes (one per available GPU, or several
+                CPU processes).
+            max_upsert_workers: Maximum number of upsert requests in flight (online mode only; the local offline
+                store is written from a single thread).
+            checkpoint_path: SQLite file recording the ingested rows. Defaults to a file next to the CSV file. It is
+                reset if the collection is empty (e.g., it was just created or recreated).
+            sync: If True, delete points that do not belong to any row of the CSV file (e.g., from a previous
+                version of the file).
+            on_disk: If True, store the original vectors and payloads on disk instead of in RAM.
+            quantization: "scalar" or "product" quantization of the in-RAM search vectors, or None.
+            hnsw_m: Number of edges per node in the HNSW graph.
+            hnsw_ef_construct: Size of the candidate list when building the HNSW graph.
+            sparse_index_path: If set, also index every chunk for keyword (BM25) search in this SQLite file, to be
+                used with the hybrid mode of VectorRM.
         """
+        import pandas as pd
+        from langchain_core.documents import Document
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from qdrant_client import models
+
         # check if the collection name is provided
         if collection_name is None:
             raise ValueError("Please provide a collection name.")
@@ -196,6 +684,7 @@ class QdrantVectorStoreManager:
             model_name=embedding_model,
             model_kwargs=model_kwargs,
             encode_kwargs=encode_kwargs,
+            multi_process=embed_multi_process,
         )
 
         if file_path is None:
@@ -210,18 +699,26 @@ class QdrantVectorStoreManager:
 
         # try to initialize the Qdrant client
         qdrant = None
+        collection_options = {
+            "on_disk": on_disk,
+            "quantization": quantization,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construct": hnsw_ef_construct,
+        }
         if vector_db_mode == "online":
             qdrant = QdrantVectorStoreManager._init_online_vector_db(
                 url=url,
                 api_key=qdrant_api_key,
                 collection_name=collection_name,
                 model=model,
+                **collection_options,
             )
         elif vector_db_mode == "offline":
             qdrant = QdrantVectorStoreManager._init_offline_vector_db(
                 vector_store_path=vector_store_path,
                 collection_name=collection_name,
                 model=model,
+                **collection_options,
             )
         else:
             raise ValueError(
@@ -230,61 +727,179 @@ class QdrantVectorStoreManager:
         if qdrant is None:
             raise ValueError("Qdrant client is not initialized.")
 
-        # read the csv file
-        df = pd.read_csv(file_path)
-        # check that content column exists and url column exists
-        if content_column not in df.columns:
-            raise ValueError(
-                f"Content column {content_column} not found in the csv file."
-            )
-        if url_column not in df.columns:
-            raise ValueError(f"URL column {url_column} not found in the csv file.")
-
-        documents = [
-            Document(
-                page_content=row[content_column],
-                metadata={
-                    "title": row.get(title_column, ""),
-                    "url": row[url_column],
-                    "description": row.get(desc_column, ""),
-                },
-            )
-            for row in df.to_dict(orient="records")
-        ]
-
-        # split the documents
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             length_function=len,
             add_start_index=True,
-            separators=[
-                "\n\n",
-                "\n",
-                ".",
-                "\uff0e",  # Fullwidth full stop
-                "\u3002",  # Ideographic full stop
-                ",",
-                "\uff0c",  # Fullwidth comma
-                "\u3001",  # Ideographic comma
-                " ",
-                "\u200B",  # Zero-width space
-                "",
-            ],
+            separators=_SNIPPET_SEPARATORS,
+        )
+        if checkpoint_path is None:
+            checkpoint_path = os.path.join(
+                os.path.dirname(os.path.abspath(file_path)),
+                f".{collection_name}_ingestion_checkpoint.db",
+            )
+        sparse_index = BM25Index(sparse_index_path) if sparse_index_path else None
+        # Enabling the sparse index changes the row hashes, so rows ingested before are indexed too.
+        settings = (
+            vector_db_mode,
+            (
+                os.path.abspath(vector_store_path)
+                if vector_db_mode == "offline"
+                else url
+            ),
+            collection_name,
+            embedding_model,
+            chunk_size,
+            chunk_overlap,
+            sparse_index is not None,
+        )
+        checkpoint = _IngestionCheckpoint(
+            checkpoint_path, settings_hash=make_cache_key(*settings)
+        )
+        if (
+            len(checkpoint) > 0
+            and not qdrant.client.scroll(
+                collection_name=collection_name,
+                limit=1,
+                with_payload=False,
+                with_vectors=False,
+            )[0]
+        ):
+            # The rows recorded in the checkpoint were written to a collection that no longer exists.
+            print(
+                f"Collection {collection_name} is empty. Resetting the ingestion checkpoint..."
+            )
+            checkpoint.reset()
+        upsert_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_upsert_workers if vector_db_mode == "online" else 1
         )
-        split_documents = text_splitter.split_documents(documents)
 
-        # update and save the vector store
-        num_batches = (len(split_documents) + batch_size - 1) // batch_size
-        for i in tqdm(range(num_batches)):
-            start_idx = i * batch_size
-            end_idx = min((i + 1) * batch_size, len(split_documents))
-            qdrant.add_documents(
-                documents=split_documents[start_idx:end_idx],
-                batch_size=batch_size,
+        # Upserts of the previous CSV chunk run while the current one is split and embedded; rows are checkpointed
+        # only after all of their points are written. In offline mode all client calls go through the single worker
+        # because the local store is not thread-safe.
+        pending_futures, pending_rows = [], {}
+        num_rows, num_skipped, num_chunks, num_upserted = 0, 0, 0, 0
+        try:
+            for df in tqdm(
+                pd.read_csv(file_path, chunksize=csv_chunk_size), desc="CSV chunks"
+            ):
+                # check that content column exists and url column exists
+                if content_column not in df.columns:
+                    raise ValueError(
+                        f"Content column {content_column} not found in the csv file."
+                    )
+                if url_column not in df.columns:
+                    raise ValueError(
+                        f"URL column {url_column} not found in the csv file."
+                    )
+
+                chunks, row_points, seen = [], {}, []
+                for row in df.to_dict(orient="records"):
+                    num_rows += 1
+                    content = row[content_column]
+                    metadata = {
+                        "title": row.get(title_column, ""),
+                        "url": row[url_column],
+                        "description": row.get(desc_column, ""),
+                    }
+                    for column in metadata_columns or []:
+                        value = row.get(column)
+                        metadata[column] = None if pd.isna(value) else value
+                    row_hash = QdrantVectorStoreManager._get_row_hash(
+                        (content, *metadata.values()), settings
+                    )
+                    if not isinstance(content, str):
+                        num_skipped += 1
+                        continue
+                    seen.append(row_hash)
+                    if (
+                        row_hash in row_points
+                        or row_hash in pending_rows
+                        or row_hash in checkpoint
+                    ):
+                        num_skipped += 1
+                        continue
+                    row_points[row_hash] = []
+                    for doc in text_splitter.split_documents(
+                        [Document(page_content=content, metadata=metadata)]
+                    ):
+                        point_id = QdrantVectorStoreManager._get_point_id(
+                            metadata["url"],
+                            doc.metadata["start_index"],
+                            doc.page_content,
+                            doc.metadata,
+                        )
+                        row_points[row_hash].append(point_id)
+                        chunks.append((point_id, doc))
+                if sync:
+                    checkpoint.mark_seen(seen)
+
+                # The same chunk can occur in several rows; write it once.
+                chunks = list(dict(chunks).items())
+                num_chunks += len(chunks)
+                if sparse_index is not None:
+                    sparse_index.add(
+                        [(point_id, doc.page_content) for point_id, doc in chunks]
+                    )
+                # Chunks written under the same settings for a recorded row or still being written for a row of the
+                # previous CSV chunk. The check uses the checkpoint rather than the collection so that it does not wait
+                # for the upserts.
+                existing = checkpoint.get_written_point_ids(
+                    [point_id for point_id, _ in chunks]
+                )
+                existing.update(
+                    p for point_ids in pending_rows.values() for p in point_ids
+                )
+                chunks = [(p, doc) for p, doc in chunks if p not in existing]
+                futures = []
+                for i in range(0, len(chunks), embed_batch_size):
+                    batch = chunks[i : i + embed_batch_size]
+                    vectors = model.embed_documents(
+                        [doc.page_content for _, doc in batch]
+                    )
+                    points = [
+                        models.PointStruct(
+                            id=point_id,
+                            vector=vector,
+                            payload={
+                                qdrant.content_payload_key: doc.page_content,
+                                qdrant.metadata_payload_key: doc.metadata,
+                            },
+                        )
+                        for (point_id, doc), vector in zip(batch, vectors)
+                    ]
+                    num_upserted += len(points)
+                    for j in range(0, len(points), batch_size):
+                        futures.append(
+                            upsert_executor.submit(
+                                qdrant.client.upsert,
+                                collection_name=collection_name,
+                                points=points[j : j + batch_size],
+                            )
+                        )
+
+                QdrantVectorStoreManager._wait_for_upserts(pending_futures)
+                checkpoint.add(pending_rows)
+                pending_futures, pending_rows = futures, row_points
+
+            QdrantVectorStoreManager._wait_for_upserts(pending_futures)
+            checkpoint.add(pending_rows)
+            print(
+                f"Processed {num_rows} rows ({num_skipped} unchanged or invalid rows skipped), "
+                f"upserted {num_upserted} of {num_chunks} chunks."
             )
+            if sync:
+                # All upserts are done, so the client is no longer used by the worker threads.
+                num_deleted = QdrantVectorStoreManager._delete_stale_points(
+                    qdrant.client, collection_name, checkpoint, sparse_index
+                )
+                print(f"Deleted {num_deleted} stale chunks.")
+        finally:
+            upsert_executor.shutdown(wait=True)
+            checkpoint.close()
+            if sparse_index is not None:
+                sparse_index.close()
 
         # close the qdrant client
         qdrant.client.close()
@@ -592,6 +1207,16 @@ class FileIOHelper:
         with open(file_name, "w", encoding=encoding) as fw:
             json.dump(obj, fw, default=FileIOHelper.handle_non_serializable)
 
+    @staticmethod
+    def dump_json_atomic(obj, file_name, encoding="utf-8"):
+        """Like `dump_json`, but readers (and a process that dies mid-write) never see a partially written file."""
+        tmp_file_name = f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file_name, "w", encoding=encoding) as fw:
+            json.dump(obj, fw, default=FileIOHelper.handle_non_serializable)
+            fw.flush()
+            os.fsync(fw.fileno())
+        os.replace(tmp_file_name, file_name)
+
     @staticmethod
     def handle_non_serializable(obj):
         return "non-serializable contents"  # mark the non-serializable part
@@ -622,9 +1247,232 @@ class FileIOHelper:
             return pickle.load(f)
 
 
+class PooledSession(requests.Session):
+    """A keep-alive `requests.Session` with a bounded connection pool, default timeouts and retry with backoff.
+
+    One session is meant to be shared by all threads issuing requests for a retriever, so that TCP/TLS connections
+    are reused instead of being opened for every query. It can also be shared by several retrievers.
+
+    Rate limited responses (HTTP 429) are retried by the session rather than by urllib3, so that `governed_request`
+    can run every attempt under the global `RateGovernor`, which then sees the throttling and slows down.
+
+    Usage:
+        session = PooledSession(pool_maxsize=64, timeout=(3, 20), max_retries=5)
+        rm = BingSearch(k=3, http_session=session)
+        ...
+        print(session.get_pool_stats())
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 32,
+        pool_connections: int = 10,
+        timeout: Union[float, Tuple[float, float]] = (5, 30),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        status_forcelist: Tuple[int, ...] = (429, 500, 502, 503, 504),
+    ):
+        """
+        Args:
+            pool_maxsize: Maximum number of connections kept alive per host. Should be at least the number of threads
+                sharing the session.
+            pool_connections: Number of per-host connection pools to cache.
+            timeout: Default (connect, read) timeout in seconds, used when a request does not set its own.
+            max_retries: Number of retries on connection errors and on the status codes in `status_forcelist`.
+            backoff_factor: Exponential backoff factor between retries (`Retry-After` headers of 429 responses are
+                respected).
+            status_forcelist: Status codes that trigger a retry.
+        """
+        super().__init__()
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.retry_rate_limited = 429 in status_forcelist
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[status for status in status_forcelist if status != 429],
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+            # Otherwise urllib3 retries every 429 response with a Retry-After header on its own.
+            respect_retry_after_header=False,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.mount("https://", self._adapter)
+        self.mount("http://", self._adapter)
+
+        self._stats_lock = threading.Lock()
+        self._num_requests = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def _send_request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with self._stats_lock:
+            self._num_requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            return super().request(method, url, **kwargs)
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+
+    def _get_rate_limit_retry_delay(self, response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `response`, or None if it is not retried."""
+        if (
+            response.status_code != 429
+            or not self.retry_rate_limited
+            or attempt >= self.max_retries
+        ):
+            return None
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return self.backoff_factor * (2**attempt)
+
+    def request(self, method, url, **kwargs):
+        attempt = 0
+        while True:
+            response = self._send_request(method, url, **kwargs)
+            delay = self._get_rate_limit_retry_delay(response, attempt)
+            if delay is None:
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    def governed_request(self, provider: str, method, url, **kwargs):
+        """
+        Send a request under `global_governor` for `provider`. Each attempt holds its own slot, so a rate limited
+        response shrinks the concurrency of the provider before it is retried.
+        """
+        attempt = 0
+        while True:
+            with global_governor.acquire(provider) as lease:
+                response = self._send_request(method, url, **kwargs)
+                lease.check_response(response)
+            delay = self._get_rate_limit_retry_delay(response, attempt)
+            if delay is None:
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    def get_pool_stats(self) -> Dict:
+        """
+        Returns connection pool utilization: the number of requests, requests currently in flight and the peak, TCP
+        connections opened so far (a connection reused by a keep-alive request is not counted again), idle
+        connections currently kept alive, and the pool size per host.
+        """
+        num_connections, num_idle_connections = 0, 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_connections += pool.num_connections
+            if pool.pool is not None:
+                num_idle_connections += sum(
+                    1 for conn in list(pool.pool.queue) if conn is not None
+                )
+        with self._stats_lock:
+            return {
+                "requests": self._num_requests,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "connections_opened": num_connections,
+                "idle_connections": num_idle_connections,
+                "pool_maxsize": self.pool_maxsize,
+            }
+
+
+_text_splitters = {}
+
+
+def _get_text_splitter(snippet_chunk_size: int) -> "RecursiveCharacterTextSplitter":
+    if snippet_chunk_size not in _text_splitters:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        _text_splitters[snippet_chunk_size] = RecursiveCharacterTextSplitter(
+            chunk_size=snippet_chunk_size,
+            chunk_overlap=0,
+            length_function=len,
+            is_separator_regex=False,
+            separators=_SNIPPET_SEPARATORS,
+        )
+    return _text_splitters[snippet_chunk_size]
+
+
+_chunk_memo = OrderedDict()
+_chunk_memo_lock = threading.Lock()
+_CHUNK_MEMO_SIZE = 4096
+
+
+def split_text_into_snippets(text: str, snippet_chunk_size: int) -> List[str]:
+    """Split text into snippets, memoized per (text hash, chunk size) within the process."""
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), snippet_chunk_size)
+    with _chunk_memo_lock:
+        if key in _chunk_memo:
+            _chunk_memo.move_to_end(key)
+            return list(_chunk_memo[key])
+    snippets = _get_text_splitter(snippet_chunk_size).split_text(text)
+    with _chunk_memo_lock:
+        _chunk_memo[key] = snippets
+        while len(_chunk_memo) > _CHUNK_MEMO_SIZE:
+            _chunk_memo.popitem(last=False)
+    return list(snippets)
+
+
+def _extract_article(html: bytes, snippet_chunk_size: int) -> Dict:
+    """Extract the main text of a web page and split it into snippets. Runs in a worker process of WebPageHelper."""
+    from trafilatura import extract
+
+    article_text = extract(
+        html,
+        include_tables=False,
+        include_comments=False,
+        output_format="txt",
+    )
+    if article_text is None:
+        return {"text": None, "snippets": []}
+    return {
+        "text": article_text,
+        "snippets": split_text_into_snippets(article_text, snippet_chunk_size),
+    }
+
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def _get_extraction_pool(max_workers: Optional[int] = None):
+    """Return the process-wide process pool used for HTML extraction."""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            # "spawn" avoids forking a process that runs many threads (forked locks can deadlock the workers).
+            _extraction_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extraction_pool
+
+
 class WebPageHelper:
     """Helper class to process web pages.
 
+    Pages are downloaded by an asynchronous client running on a background event loop, with a bounded connection
+    pool, a per-host concurrency limit and a cap on the number of bytes read per page. Text extraction and chunking
+    are CPU-bound and run in a process-wide process pool so that they neither hold the GIL nor run serially.
+
+    With a `page_cache`, the extracted text and snippets of every page are stored per URL. A cached page younger than
+    `page_cache_max_age` is served without any request; an older one is revalidated with its ETag/Last-Modified and
+    only re-extracted if the page actually changed.
+
     Acknowledgement: Part of the code is adapted from https://github.com/stanford-oval/WikiChat project.
     """
 
@@ -633,73 +1481,243 @@ class WebPageHelper:
         min_char_count: int = 150,
         snippet_chunk_size: int = 1000,
         max_thread_num: int = 10,
+        max_connections_per_host: int = 4,
+        max_bytes: int = 2 * 1024 * 1024,
+        timeout: float = 4,
+        use_process_pool: bool = True,
+        page_cache: Optional[DiskCache] = None,
+        page_cache_max_age: Optional[float] = 24 * 3600,
     ):
         """
         Args:
             min_char_count: Minimum character count for the article to be considered valid.
             snippet_chunk_size: Maximum character count for each snippet.
-            max_thread_num: Maximum number of threads to use for concurrent requests (e.g., downloading webpages).
+            max_thread_num: Maximum number of concurrent requests (e.g., downloading webpages).
+            max_connections_per_host: Maximum number of concurrent requests to the same host.
+            max_bytes: Maximum number of bytes read from one page. Larger pages are cut off while streaming.
+            timeout: Timeout in seconds for each request.
+            use_process_pool: If True, extract and chunk pages in a process pool; otherwise in the calling thread.
+            page_cache: Optional persistent cache of fetched pages, e.g. DiskCache("cache/pages.db",
+                max_size_bytes=2 * 1024**3). Can be shared by several helpers and processes.
+            page_cache_max_age: Age in seconds below which a cached page is used without revalidation. None means
+                always revalidate.
         """
-        self.httpx_client = httpx.Client(verify=False)
         self.min_char_count = min_char_count
+        self.snippet_chunk_size = snippet_chunk_size
         self.max_thread_num = max_thread_num
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=snippet_chunk_size,
-            chunk_overlap=0,
-            length_function=len,
-            is_separator_regex=False,
-            separators=[
-                "\n\n",
-                "\n",
-                ".",
-                "\uff0e",  # Fullwidth full stop
-                "\u3002",  # Ideographic full stop
-                ",",
-                "\uff0c",  # Fullwidth comma
-                "\u3001",  # Ideographic comma
-                " ",
-                "\u200B",  # Zero-width space
-                "",
-            ],
-        )
+        self.max_connections_per_host = max_connections_per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.use_process_pool = use_process_pool
+        self.page_cache = page_cache
+        self.page_cache_max_age = page_cache_max_age
+        self.text_splitter = _get_text_splitter(snippet_chunk_size)
+
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._client = None
+        self._host_semaphores = {}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start (once) the background event loop that owns the asynchronous HTTP client."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="webpage-helper", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def _run(self, coro):
+        """Run a coroutine on the background loop from synchronous code (safe from any thread)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                verify=False,
+                limits=httpx.Limits(
+                    max_connections=self.max_thread_num,
+                    max_keepalive_connections=self.max_thread_num,
+                ),
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        return self._client
 
-    def download_webpage(self, url: str):
+    async def _afetch(
+        self, url: str, headers: Optional[Dict] = None
+    ) -> Optional[Tuple[int, bytes, Optional[str], Optional[str]]]:
+        """
+        Fetch a web page, reading at most `max_bytes` bytes. Must run on the helper's event loop.
+
+        Returns:
+            (status code, body, ETag, Last-Modified), or None if the request failed.
+        """
+        import httpx
+
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self.max_connections_per_host
+            )
         try:
-            res = self.httpx_client.get(url, timeout=4)
-            if res.status_code >= 400:
-                res.raise_for_status()
-            return res.content
+            async with self._host_semaphores[host]:
+                async with self._get_client().stream(
+                    "GET", url, headers=headers
+                ) as res:
+                    if res.status_code >= 400:
+                        res.raise_for_status()
+                    chunks, num_bytes = [], 0
+                    async for chunk in res.aiter_bytes():
+                        chunks.append(chunk)
+                        num_bytes += len(chunk)
+                        if num_bytes >= self.max_bytes:
+                            # Cut off huge pages early; the main text is usually near the top anyway.
+                            break
+                    return (
+                        res.status_code,
+                        b"".join(chunks)[: self.max_bytes],
+                        res.headers.get("etag"),
+                        res.headers.get("last-modified"),
+                    )
         except httpx.HTTPError as exc:
-            print(f"Error while requesting {exc.request.url!r} - {exc!r}")
+            print(f"Error while requesting {url!r} - {exc!r}")
             return None
 
-    def urls_to_articles(self, urls: List[str]) -> Dict:
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.max_thread_num
-        ) as executor:
-            htmls = list(executor.map(self.download_webpage, urls))
+    async def adownload_webpage(self, url: str) -> Optional[bytes]:
+        """Download a web page, reading at most `max_bytes` bytes. Must run on the helper's event loop."""
+        response = await self._afetch(url)
+        return response[1] if response is not None else None
 
-        articles = {}
+    def download_webpage(self, url: str) -> Optional[bytes]:
+        return self._run(self.adownload_webpage(url))
 
-        for h, u in zip(htmls, urls):
-            if h is None:
-                continue
-            article_text = extract(
-                h,
-                include_tables=False,
-                include_comments=False,
-                output_format="txt",
+    async def _afetch_all(self, urls: List[str], headers: List[Optional[Dict]]):
+        return await asyncio.gather(
+            *[self._afetch(url, headers=h) for url, h in zip(urls, headers)]
+        )
+
+    def _extract_htmls(self, htmls: List[bytes]) -> List[Dict]:
+        if self.use_process_pool and len(htmls) > 1:
+            try:
+                return list(
+                    _get_extraction_pool().map(
+                        _extract_article,
+                        htmls,
+                        [self.snippet_chunk_size] * len(htmls),
+                    )
+                )
+            except Exception as e:
+                logging.error(
+                    f"Error occurs when extracting web pages in the process pool: {e}"
+                )
+        return [_extract_article(h, self.snippet_chunk_size) for h in htmls]
+
+    def _page_cache_key(self, url: str) -> str:
+        return make_cache_key("page", url)
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[Dict]) -> Optional[Dict]:
+        if entry is None:
+            return None
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers or None
+
+    def _fetch_and_extract(self, urls: List[str]) -> Dict[str, Dict]:
+        """Return a page entry (text, per-chunk-size snippets, validators) for every URL that could be obtained."""
+        now = time.time()
+        entries = {}
+        if self.page_cache is not None:
+            for u in urls:
+                entry = self.page_cache.get(self._page_cache_key(u))
+                if entry is not None:
+                    entries[u] = entry
+        to_fetch = [
+            u
+            for u in urls
+            if u not in entries
+            or self.page_cache_max_age is None
+            or now - entries[u]["fetched_at"] > self.page_cache_max_age
+        ]
+        responses = self._run(
+            self._afetch_all(
+                to_fetch, [self._conditional_headers(entries.get(u)) for u in to_fetch]
             )
-            if article_text is not None and len(article_text) > self.min_char_count:
-                articles[u] = {"text": article_text}
+        )
 
-        return articles
+        updated_urls, to_extract = [], []
+        for u, response in zip(to_fetch, responses):
+            if response is None:
+                # Keep serving a stale cached page if the site is unreachable.
+                continue
+            status, body, etag, last_modified = response
+            entry = entries.get(u)
+            content_hash = hashlib.sha256(body).hexdigest()
+            if entry is not None and (
+                status == 304 or entry["content_hash"] == content_hash
+            ):
+                # Not modified: reuse the extraction.
+                entry.update(fetched_at=now)
+                entry["etag"] = etag or entry.get("etag")
+                entry["last_modified"] = last_modified or entry.get("last_modified")
+            elif status == 304:
+                continue
+            else:
+                entries[u] = {
+                    "content_hash": content_hash,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "fetched_at": now,
+                }
+                to_extract.append((u, body))
+            updated_urls.append(u)
+
+        for (u, _), article in zip(
+            to_extract, self._extract_htmls([body for _, body in to_extract])
+        ):
+            entries[u]["text"] = article["text"]
+            entries[u]["snippets"] = {str(self.snippet_chunk_size): article["snippets"]}
+
+        for u in entries:
+            chunk_key = str(self.snippet_chunk_size)
+            if entries[u].get("text") and chunk_key not in entries[u]["snippets"]:
+                entries[u]["snippets"][chunk_key] = split_text_into_snippets(
+                    entries[u]["text"], self.snippet_chunk_size
+                )
+                if u not in updated_urls:
+                    updated_urls.append(u)
 
-    def urls_to_snippets(self, urls: List[str]) -> Dict:
-        articles = self.urls_to_articles(urls)
-        for u in articles:
-            articles[u]["snippets"] = self.text_splitter.split_text(articles[u]["text"])
+        if self.page_cache is not None:
+            for u in updated_urls:
+                self.page_cache.set(self._page_cache_key(u), entries[u])
+        return entries
+
+    def urls_to_articles(self, urls: List[str]) -> Dict:
+        articles = self.urls_to_snippets(urls)
+        return {u: {"text": article["text"]} for u, article in articles.items()}
 
+    def urls_to_snippets(self, urls: List[str]) -> Dict:
+        entries = self._fetch_and_extract(urls)
+        articles = {}
+        for u in urls:
+            entry = entries.get(u)
+            if (
+                entry is not None
+                and entry.get("text") is not None
+                and len(entry["text"]) > self.min_char_count
+            ):
+                articles[u] = {
+                    "text": entry["text"],
+                    "snippets": entry["snippets"][str(self.snippet_chunk_size)],
+                }
         return articles
 
 